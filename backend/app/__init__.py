@@ -8,17 +8,62 @@ load_dotenv()
 def create_app():
     app = Flask(__name__)
     
+    # Serialize responses with the NumPy-aware fast JSON provider
+    from app.json_provider import NumpyJSONProvider
+    app.json = NumpyJSONProvider(app)
+    
     # Configure CORS
     CORS(app, resources={
         r"/api/*": {
             "origins": os.getenv("CORS_ORIGINS", "http://localhost:5173").split(","),
             "methods": ["GET", "POST", "OPTIONS"],
-            "allow_headers": ["Content-Type"]
+            "allow_headers": ["Content-Type", "X-Request-Timeout-Ms", "If-None-Match", "X-Model-Version", "X-Dataset-Version"],
+            "expose_headers": ["Retry-After", "ETag", "X-Cache-Version", "X-Model-Version", "X-Dataset-Version", "X-Model-Tier"],
+            # Browsers reuse a preflight this many seconds, so conditional
+            # GETs and requests with custom headers need one per endpoint at most
+            "max_age": int(os.getenv("CORS_MAX_AGE", 600))
         }
     })
     
+    # Give every request a deadline; expensive scans stop once it has passed
+    from app.deadline import RequestDeadlines, parse_timeouts
+    deadlines = RequestDeadlines(
+        default_timeout=float(os.getenv('REQUEST_TIMEOUT_MS', 10000)) / 1000,
+        timeouts=parse_timeouts(os.getenv('REQUEST_TIMEOUTS', ''))
+    )
+    deadlines.init_app(app)
+    
+    # Shed load beyond per-endpoint concurrency and queue limits with 429
+    from app.admission import AdmissionController, parse_limits
+    default_limit = parse_limits(f"default={os.getenv('ADMISSION_DEFAULT_LIMIT', '32:64')}")['default']
+    admission = AdmissionController(
+        default_limit=default_limit,
+        limits=parse_limits(os.getenv('ADMISSION_LIMITS', '')),
+        queue_timeout=float(os.getenv('ADMISSION_QUEUE_TIMEOUT_MS', 2000)) / 1000
+    )
+    admission.init_app(app)
+    
+    # Compress large responses for clients that accept it
+    from app.compression import ResponseCompressor
+    compressor = ResponseCompressor(
+        min_size=int(os.getenv('COMPRESSION_MIN_SIZE', 1024)),
+        gzip_level=int(os.getenv('COMPRESSION_LEVEL', 6))
+    )
+    compressor.init_app(app)
+    
     # Register blueprints
     from app.routes import api_bp
     app.register_blueprint(api_bp, url_prefix='/api')
     
+    # Per-endpoint settings name views; fail on typos instead of ignoring them
+    check_view_names(app, admission.limits, 'ADMISSION_LIMITS')
+    check_view_names(app, deadlines.timeouts, 'REQUEST_TIMEOUTS')
+    
     return app
+
+def check_view_names(app, names, setting: str):
+    """Raise ValueError if a per-endpoint setting names a view the app does not have"""
+    views = {endpoint.rpartition('.')[2] for endpoint in app.view_functions}
+    unknown = sorted(set(names) - views)
+    if unknown:
+        raise ValueError(f"Unknown view name in {setting}: {', '.join(unknown)}")
@@ -0,0 +1,199 @@
+"""
+Admission Control Module
+Per-endpoint concurrency and queue-depth limits; requests beyond them are shed
+quickly with 429 Too Many Requests and a Retry-After estimate
+"""
+import math
+import threading
+import time
+
+from flask import g, jsonify, request
+
+from app.deadline import remaining
+from app.metrics import metrics
+
+# Views that are never limited, so probes and scrapers see an overloaded server
+EXEMPT_ENDPOINTS = {'health_check', 'metrics_snapshot'}
+# Largest Retry-After sent, in seconds
+MAX_RETRY_AFTER = 30
+# Weight of the latest request in the moving average of service times
+SERVICE_TIME_ALPHA = 0.2
+
+
+def parse_limits(spec: str) -> dict:
+    """
+    Parse per-endpoint limits such as "predict=16:64,similar_tracks_batch=2:4"
+
+    Args:
+        spec: Comma-separated view=max_concurrent:max_queue entries
+
+    Returns:
+        Dictionary mapping view names to (max_concurrent, max_queue)
+
+    Raises:
+        ValueError: If an entry is malformed
+    """
+    limits = {}
+    for entry in (spec or '').split(','):
+        entry = entry.strip()
+        if not entry:
+            continue
+        name, _, values = entry.partition('=')
+        concurrent, _, queue = values.partition(':')
+        try:
+            limits[name.strip()] = (int(concurrent), int(queue or 0))
+        except ValueError:
+            raise ValueError(f"Invalid admission limit: {entry!r} (expected view=max_concurrent:max_queue)")
+    return limits
+
+
+class EndpointLimiter:
+    def __init__(self, name: str, max_concurrent: int, max_queue: int):
+        """
+        Initialize the limiter of one endpoint
+
+        Args:
+            name: View name, used in metric names
+            max_concurrent: Requests handled at the same time
+            max_queue: Requests allowed to wait for a slot
+        """
+        self.name = name
+        self.max_concurrent = max(1, max_concurrent)
+        self.max_queue = max(0, max_queue)
+        self.active = 0
+        self.waiting = 0
+        self.service_seconds = None
+        self._condition = threading.Condition()
+
+        self._active_gauge = metrics.gauge(f'admission_{name}_active')
+        self._queued_gauge = metrics.gauge(f'admission_{name}_queued')
+        self._saturation = metrics.gauge(f'admission_{name}_saturation')
+        self._admitted = metrics.counter(f'admission_{name}_admitted_total')
+        self._rejected = metrics.counter(f'admission_{name}_rejected_total')
+        self._queue_wait = metrics.histogram(f'admission_{name}_queue_wait_ms')
+
+    def _publish(self):
+        self._active_gauge.set(self.active)
+        self._queued_gauge.set(self.waiting)
+        # 1.0 means every slot and queue position is taken; new requests are shed
+        self._saturation.set((self.active + self.waiting) / (self.max_concurrent + self.max_queue))
+
+    def acquire(self, timeout: float) -> bool:
+        """
+        Take a slot, waiting in the queue for at most timeout seconds
+
+        Returns:
+            Whether the request was admitted
+        """
+        with self._condition:
+            if self.active < self.max_concurrent and self.waiting == 0:
+                self.active += 1
+                self._admitted.inc()
+                self._queue_wait.observe(0.0)
+                self._publish()
+                return True
+            if self.waiting >= self.max_queue:
+                self._rejected.inc()
+                return False
+
+            self.waiting += 1
+            self._publish()
+            start = time.perf_counter()
+            admitted = self._condition.wait_for(lambda: self.active < self.max_concurrent, timeout)
+            self.waiting -= 1
+            if admitted:
+                self.active += 1
+                self._admitted.inc()
+                self._queue_wait.observe((time.perf_counter() - start) * 1000)
+            else:
+                self._rejected.inc()
+            self._publish()
+            return admitted
+
+    def release(self, elapsed: float):
+        """Free a slot taken by a request that ran for elapsed seconds"""
+        with self._condition:
+            self.active -= 1
+            if self.service_seconds is None:
+                self.service_seconds = elapsed
+            else:
+                self.service_seconds += SERVICE_TIME_ALPHA * (elapsed - self.service_seconds)
+            self._publish()
+            self._condition.notify()
+
+    def retry_after(self) -> int:
+        """Seconds until the work ahead of a new request has likely drained"""
+        with self._condition:
+            backlog = self.active + self.waiting
+            service_seconds = self.service_seconds or 0.0
+        drain = service_seconds * backlog / self.max_concurrent
+        return min(MAX_RETRY_AFTER, max(1, math.ceil(drain)))
+
+
+class AdmissionController:
+    def __init__(self, default_limit=(32, 64), limits: dict = None, queue_timeout: float = 2.0):
+        """
+        Initialize admission control
+
+        Args:
+            default_limit: (max_concurrent, max_queue) of views without their own limit,
+                or None to leave them unlimited
+            limits: View names mapped to their own (max_concurrent, max_queue)
+            queue_timeout: Longest time a request waits in the queue before
+                it is shed, in seconds
+        """
+        self.default_limit = default_limit
+        self.limits = dict(limits or {})
+        self.queue_timeout = queue_timeout
+        self._limiters = {}
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        """Register admission control on a Flask application"""
+        app.extensions['admission'] = self
+        app.before_request(self.admit)
+        app.teardown_request(self.release)
+
+    def limiter(self, view: str):
+        """Get the limiter of a view, or None when it is not limited"""
+        if view in EXEMPT_ENDPOINTS:
+            return None
+        limit = self.limits.get(view, self.default_limit)
+        if limit is None or limit[0] <= 0:
+            return None
+        with self._lock:
+            limiter = self._limiters.get(view)
+            if limiter is None:
+                limiter = self._limiters[view] = EndpointLimiter(view, *limit)
+        return limiter
+
+    def admit(self):
+        """Admit the current request, or answer 429 when its endpoint is saturated"""
+        if request.endpoint is None or request.method == 'OPTIONS':
+            return None
+        limiter = self.limiter(request.endpoint.rpartition('.')[2])
+        if limiter is None:
+            return None
+        # Never queue past the request's own deadline
+        time_left = remaining()
+        timeout = self.queue_timeout if time_left is None else max(0.0, min(self.queue_timeout, time_left))
+        if not limiter.acquire(timeout):
+            retry_after = limiter.retry_after()
+            response = jsonify({
+                "error": {
+                    "code": "TOO_MANY_REQUESTS",
+                    "message": f"Server is busy, retry in {retry_after} second(s)"
+                }
+            })
+            response.status_code = 429
+            response.headers['Retry-After'] = str(retry_after)
+            return response
+        g.admission = (limiter, time.perf_counter())
+        return None
+
+    def release(self, exc=None):
+        """Free the slot of the current request once it has been handled"""
+        admission = g.pop('admission', None)
+        if admission is not None:
+            limiter, start = admission
+            limiter.release(time.perf_counter() - start)
@@ -0,0 +1,153 @@
+"""
+Artifacts Module
+Native model artifact bundle: XGBoost UBJSON boosters, preprocessing arrays
+in a .npz file and a JSON manifest with the feature order and checksums
+"""
+import hashlib
+import json
+import os
+
+import numpy as np
+
+MANIFEST_NAME = 'manifest.json'
+PREPROCESS_NAME = 'preprocess.npz'
+FORMAT_VERSION = 1
+
+
+def file_checksum(path: str) -> str:
+    """SHA-256 hex digest of a file"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class BoosterModel:
+    """predict_proba adapter over a binary:logistic XGBoost Booster"""
+
+    def __init__(self, booster):
+        self.booster = booster
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        hit = self.booster.inplace_predict(np.ascontiguousarray(X, dtype=np.float32))
+        return np.column_stack([1 - hit, hit])
+
+
+class GenreClasses:
+    """The part of a fitted LabelEncoder used at inference time"""
+
+    def __init__(self, classes):
+        self.classes_ = np.asarray(classes)
+
+
+class Preprocessor:
+    """StandardScaler replacement built from the stored mean and scale arrays"""
+
+    def __init__(self, mean, scale, genre_classes=None):
+        self.mean_ = np.asarray(mean, dtype=np.float64)
+        self.scale_ = np.asarray(scale, dtype=np.float64)
+        self.n_features_in_ = self.mean_.size
+        self.genre_encoder = GenreClasses(genre_classes) if genre_classes is not None else None
+
+    def transform(self, X: np.ndarray) -> np.ndarray:
+        return (np.asarray(X, dtype=np.float64) - self.mean_) / self.scale_
+
+
+def load_booster_model(path: str) -> BoosterModel:
+    """Load a booster saved with save_model in XGBoost's binary format"""
+    import xgboost
+
+    booster = xgboost.Booster()
+    booster.load_model(path)
+    return BoosterModel(booster)
+
+
+def load_preprocessor(path: str) -> Preprocessor:
+    """Load scaler statistics and genre classes from a preprocess.npz file"""
+    with np.load(path, allow_pickle=False) as arrays:
+        genre_classes = arrays['genre_classes'] if 'genre_classes' in arrays.files else None
+        return Preprocessor(arrays['mean'], arrays['scale'], genre_classes)
+
+
+def verify_bundle(paths, base_features) -> dict:
+    """
+    Check bundle files against the manifest in their directory
+
+    Args:
+        paths: Bundle files to verify (model and preprocess files)
+        base_features: Base feature order the caller builds its inputs in
+
+    Returns:
+        The parsed manifest
+
+    Raises:
+        RuntimeError: If the manifest is missing, a checksum differs or the
+            feature order does not match
+    """
+    paths = [path for path in paths if path]
+    manifest_path = os.path.join(os.path.dirname(paths[0]), MANIFEST_NAME)
+    try:
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+    except (OSError, ValueError) as e:
+        raise RuntimeError(f"Failed to read artifact manifest {manifest_path}: {str(e)}")
+
+    if manifest.get('format_version') != FORMAT_VERSION:
+        raise RuntimeError(f"Unsupported artifact format version: {manifest.get('format_version')}")
+    if manifest.get('feature_order', [])[:len(base_features)] != list(base_features):
+        raise RuntimeError("Artifact feature order does not match the service's base features")
+
+    for path in paths:
+        expected = manifest.get('checksums', {}).get(os.path.basename(path))
+        if expected is None:
+            raise RuntimeError(f"{os.path.basename(path)} is not listed in {manifest_path}")
+        if file_checksum(path) != expected:
+            raise RuntimeError(f"Checksum mismatch for {path}")
+    return manifest
+
+
+def save_bundle(model, scaler, path: str, genre_encoder=None, fast_model=None, feature_order=None) -> dict:
+    """
+    Write the native artifact bundle
+
+    Args:
+        model: Trained XGBClassifier
+        scaler: Fitted StandardScaler
+        path: Directory to write the bundle to
+        genre_encoder: Genre label encoder (optional)
+        fast_model: Distilled fast-tier XGBClassifier (optional)
+        feature_order: Model input column names in training order (defaults
+            to the names the scaler was fitted with)
+
+    Returns:
+        The written manifest
+    """
+    if feature_order is None:
+        feature_order = getattr(scaler, 'feature_names_in_', None)
+    if feature_order is None:
+        raise ValueError("feature_order is required when the scaler was fitted without column names")
+    os.makedirs(path, exist_ok=True)
+
+    tiers = {'full': 'model.ubj'}
+    model.get_booster().save_model(os.path.join(path, tiers['full']))
+    if fast_model is not None:
+        tiers['fast'] = 'model_fast.ubj'
+        fast_model.get_booster().save_model(os.path.join(path, tiers['fast']))
+
+    arrays = {'mean': scaler.mean_, 'scale': scaler.scale_}
+    if genre_encoder is not None:
+        arrays['genre_classes'] = np.asarray(genre_encoder.classes_).astype(str)
+    np.savez(os.path.join(path, PREPROCESS_NAME), **arrays)
+
+    files = list(tiers.values()) + [PREPROCESS_NAME]
+    manifest = {
+        'format_version': FORMAT_VERSION,
+        'feature_order': [str(name) for name in feature_order],
+        'tiers': tiers,
+        'preprocess': PREPROCESS_NAME,
+        'checksums': {name: file_checksum(os.path.join(path, name)) for name in files}
+    }
+    with open(os.path.join(path, MANIFEST_NAME), 'w') as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
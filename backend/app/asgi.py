@@ -0,0 +1,250 @@
+"""
+ASGI Module
+Serves the API contract of api_bp from an ASGI server. Request bodies are read
+and responses written on the event loop; the CPU-bound Flask/model/data work
+runs on a bounded thread pool so slow clients never hold a worker.
+"""
+import asyncio
+import io
+import json
+import math
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from app.admission import EXEMPT_ENDPOINTS, MAX_RETRY_AFTER, SERVICE_TIME_ALPHA
+from app.deadline import ARRIVAL_ENVIRON_KEY
+from app.metrics import metrics
+
+
+class AsgiApp:
+    def __init__(self, flask_app, max_workers: int = None, max_queue: int = None,
+                 max_body_size: int = 10 * 1024 * 1024):
+        """
+        Initialize the ASGI adapter
+
+        Requests wait for a free executor thread in a queue of at most
+        max_queue; beyond that they are answered at once with 429 and a
+        Retry-After estimate, like the Flask admission control. The deadline
+        of a request counts from its hand-off to the executor, so time spent
+        in the queue counts against it. Health checks and metrics are never
+        shed and run on the event loop's default executor.
+
+        Args:
+            flask_app: Flask application built by create_app
+            max_workers: Size of the executor running request handlers
+            max_queue: Requests allowed to wait for an executor thread
+                (defaults to twice max_workers)
+            max_body_size: Largest request body accepted, in bytes
+        """
+        self.flask_app = flask_app
+        self.max_workers = max_workers or min(32, (os.cpu_count() or 1) + 4)
+        self.max_queue = 2 * self.max_workers if max_queue is None else max(0, max_queue)
+        self.max_body_size = max_body_size
+        self.executor = ThreadPoolExecutor(
+            max_workers=self.max_workers, thread_name_prefix='asgi-worker'
+        )
+        # Requests running or queued on the executor; only touched on the event loop
+        self.pending = 0
+        self.service_seconds = None
+        self._service_lock = threading.Lock()
+        self.exempt_paths = {
+            rule.rule for rule in flask_app.url_map.iter_rules()
+            if rule.endpoint.rpartition('.')[2] in EXEMPT_ENDPOINTS
+        }
+
+        self._pending_gauge = metrics.gauge('asgi_pending')
+        self._rejected = metrics.counter('asgi_rejected_total')
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'http':
+            await self._handle_http(scope, receive, send)
+        elif scope['type'] == 'lifespan':
+            await self._handle_lifespan(receive, send)
+        else:
+            raise RuntimeError(f"Unsupported ASGI scope type: {scope['type']}")
+
+    def close(self):
+        """Shut down the executor after in-flight requests finish"""
+        self.executor.shutdown(wait=True)
+
+    async def _handle_lifespan(self, receive, send):
+        """Handle ASGI startup and shutdown events"""
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                await asyncio.get_running_loop().run_in_executor(None, self.close)
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    async def _read_body(self, receive):
+        """Read the full request body on the event loop"""
+        chunks = []
+        size = 0
+        while True:
+            message = await receive()
+            if message['type'] == 'http.disconnect':
+                return None
+            chunk = message.get('body', b'')
+            size += len(chunk)
+            if size > self.max_body_size:
+                return False
+            chunks.append(chunk)
+            if not message.get('more_body', False):
+                return b''.join(chunks)
+
+    async def _handle_http(self, scope, receive, send):
+        """Dispatch one HTTP request to the Flask app on the executor"""
+        body = await self._read_body(receive)
+        if body is None:
+            # Client went away before sending the whole request
+            return
+        if body is False:
+            status, headers, content = 413, [(b'content-type', b'application/json')], (
+                b'{"error":{"code":"INVALID_REQUEST","message":"Request body is too large"}}'
+            )
+        elif scope['path'] in self.exempt_paths:
+            environ = build_environ(scope, body)
+            status, headers, content = await asyncio.get_running_loop().run_in_executor(
+                None, self._call_wsgi, environ
+            )
+        elif self.pending >= self.max_workers + self.max_queue:
+            self._rejected.inc()
+            status, headers, content = self._busy_response()
+        else:
+            environ = build_environ(scope, body)
+            environ[ARRIVAL_ENVIRON_KEY] = time.monotonic()
+            self.pending += 1
+            self._pending_gauge.set(self.pending)
+            try:
+                status, headers, content = await asyncio.get_running_loop().run_in_executor(
+                    self.executor, self._call_wsgi, environ
+                )
+            finally:
+                self.pending -= 1
+                self._pending_gauge.set(self.pending)
+
+        await send({'type': 'http.response.start', 'status': status, 'headers': headers})
+        await send({'type': 'http.response.body', 'body': content})
+
+    def retry_after(self) -> int:
+        """Seconds until the requests ahead of a new one have likely drained"""
+        with self._service_lock:
+            service_seconds = self.service_seconds or 0.0
+        drain = service_seconds * self.pending / self.max_workers
+        return min(MAX_RETRY_AFTER, max(1, math.ceil(drain)))
+
+    def _busy_response(self):
+        """429 response for a request shed because the executor queue is full"""
+        retry_after = self.retry_after()
+        content = json.dumps({
+            "error": {
+                "code": "TOO_MANY_REQUESTS",
+                "message": f"Server is busy, retry in {retry_after} second(s)"
+            }
+        }).encode('utf-8')
+        headers = [
+            (b'content-type', b'application/json'),
+            (b'retry-after', str(retry_after).encode('latin-1')),
+        ]
+        return 429, headers, content
+
+    def _call_wsgi(self, environ):
+        """Run the WSGI app to completion and collect its response"""
+        start = time.perf_counter()
+        response_start = {}
+
+        def start_response(status, headers, exc_info=None):
+            response_start['status'] = int(status.split(' ', 1)[0])
+            response_start['headers'] = [
+                (name.lower().encode('latin-1'), value.encode('latin-1'))
+                for name, value in headers
+            ]
+
+        result = self.flask_app.wsgi_app(environ, start_response)
+        try:
+            content = b''.join(result)
+        finally:
+            if hasattr(result, 'close'):
+                result.close()
+
+        elapsed = time.perf_counter() - start
+        with self._service_lock:
+            if self.service_seconds is None:
+                self.service_seconds = elapsed
+            else:
+                self.service_seconds += SERVICE_TIME_ALPHA * (elapsed - self.service_seconds)
+        return response_start['status'], response_start['headers'], content
+
+
+def build_environ(scope, body: bytes) -> dict:
+    """
+    Build a WSGI environ dictionary from an ASGI HTTP scope
+
+    Args:
+        scope: ASGI connection scope
+        body: Complete request body
+
+    Returns:
+        WSGI environ dictionary
+    """
+    server = scope.get('server') or ('localhost', 80)
+    client = scope.get('client') or ('', 0)
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': scope.get('root_path', '').encode('utf-8').decode('latin-1'),
+        'PATH_INFO': scope['path'].encode('utf-8').decode('latin-1'),
+        'QUERY_STRING': scope.get('query_string', b'').decode('latin-1'),
+        'SERVER_NAME': str(server[0]),
+        'SERVER_PORT': str(server[1]) if server[1] is not None else '80',
+        'SERVER_PROTOCOL': f"HTTP/{scope.get('http_version', '1.1')}",
+        'REMOTE_ADDR': client[0],
+        'REMOTE_PORT': str(client[1]),
+        'CONTENT_LENGTH': str(len(body)),
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': io.BytesIO(body),
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': False,
+        'wsgi.run_once': False,
+    }
+
+    for name, value in scope.get('headers', []):
+        name = name.decode('latin-1').upper().replace('-', '_')
+        value = value.decode('latin-1')
+        if name == 'CONTENT_TYPE':
+            environ['CONTENT_TYPE'] = value
+        elif name == 'CONTENT_LENGTH':
+            continue
+        else:
+            key = f'HTTP_{name}'
+            environ[key] = f'{environ[key]},{value}' if key in environ else value
+
+    return environ
+
+
+def create_asgi_app(max_workers: int = None, max_queue: int = None):
+    """
+    Create the ASGI application
+
+    Serve with e.g. ``uvicorn --factory app.asgi:create_asgi_app``.
+
+    Args:
+        max_workers: Executor size (defaults to the ASGI_MAX_WORKERS env var)
+        max_queue: Executor queue bound (defaults to the ASGI_MAX_QUEUE env var)
+
+    Returns:
+        ASGI callable exposing the same /api/* routes as the Flask app
+    """
+    from app import create_app
+
+    if max_workers is None and os.getenv('ASGI_MAX_WORKERS'):
+        max_workers = int(os.getenv('ASGI_MAX_WORKERS'))
+    if max_queue is None and os.getenv('ASGI_MAX_QUEUE'):
+        max_queue = int(os.getenv('ASGI_MAX_QUEUE'))
+    return AsgiApp(create_app(), max_workers=max_workers, max_queue=max_queue)
@@ -0,0 +1,193 @@
+"""
+Batching Module
+Coalesces concurrent single-item requests into batched calls
+"""
+import queue
+import threading
+import time
+
+from app.deadline import DeadlineExceeded, current_deadline
+from app.metrics import metrics
+
+# Buckets for batch-size histograms
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256)
+
+_STOP = object()
+
+
+class _PendingItem:
+    __slots__ = ('item', 'enqueued_at', 'deadline', 'done', 'result', 'error')
+
+    def __init__(self, item):
+        self.item = item
+        self.enqueued_at = time.perf_counter()
+        # Deadline of the submitting request, checked before the batch runs
+        self.deadline = current_deadline()
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class MicroBatcher:
+    def __init__(self, process_batch, max_batch_size: int = 32, max_wait_ms: float = 2.0,
+                 name: str = 'predict'):
+        """
+        Initialize the micro-batcher
+
+        A single worker thread collects queued items into a batch until it holds
+        max_batch_size items or the oldest item has waited max_wait_ms. When no
+        other request is in flight the batch is dispatched immediately, so an
+        idle service does not pay the wait.
+
+        Args:
+            process_batch: Callable taking a list of items and returning a list
+                of results in the same order
+            max_batch_size: Largest number of items per batch
+            max_wait_ms: Longest time the oldest item waits for companions
+            name: Prefix for the exported metrics
+        """
+        self.process_batch = process_batch
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait = max(0.0, float(max_wait_ms)) / 1000
+
+        self._queue = queue.Queue()
+        self._inflight = 0
+        self._inflight_lock = threading.Lock()
+        self._closed = False
+
+        self._batch_size = metrics.histogram(f'{name}_batch_size', BATCH_SIZE_BUCKETS)
+        self._queue_wait = metrics.histogram(f'{name}_queue_wait_ms')
+        self._batches = metrics.counter(f'{name}_batches_total')
+        self._expired = metrics.counter(f'{name}_expired_total')
+
+        self._worker = threading.Thread(target=self._run, name=f'{name}-batcher', daemon=True)
+        self._worker.start()
+
+    def submit(self, item):
+        """
+        Queue an item and block until its batch has been processed
+
+        Args:
+            item: Single input for process_batch
+
+        Returns:
+            The result for this item
+        """
+        if self._closed:
+            # Late callers (e.g. after a hot reload) are served without batching
+            return self.process_batch([item])[0]
+
+        pending = _PendingItem(item)
+        with self._inflight_lock:
+            self._inflight += 1
+        try:
+            self._queue.put(pending)
+            while not pending.done.wait(0.1):
+                if not self._worker.is_alive():
+                    # Queued while closing, after the worker drained the queue
+                    self._process_one(pending)
+                    break
+        finally:
+            with self._inflight_lock:
+                self._inflight -= 1
+
+        if pending.error is not None:
+            raise pending.error
+        return pending.result
+
+    def close(self):
+        """
+        Stop the worker after the queued items have been processed
+
+        Items submitted after closing are processed in the calling thread.
+        """
+        if not self._closed:
+            self._closed = True
+            self._queue.put(_STOP)
+            self._worker.join()
+
+    def _collect(self, first):
+        """Gather a batch starting with the first queued item"""
+        batch = [first]
+        deadline = first.enqueued_at + self.max_wait
+        stop = False
+
+        while len(batch) < self.max_batch_size:
+            try:
+                pending = self._queue.get_nowait()
+            except queue.Empty:
+                with self._inflight_lock:
+                    waiting = self._inflight - len(batch)
+                remaining = deadline - time.perf_counter()
+                # Nobody else is about to enqueue, or the oldest item has waited long enough
+                if waiting <= 0 or remaining <= 0:
+                    break
+                try:
+                    pending = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+            if pending is _STOP:
+                stop = True
+                break
+            batch.append(pending)
+
+        return batch, stop
+
+    def _run(self):
+        stop = False
+        while not stop:
+            first = self._queue.get()
+            if first is _STOP:
+                break
+            batch, stop = self._collect(first)
+
+            started = time.perf_counter()
+            for pending in batch:
+                self._queue_wait.observe((started - pending.enqueued_at) * 1000)
+            batch = self._drop_expired(batch)
+            if not batch:
+                continue
+            self._batch_size.observe(len(batch))
+            self._batches.inc()
+
+            try:
+                results = self.process_batch([pending.item for pending in batch])
+                for pending, result in zip(batch, results):
+                    pending.result = result
+            except Exception as e:
+                for pending in batch:
+                    pending.error = e
+            finally:
+                for pending in batch:
+                    pending.done.set()
+
+        # Serve anything submitted after the stop marker one by one
+        while True:
+            try:
+                pending = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if pending is not _STOP:
+                self._process_one(pending)
+
+    def _drop_expired(self, batch):
+        """Fail the items whose request deadline has passed and return the others"""
+        now = time.monotonic()
+        live = []
+        for pending in batch:
+            if pending.deadline is not None and now >= pending.deadline:
+                pending.error = DeadlineExceeded("Request deadline exceeded")
+                pending.done.set()
+                self._expired.inc()
+            else:
+                live.append(pending)
+        return live
+
+    def _process_one(self, pending):
+        """Process a single item outside of a batch"""
+        try:
+            pending.result = self.process_batch([pending.item])[0]
+        except Exception as e:
+            pending.error = e
+        finally:
+            pending.done.set()
@@ -0,0 +1,219 @@
+"""
+Compression Module
+Negotiates gzip/brotli response compression from the Accept-Encoding header
+"""
+import gzip
+import threading
+from collections import OrderedDict
+
+from flask import current_app, request
+
+try:
+    import brotli
+except ImportError:  # brotli is optional, gzip is always available
+    brotli = None
+
+COMPRESSIBLE_MIMETYPES = {'application/json', 'text/plain', 'text/csv', 'text/html'}
+
+
+def parse_accept_encoding(header: str) -> dict:
+    """
+    Parse an Accept-Encoding header into quality values
+
+    Args:
+        header: Raw Accept-Encoding header value
+
+    Returns:
+        Dictionary mapping lower-cased coding names to their q-value
+    """
+    qualities = {}
+    for part in (header or '').split(','):
+        coding, _, params = part.strip().partition(';')
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        quality = 1.0
+        for param in params.split(';'):
+            name, _, value = param.strip().partition('=')
+            if name.strip().lower() == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        qualities[coding] = quality
+    return qualities
+
+
+def choose_encoding(header: str):
+    """
+    Pick the best supported content coding for a request
+
+    Args:
+        header: Raw Accept-Encoding header value
+
+    Returns:
+        'br', 'gzip' or None when no supported coding is acceptable
+    """
+    qualities = parse_accept_encoding(header)
+    wildcard = qualities.get('*', 0.0)
+    supported = ['br', 'gzip'] if brotli is not None else ['gzip']
+
+    best, best_quality = None, 0.0
+    for coding in supported:
+        quality = qualities.get(coding, wildcard)
+        # Ties keep the earlier (better compressing) coding
+        if quality > best_quality:
+            best, best_quality = coding, quality
+    return best
+
+
+def mark_cacheable(response, key):
+    """
+    Allow the compressed body of a response to be reused
+
+    Views call this for deterministic payloads; the key must change whenever
+    the response body would change.
+
+    Args:
+        response: Flask response object
+        key: Hashable cache key identifying the body
+
+    Returns:
+        The same response, for chaining
+    """
+    response.compression_cache_key = key
+    return response
+
+
+def cached_response(key, build):
+    """
+    A deterministic response whose body is built at most once per key
+
+    The body is looked up in the application's ResponseCompressor cache
+    before build is called, so a hit skips both the computation and the
+    serialization. The response is marked cacheable, so its compressed
+    forms are reused as well.
+
+    Args:
+        key: Hashable cache key identifying the body (see mark_cacheable)
+        build: Callable returning the Flask response to cache
+
+    Returns:
+        Flask response
+    """
+    compressor = current_app.extensions.get('compressor')
+    response = compressor.cached_response(key, build) if compressor is not None else build()
+    return mark_cacheable(response, key)
+
+
+class ResponseCompressor:
+    def __init__(self, min_size: int = 1024, gzip_level: int = 6,
+                 brotli_quality: int = 5, cache_size: int = 32):
+        """
+        Initialize the response compressor
+
+        Args:
+            min_size: Bodies smaller than this many bytes are sent uncompressed
+            gzip_level: gzip compression level (1-9)
+            brotli_quality: brotli quality (0-11)
+            cache_size: Maximum number of compressed bodies kept for cacheable responses
+        """
+        self.min_size = min_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.cache_size = cache_size
+
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    def init_app(self, app):
+        """Register the compressor on a Flask application"""
+        app.extensions['compressor'] = self
+        app.after_request(self.compress_response)
+
+    def compress(self, body: bytes, encoding: str) -> bytes:
+        """Compress a body with the given content coding"""
+        if encoding == 'br':
+            return brotli.compress(body, quality=self.brotli_quality)
+        return gzip.compress(body, compresslevel=self.gzip_level, mtime=0)
+
+    def _cached_compress(self, key, body: bytes, encoding: str) -> bytes:
+        """Compress a cacheable body once and serve later requests from the cache"""
+        cache_key = (key, encoding)
+        with self._lock:
+            compressed = self._cache.get(cache_key)
+            if compressed is not None:
+                self._cache.move_to_end(cache_key)
+                self.cache_hits += 1
+                return compressed
+            self.cache_misses += 1
+
+        compressed = self.compress(body, encoding)
+
+        with self._lock:
+            self._cache[cache_key] = compressed
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return compressed
+
+    def cached_response(self, key, build):
+        """The uncompressed response for key from the cache, or build() stored under key"""
+        cache_key = (key, None)
+        with self._lock:
+            cached = self._cache.get(cache_key)
+            if cached is not None:
+                self._cache.move_to_end(cache_key)
+                self.cache_hits += 1
+            else:
+                self.cache_misses += 1
+        if cached is not None:
+            body, mimetype = cached
+            return current_app.response_class(body, mimetype=mimetype)
+
+        response = build()
+        with self._lock:
+            self._cache[cache_key] = (response.get_data(), response.mimetype)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return response
+
+    def compress_response(self, response):
+        """
+        Compress a response if the client accepts it and it is worth it
+
+        Args:
+            response: Outgoing Flask response
+
+        Returns:
+            The (possibly compressed) response
+        """
+        if response.mimetype not in COMPRESSIBLE_MIMETYPES:
+            return response
+
+        response.vary.add('Accept-Encoding')
+
+        if (response.status_code != 200
+                or response.direct_passthrough
+                or 'Content-Encoding' in response.headers
+                or request.method == 'HEAD'):
+            return response
+
+        encoding = choose_encoding(request.headers.get('Accept-Encoding', ''))
+        if encoding is None:
+            return response
+
+        body = response.get_data()
+        if len(body) < self.min_size:
+            return response
+
+        key = getattr(response, 'compression_cache_key', None)
+        if key is not None:
+            compressed = self._cached_compress(key, body, encoding)
+        else:
+            compressed = self.compress(body, encoding)
+
+        response.set_data(compressed)
+        response.headers['Content-Encoding'] = encoding
+        return response
@@ -0,0 +1,45 @@
+"""
+Config Module
+Artifact and dataset paths and the default model tier, read from the
+environment; shared by the API and the command-line scripts
+"""
+import os
+
+# Get the backend directory path
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+# Resolve paths relative to backend directory
+def resolve_path(path):
+    """Resolve path relative to backend directory if not absolute"""
+    if os.path.isabs(path):
+        return path
+    # Try the path as-is first
+    if os.path.exists(path):
+        return path
+    # Try relative to backend directory
+    backend_relative = os.path.join(BACKEND_DIR, path)
+    if os.path.exists(backend_relative):
+        return backend_relative
+    # Return the backend-relative path as default
+    return backend_relative
+
+
+MODEL_PATH = resolve_path(os.getenv('MODEL_PATH', 'models/model.pkl'))
+# A .ubj MODEL_PATH selects the native artifact bundle written by train_model.py
+NATIVE_ARTIFACTS = MODEL_PATH.endswith('.ubj')
+SCALER_PATH = resolve_path(os.getenv(
+    'SCALER_PATH', 'models/preprocess.npz' if NATIVE_ARTIFACTS else 'models/scaler.pkl'
+))
+# The bundle stores genre classes in preprocess.npz, so it has no encoder file
+GENRE_ENCODER_PATH = os.getenv('GENRE_ENCODER_PATH', '' if NATIVE_ARTIFACTS else 'models/genre_encoder.pkl')
+GENRE_ENCODER_PATH = resolve_path(GENRE_ENCODER_PATH) if GENRE_ENCODER_PATH else None
+DATASET_PATH = resolve_path(os.getenv('DATASET_PATH', 'data/dataset.csv'))
+# Precomputed neighbour graph for /api/similar/<track_id> (built by build_knn_graph.py)
+KNN_GRAPH_PATH = resolve_path(os.getenv('KNN_GRAPH_PATH', 'data/knn_graph.npz'))
+
+# Distilled fast-tier model (served when present) and the tier used by default
+FAST_MODEL_PATH = resolve_path(os.getenv(
+    'FAST_MODEL_PATH', 'models/model_fast.ubj' if NATIVE_ARTIFACTS else 'models/model_fast.pkl'
+))
+MODEL_TIER = os.getenv('MODEL_TIER', 'full')
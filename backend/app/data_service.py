@@ -1,147 +1,1260 @@
 """
 Data Service Module
-Handles dataset loading and similarity calculations
+Handles dataset loading, incremental track ingestion and similarity calculations
 """
-import pandas as pd
+import concurrent.futures
+import hashlib
+import json
+import os
+import threading
+from contextlib import contextmanager
+from typing import TYPE_CHECKING
+
 import numpy as np
-from sklearn.metrics.pairwise import cosine_similarity
-from sklearn.preprocessing import StandardScaler
+
+from app.artifacts import Preprocessor
+from app.deadline import check_deadline, wait_for
+from app.eda_engine import EDAAccumulator
+from app.knn_graph import catalog_digest, load_knn_graph
+from app.search_index import TrackSearchIndex
+
+try:
+    import fcntl
+except ImportError:  # No flock on Windows; segment writes are then not coordinated across processes
+    fcntl = None
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+# Rows per accumulator update when building EDA statistics
+EDA_CHUNK_ROWS = 65536
+# Largest histogram resolution served from the sorted columns
+MAX_HISTOGRAM_BINS = 1000
+# Size of one block of the query x catalog similarity matrix
+SIMILARITY_BLOCK_BYTES = 32 * 1024 * 1024
+# Ingested segments kept as separate index shards before they are folded together
+FOLD_SEGMENTS = 20
+# Catalog manifest and lock file in the segment directory
+MANIFEST_NAME = 'catalog.json'
+LOCK_NAME = '.lock'
+
+
+def _unit_rows(matrix: np.ndarray) -> np.ndarray:
+    """Scale rows to unit length (all-zero rows stay zero)"""
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def _order_statistics(a: np.ndarray, b: np.ndarray, ranks) -> np.ndarray:
+    """
+    Values at the given 0-based ranks of the union of two sorted arrays,
+    found by binary search on how many of the smallest values come from a
+    """
+    values = []
+    for rank in ranks:
+        k = int(rank) + 1
+        low, high = max(0, k - len(b)), min(k, len(a))
+        while low < high:
+            i = (low + high) // 2
+            if b[k - i - 1] > a[i]:
+                low = i + 1
+            else:
+                high = i
+        candidates = ([a[low - 1]] if low > 0 else []) + ([b[k - low - 1]] if k - low > 0 else [])
+        values.append(max(candidates))
+    return np.array(values, dtype=np.float64)
+
+
+def _group_rows(values, offset: int = 0) -> dict:
+    """
+    Row indices (starting at offset) for each distinct non-null value; a
+    tuple value puts the row in the group of each of its items
+    """
+    groups = {}
+    for index, value in enumerate(values, offset):
+        for key in (value if isinstance(value, tuple) else (value,)):
+            if key is not None:
+                groups.setdefault(key, []).append(index)
+    return {value: np.array(rows, dtype=np.int64) for value, rows in groups.items()}
+
+
+def _artist_names(artists: str) -> list:
+    """Individual artists of a track (multiple artists are separated by ';')"""
+    return [name.strip() for name in str(artists).split(';') if name.strip()]
+
+
+class _RowBuffer:
+    """Append-only float matrix that grows by doubling its capacity"""
+    
+    def __init__(self, rows: np.ndarray):
+        self._data = np.array(rows, dtype=np.float64)
+        self._size = len(self._data)
+    
+    @property
+    def view(self) -> np.ndarray:
+        return self._data[:self._size]
+    
+    def append(self, rows: np.ndarray) -> np.ndarray:
+        """Append rows and return a view of the filled part"""
+        n_rows = len(rows)
+        if self._size + n_rows > len(self._data):
+            capacity = max(self._size + n_rows, 2 * len(self._data), 16)
+            data = np.empty((capacity, self._data.shape[1]), dtype=np.float64)
+            data[:self._size] = self._data[:self._size]
+            self._data = data
+        # Rows past the current size are invisible to readers until the view is republished
+        self._data[self._size:self._size + n_rows] = rows
+        self._size += n_rows
+        return self.view
+
+
+class _RowGroups:
+    """
+    Row indices per group value (genre or artist)
+    
+    Each ingested segment adds its own mapping, so ingestion does not copy
+    the catalog's groups; fold() merges them into the base mapping.
+    """
+    
+    def __init__(self, groups: dict):
+        self._state = (groups, ())
+        self._lock = threading.Lock()
+    
+    def __bool__(self) -> bool:
+        base, deltas = self._state
+        return bool(base) or any(deltas)
+    
+    def get(self, key):
+        """Rows of a group in ascending order, or None if it has none"""
+        base, deltas = self._state
+        parts = [groups[key] for groups in (base,) + deltas if key in groups]
+        if not parts:
+            return None
+        return parts[0] if len(parts) == 1 else np.concatenate(parts)
+    
+    def add(self, groups: dict):
+        with self._lock:
+            base, deltas = self._state
+            self._state = (base, deltas + (groups,))
+    
+    def fold(self):
+        """Merge the segment mappings into the base mapping"""
+        base, deltas = self._state
+        if not deltas:
+            return
+        merged = dict(base)
+        for groups in deltas:
+            for key, rows in groups.items():
+                merged[key] = np.concatenate([merged[key], rows]) if key in merged else rows
+        with self._lock:
+            self._state = (merged, self._state[1][len(deltas):])
+
 
 class DataService:
-    def __init__(self, dataset_path: str):
+    def __init__(self, dataset_path: str, executor=None, compact_after: int = 20, knn_graph_path: str = None):
         """
         Initialize the data service
         
+        Tracks added with ingest_tracks are persisted as append-only delta
+        segments in a directory next to the dataset (dataset.segments/ for
+        dataset.csv), which are loaded after the base file. Segments are
+        numbered in sequence; a manifest in the same directory records the
+        last sequence compacted into the base file and the scaler every
+        process uses, so processes sharing the dataset agree on its rows,
+        similarity scores and version.
+        
         Args:
             dataset_path: Path to the Spotify dataset CSV
+            executor: Optional InferencePool that runs similarity scans in worker processes
+            compact_after: Fold the segments into the base file once there are
+                this many (0 disables automatic compaction)
+            knn_graph_path: Optional precomputed neighbour graph (see
+                build_knn_graph.py) used by similar_to_track
         """
         self.dataset_path = dataset_path
-        self.df = self._load_dataset()
+        self.segment_dir = os.path.splitext(dataset_path)[0] + '.segments'
+        self.executor = executor
+        self.compact_after = compact_after
         self.feature_columns = [
             'tempo', 'energy', 'danceability', 'loudness', 'valence',
             'acousticness', 'instrumentalness', 'liveness', 'speechiness',
             'duration_ms', 'key', 'mode', 'time_signature'
         ]
-        # Scale features for similarity calculations
-        self.scaler = StandardScaler()
-        self.scaled_features = self.scaler.fit_transform(self.df[self.feature_columns])
+        
+        self._ingest_lock = threading.Lock()
+        self._compact_lock = threading.Lock()
+        self._fold_lock = threading.Lock()
+        # Shared builds in progress (see _shared_build)
+        self._builds = {}
+        self._builds_lock = threading.Lock()
+        self._df_lock = threading.Lock()
+        # Last segment sequence in the in-memory catalog
+        self._sequence = 0
+        self._pending_frames = []
+        self._sync_thread = None
+        self._sync_stop = threading.Event()
+        
+        self._df = self._load_dataset()
+        self.columns = list(self._df.columns)
+        
+        # Track metadata for result rows
+        self.track_ids = self._column_values(self._df, 'track_id', None)
+        self.track_names = self._column_values(self._df, 'track_name', 'Unknown')
+        self.artists = self._column_values(self._df, 'artists', 'Unknown')
+        # Hash index from track_id to its (first) row
+        self._row_by_id = {}
+        self._index_track_ids(self.track_ids, 0)
+        
+        # Raw feature values as a float matrix for fast per-row lookups
+        self._features = _RowBuffer(self._df[self.feature_columns].to_numpy(dtype=np.float64))
+        self.feature_matrix = self._features.view
+        popularity = self._popularity(self._df)
+        self.has_popularity = popularity is not None
+        if popularity is None:
+            popularity = np.full(self.n_tracks, np.nan)
+        
+        # Scale features for similarity calculations (z-scores, as StandardScaler)
+        # and the hit threshold (70th popularity percentile, as in the EDA). Both
+        # come from the manifest and stay fixed while tracks are ingested, so
+        # existing rows never change.
+        manifest = self._manifest = self._catalog_manifest(popularity)
+        self._base_id = manifest['base_id']
+        self.scaler = Preprocessor(np.array(manifest['scaler_mean']), np.array(manifest['scaler_scale']))
+        self.hit_threshold = np.nan if manifest['hit_threshold'] is None else manifest['hit_threshold']
+        self._scaled = _RowBuffer(self.scaler.transform(self.feature_matrix))
+        self.scaled_features = self._scaled.view
+        # Unit-length rows, so cosine similarity is a single matrix product
+        self._unit = _RowBuffer(_unit_rows(self.scaled_features))
+        self._unit_features = self._unit.view
+        
+        # Search filters: genre and artist partitions plus popularity scores
+        self.genres = self._column_values(self._df, 'track_genre', None)
+        self._genre_rows = _RowGroups(_group_rows(self.genres))
+        self._artist_rows = _RowGroups(_group_rows(self._artist_lists(self.artists)))
+        self._popularity_scores = _RowBuffer(popularity[:, None])
+        self.popularity_scores = self._popularity_scores.view[:, 0]
+        
+        # Prefix and trigram indexes over track names and artists
+        self._search_index = TrackSearchIndex()
+        self._search_index.add(self.track_names, self.artists)
+        
+        # Precomputed neighbours of the first rows of the catalog (None when
+        # absent or built for different tracks)
+        self.knn_neighbors = self.knn_scores = None
+        if knn_graph_path and os.path.exists(knn_graph_path):
+            self._load_knn_graph(knn_graph_path)
+        
+        # Identifies the catalog contents: the base dataset and the last segment
+        # sequence, so it is the same in every process and across compaction
+        self.version = self._catalog_version()
+        
+        # EDA statistics are accumulated on first request and then updated with
+        # each ingested segment; the payload is rebuilt when the catalog changes
+        self._eda_accumulator = None
+        self._eda_cache = None
+        # Sorted feature columns as (base_rows, columns, blocks): columns maps a
+        # column index to the values of rows below base_rows in ascending order
+        # (each sorted on first use) and blocks holds every later segment's
+        # features sorted per column, until fold_segments merges them
+        self._sorted_state = (self.n_tracks, {}, ())
+    
+    @property
+    def df(self) -> 'pd.DataFrame':
+        """The catalog as a DataFrame (ingested rows are concatenated on first access)"""
+        if self._pending_frames:
+            import pandas as pd
+            with self._df_lock:
+                if self._pending_frames:
+                    frames, self._pending_frames = self._pending_frames, []
+                    self._df = pd.concat([self._df] + frames, ignore_index=True)
+        return self._df
+    
+    @property
+    def n_tracks(self) -> int:
+        return len(self._unit_features)
+    
+    @property
+    def unit_features(self) -> np.ndarray:
+        """
+        Scaled feature rows normalized to unit length, one per track (cosine
+        similarity is their dot product), as a read-only view
+        """
+        features = self._unit_features.view()
+        features.flags.writeable = False
+        return features
+    
+    @staticmethod
+    def _column_values(df, column: str, default) -> list:
+        """Column values as a list, with default for a missing column or value"""
+        if column not in df.columns:
+            return [default] * len(df)
+        return [default if value != value else value for value in df[column].tolist()]
+    
+    def _segment_files(self) -> list:
+        """(sequence, file name) of the delta segments in the order they were written"""
+        if not os.path.isdir(self.segment_dir):
+            return []
+        return sorted(
+            (int(name[8:-4]), name) for name in os.listdir(self.segment_dir)
+            if name.startswith('segment-') and name.endswith('.csv')
+        )
+    
+    @contextmanager
+    def _segment_lock(self, create: bool = False):
+        """
+        Exclusive lock on the segment directory across processes (flock), held
+        while segments are written, compacted or read
+        
+        Without create, a catalog with no segment directory is not locked:
+        nothing has been ingested, so there is nothing to coordinate yet.
+        Not reentrant: a second acquisition in the same process blocks.
+        """
+        lock_file = None
+        if fcntl is not None and (create or os.path.isdir(self.segment_dir)):
+            try:
+                os.makedirs(self.segment_dir, exist_ok=True)
+                lock_file = open(os.path.join(self.segment_dir, LOCK_NAME), 'a')
+            except OSError:
+                # A read-only catalog cannot be written by anyone else either
+                lock_file = None
+        if lock_file is None:
+            yield
+            return
+        with lock_file:
+            # Closing the file releases the lock
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            yield
+    
+    def _base_stat(self) -> list:
+        return self._base_stat_of(self.dataset_path)
+    
+    def _read_manifest(self):
+        """The catalog manifest on disk, or None if there is none"""
+        try:
+            with open(os.path.join(self.segment_dir, MANIFEST_NAME)) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+    
+    def _current_manifest(self):
+        """
+        The manifest on disk if it describes the current base file, else None
+        
+        Raises:
+            RuntimeError: If the base file was replaced while segments written
+                on top of the previous one remain
+        """
+        manifest = self._read_manifest()
+        if manifest is None or manifest['base_stat'] == self._base_stat():
+            return manifest
+        temp_path = self.dataset_path + '.compacting'
+        if os.path.exists(temp_path) and manifest['base_stat'] == self._base_stat_of(temp_path):
+            # A compaction stopped between recording and swapping the base
+            # file; finish it
+            os.replace(temp_path, self.dataset_path)
+            for sequence, name in self._segment_files():
+                if sequence <= manifest['sequence']:
+                    os.remove(os.path.join(self.segment_dir, name))
+            return manifest
+        if self._segment_files():
+            raise RuntimeError(
+                f"{self.dataset_path} was replaced after tracks were ingested; move "
+                f"{self.segment_dir} aside to load it without the old segments"
+            )
+        return None
+    
+    @staticmethod
+    def _base_stat_of(path: str) -> list:
+        stat = os.stat(path)
+        return [stat.st_size, stat.st_mtime_ns]
     
-    def _load_dataset(self) -> pd.DataFrame:
+    def _write_manifest(self, manifest: dict):
+        path = os.path.join(self.segment_dir, MANIFEST_NAME)
+        os.makedirs(self.segment_dir, exist_ok=True)
+        with open(path + '.tmp', 'w') as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(path + '.tmp', path)
+    
+    def _catalog_manifest(self, popularity: np.ndarray) -> dict:
+        """
+        The manifest loaded with the catalog, or a new one for a new base file
+        
+        A new manifest takes the scaler and hit threshold from the loaded
+        catalog, which every process computes alike from the same base file.
+        It is written by the first ingest, so loading a catalog leaves no
+        files behind.
+        """
+        if self._manifest is not None:
+            return self._manifest
+        scale = self.feature_matrix.std(axis=0)
+        scale[scale == 0] = 1.0
+        base_stat = self._base_stat()
+        token = f"{os.path.abspath(self.dataset_path)}:{base_stat[0]}:{base_stat[1]}"
+        return {
+            'base_id': hashlib.sha256(token.encode()).hexdigest()[:16],
+            'base_stat': base_stat,
+            'base_rows': self._base_rows,
+            'sequence': 0,
+            'scaler_mean': self.feature_matrix.mean(axis=0).tolist(),
+            'scaler_scale': scale.tolist(),
+            'hit_threshold': float(np.nanquantile(popularity, 0.70)) if self.has_popularity else None
+        }
+    
+    def _catalog_version(self) -> str:
+        return hashlib.sha256(f"{self._base_id}:{self._sequence}".encode()).hexdigest()[:12]
+    
+    def _load_dataset(self) -> 'pd.DataFrame':
         """
         Load the dataset from CSV
         
+        Reads the base file and the segments written after the last
+        compaction recorded in the manifest. Segments written on top of a
+        base file that has since been replaced are refused (see
+        _current_manifest).
+        
         Returns:
             DataFrame with track data
         """
+        # pandas is only needed here, so it is not imported at startup
+        import pandas as pd
+        
         try:
-            df = pd.read_csv(self.dataset_path)
+            with self._segment_lock():
+                self._manifest = self._current_manifest()
+                compacted = self._manifest['sequence'] if self._manifest else 0
+                df = pd.read_csv(self.dataset_path)
+                self._base_rows = len(df)
+                frames = []
+                self._sequence = compacted
+                for sequence, name in self._segment_files():
+                    if sequence > compacted:
+                        frames.append(pd.read_csv(os.path.join(self.segment_dir, name)))
+                        self._sequence = sequence
+            if frames:
+                df = pd.concat([df] + frames, ignore_index=True)
             # Handle missing values
             df = df.fillna(df.median(numeric_only=True))
             return df
         except Exception as e:
             raise RuntimeError(f"Failed to load dataset from {self.dataset_path}: {str(e)}")
     
-    def find_similar_tracks(self, features: dict, n: int = 5) -> list:
+    def find_similar_tracks(self, features: dict, n: int = 5, filters: dict = None) -> list:
         """
         Find n most similar tracks using cosine similarity
         
         Args:
             features: Dictionary of track features
             n: Number of similar tracks to return (between 3 and 10)
+            filters: Optional search filters (see normalize_filters); only
+                matching tracks are searched, so fewer than n may be returned
             
         Returns:
             List of similar tracks with metadata
+            
+        Raises:
+            ValueError: If a filter is invalid
+        """
+        return self.find_similar_tracks_batch([features], n, filters)[0]
+    
+    def find_similar_tracks_batch(self, queries: list, n: int = 5, filters: dict = None) -> list:
+        """
+        Find the n most similar tracks for each of many queries at once
+        
+        All queries are scored together as one blocked matrix product (see
+        similarity_top_k).
+        
+        Args:
+            queries: List of track feature dictionaries
+            n: Number of similar tracks per query (between 3 and 10)
+            filters: Optional search filters applied to every query
+            
+        Returns:
+            List with one list of similar tracks per query, in query order
+            
+        Raises:
+            ValueError: If a filter is invalid
         """
         # Ensure n is between 3 and 10
         n = max(3, min(10, n))
+        filters = self.normalize_filters(filters)
         
         # Extract feature values in the correct order
-        input_features = np.array([[features.get(col, 0) for col in self.feature_columns]])
+        input_features = np.array(
+            [[features.get(col, 0) for col in self.feature_columns] for features in queries], dtype=np.float64
+        ).reshape(len(queries), len(self.feature_columns))
+        
+        if self.executor is not None:
+            top_indices, top_scores = self.executor.similarity_top_k(input_features, n, filters)
+        else:
+            top_indices, top_scores = self.similarity_top_k(input_features, n, filters)
+        
+        # Build result lists
+        results = []
+        for query_indices, query_scores in zip(top_indices, top_scores):
+            similar_tracks = []
+            for idx, score in zip(query_indices, query_scores):
+                if idx < 0:
+                    break
+                similar_tracks.append(self._track_result(idx, score))
+            results.append(similar_tracks)
+        
+        return results
+    
+    def similar_to_track(self, track_id: str, n: int = 5) -> list:
+        """
+        Find the n tracks most similar to a catalog track
+        
+        Uses the precomputed neighbour graph when it covers the track (an O(k)
+        lookup), otherwise scores the track's features against the catalog.
+        Tracks ingested after the graph was built are not in it, so they are
+        scored exactly and merged into the graph's neighbours.
+        
+        Args:
+            track_id: ID of a track in the catalog
+            n: Number of similar tracks to return (between 3 and 10)
+            
+        Returns:
+            List of similar tracks with metadata, excluding the track itself
+            
+        Raises:
+            KeyError: If the track is not in the catalog
+        """
+        n = max(3, min(10, n))
+        row = self._row_by_id[track_id]
+        
+        neighbors = self.knn_neighbors
+        if neighbors is not None and row < len(neighbors) and neighbors.shape[1] >= n:
+            indices, scores = neighbors[row, :n].astype(np.int64), self.knn_scores[row, :n].astype(np.float64)
+            unit_features = self._unit_features
+            if len(unit_features) > len(neighbors):
+                added = np.arange(len(neighbors), len(unit_features))
+                added_scores = np.clip(unit_features[len(neighbors):] @ unit_features[row], -1.0, 1.0)
+                indices = np.concatenate([indices, added])
+                scores = np.concatenate([scores, added_scores])
+                # Most similar first (ties by catalog order)
+                order = np.lexsort((indices, -scores))[:n]
+                indices, scores = indices[order], scores[order]
+        else:
+            query = self.feature_matrix[row:row + 1]
+            if self.executor is not None:
+                indices, scores = self.executor.similarity_top_k(query, n + 1)
+            else:
+                indices, scores = self.similarity_top_k(query, n + 1)
+            keep = indices[0] != row
+            indices, scores = indices[0][keep][:n], scores[0][keep][:n]
+        
+        return [self._track_result(idx, score) for idx, score in zip(indices, scores) if idx >= 0]
+    
+    def search_tracks(self, query: str, limit: int = 10) -> list:
+        """
+        Find catalog tracks by name or artist as the user types
+        
+        Args:
+            query: Part of a track name or artist; prefixes and misspellings match
+            limit: Largest number of results
+            
+        Returns:
+            List of tracks with their id, metadata, match kind ('exact',
+            'prefix', 'word' or 'fuzzy'), match score and features, best first
+        """
+        results = []
+        for row, match, score in self._search_index.search(query, limit):
+            results.append({
+                'track_id': self.track_ids[row],
+                'track_name': self.track_names[row],
+                'artist': self.artists[row],
+                'match': match,
+                'score': score,
+                'features': dict(zip(self.feature_columns, self.feature_matrix[row]))
+            })
+        return results
+    
+    def _track_result(self, idx: int, score: float) -> dict:
+        """Result entry for a catalog row"""
+        return {
+            'track_name': self.track_names[idx],
+            'artist': self.artists[idx],
+            'similarity_score': score,
+            'features': dict(zip(self.feature_columns, self.feature_matrix[idx]))
+        }
+    
+    def _index_track_ids(self, track_ids: list, first_row: int):
+        for row, track_id in enumerate(track_ids, first_row):
+            if track_id is not None:
+                self._row_by_id.setdefault(track_id, row)
+    
+    def _load_knn_graph(self, path: str):
+        """Attach a neighbour graph if it was built for this catalog's rows"""
+        try:
+            neighbors, scores, digest = load_knn_graph(path)
+        except (OSError, ValueError, KeyError) as e:
+            raise RuntimeError(f"Failed to load k-NN graph from {path}: {str(e)}")
+        if len(neighbors) <= self.n_tracks and digest == catalog_digest(self.track_ids[:len(neighbors)]):
+            self.knn_neighbors, self.knn_scores = neighbors, scores
+    
+    def normalize_filters(self, filters: dict):
+        """
+        Validate search filters
+        
+        Args:
+            filters: Dictionary with any of genre (str), exclude_artists (str or
+                list of str), min_popularity and max_popularity (numbers) and
+                hits_only (bool)
+                
+        Returns:
+            Dictionary with only the filters that are set, or None
+            
+        Raises:
+            ValueError: If a filter is unknown, has the wrong type, or needs a
+                column the catalog does not have
+        """
+        if not filters:
+            return None
+        if not isinstance(filters, dict):
+            raise ValueError("filters must be an object")
+        unknown = set(filters) - {'genre', 'exclude_artists', 'min_popularity', 'max_popularity', 'hits_only'}
+        if unknown:
+            raise ValueError(f"Unknown filter: {sorted(unknown)[0]}")
+        
+        normalized = {}
+        if filters.get('genre') is not None:
+            if not isinstance(filters['genre'], str):
+                raise ValueError("genre must be a string")
+            if not self._genre_rows:
+                raise ValueError("The catalog has no genre information")
+            normalized['genre'] = filters['genre']
         
+        exclude = filters.get('exclude_artists')
+        if exclude:
+            if isinstance(exclude, str):
+                exclude = [exclude]
+            if not isinstance(exclude, list) or not all(isinstance(name, str) for name in exclude):
+                raise ValueError("exclude_artists must be a string or a list of strings")
+            normalized['exclude_artists'] = [name for value in exclude for name in _artist_names(value)]
+        
+        for key in ('min_popularity', 'max_popularity'):
+            if filters.get(key) is not None:
+                value = filters[key]
+                if isinstance(value, bool) or not isinstance(value, (int, float)) or not np.isfinite(value):
+                    raise ValueError(f"{key} must be a number")
+                normalized[key] = float(value)
+        
+        hits_only = filters.get('hits_only', False)
+        if not isinstance(hits_only, bool):
+            raise ValueError("hits_only must be true or false")
+        if hits_only:
+            normalized['hits_only'] = True
+        
+        if not self.has_popularity and ({'min_popularity', 'max_popularity', 'hits_only'} & set(normalized)):
+            raise ValueError("The catalog has no popularity information")
+        return normalized or None
+    
+    def _candidate_rows(self, filters: dict, n_rows: int) -> np.ndarray:
+        """
+        Rows (below n_rows, in ascending order) that pass the filters
+        
+        A genre filter starts from that genre's partition, so the remaining
+        predicates only look at its rows.
+        """
+        scores = self.popularity_scores
+        n_rows = min(n_rows, len(scores))
+        if 'genre' in filters:
+            rows = self._genre_rows.get(filters['genre'])
+            rows = np.empty(0, dtype=np.int64) if rows is None else rows[rows < n_rows]
+        else:
+            rows = None
+        
+        popularity = scores[:n_rows] if rows is None else scores[rows]
+        keep = np.ones(len(popularity), dtype=bool)
+        if 'min_popularity' in filters:
+            keep &= popularity >= filters['min_popularity']
+        if 'max_popularity' in filters:
+            keep &= popularity <= filters['max_popularity']
+        if filters.get('hits_only'):
+            keep &= popularity >= self.hit_threshold
+        for artist in filters.get('exclude_artists', ()):
+            artist_rows = self._artist_rows.get(artist)
+            if artist_rows is not None:
+                if rows is None:
+                    keep[artist_rows[artist_rows < n_rows]] = False
+                else:
+                    keep &= ~np.isin(rows, artist_rows)
+        return np.flatnonzero(keep) if rows is None else rows[keep]
+    
+    def similarity_top_k(self, query: np.ndarray, k: int, filters: dict = None):
+        """
+        Find the k most similar tracks for each query row using cosine similarity
+        
+        The query x catalog similarity matrix is computed in blocks of at most
+        SIMILARITY_BLOCK_BYTES, keeping the best k of each block with
+        argpartition, so peak memory does not grow with the number of queries
+        or the catalog size.
+        
+        Args:
+            query: Array of shape (n_queries, 13) of unscaled features
+            k: Number of tracks to return per query
+            filters: Normalized search filters (see normalize_filters); only
+                matching tracks are scored
+            
+        Returns:
+            Tuple of (indices, scores) arrays of shape (n_queries, k), most
+            similar first. When fewer than k tracks match, the remaining
+            entries have index -1 and score NaN.
+            
+        Raises:
+            DeadlineExceeded: If the request deadline passes during the scan
+        """
         # Scale the input features
-        input_scaled = self.scaler.transform(input_features)
-        
-        # Calculate cosine similarity with all tracks
-        similarities = cosine_similarity(input_scaled, self.scaled_features)[0]
-        
-        # Get indices of top n most similar tracks
-        top_indices = np.argsort(similarities)[-n:][::-1]
-        
-        # Build result list
-        similar_tracks = []
-        for idx in top_indices:
-            track = {
-                'track_name': self.df.iloc[idx].get('track_name', 'Unknown'),
-                'artist': self.df.iloc[idx].get('artists', 'Unknown'),
-                'similarity_score': float(similarities[idx]),
-                'features': {col: float(self.df.iloc[idx][col]) for col in self.feature_columns}
+        query_unit = _unit_rows(self.scaler.transform(query))
+        
+        # Candidate tracks: all of them, or those matching the filters
+        unit_features = self._unit_features
+        rows = self._candidate_rows(filters, len(unit_features)) if filters else None
+        n_candidates = len(unit_features) if rows is None else len(rows)
+        
+        n_queries = len(query_unit)
+        top_indices = np.full((n_queries, k), -1, dtype=np.int64)
+        top_scores = np.full((n_queries, k), np.nan)
+        if n_candidates == 0:
+            return top_indices, top_scores
+        
+        # Block shape: whole catalog rows per query block when they fit,
+        # otherwise one query at a time over catalog blocks
+        block_cells = max(SIMILARITY_BLOCK_BYTES // 8, k)
+        catalog_block = min(n_candidates, block_cells)
+        query_block = max(1, block_cells // catalog_block)
+        
+        for q_start in range(0, n_queries, query_block):
+            queries = query_unit[q_start:q_start + query_block]
+            best_indices = np.empty((len(queries), 0), dtype=np.int64)
+            best_scores = np.empty((len(queries), 0))
+            for c_start in range(0, n_candidates, catalog_block):
+                # Stop between blocks once the request has been given up on
+                check_deadline()
+                c_stop = min(c_start + catalog_block, n_candidates)
+                if rows is None:
+                    block = unit_features[c_start:c_stop]
+                    block_indices = np.arange(c_start, c_stop)
+                else:
+                    block_indices = rows[c_start:c_stop]
+                    block = unit_features[block_indices]
+                similarities = queries @ block.T
+                
+                # Keep this block's best k next to the best so far
+                if similarities.shape[1] > k:
+                    part = np.argpartition(-similarities, k - 1, axis=1)[:, :k]
+                    similarities = np.take_along_axis(similarities, part, axis=1)
+                    block_indices = block_indices[part]
+                else:
+                    block_indices = np.broadcast_to(block_indices, similarities.shape)
+                best_scores = np.concatenate([best_scores, similarities], axis=1)
+                best_indices = np.concatenate([best_indices, block_indices], axis=1)
+                if best_scores.shape[1] > k:
+                    part = np.argpartition(-best_scores, k - 1, axis=1)[:, :k]
+                    best_scores = np.take_along_axis(best_scores, part, axis=1)
+                    best_indices = np.take_along_axis(best_indices, part, axis=1)
+            
+            # Most similar first (ties by catalog order)
+            order = np.lexsort((best_indices, -best_scores), axis=1)
+            found = best_scores.shape[1]
+            q_stop = q_start + len(queries)
+            top_indices[q_start:q_stop, :found] = np.take_along_axis(best_indices, order, axis=1)
+            top_scores[q_start:q_stop, :found] = np.clip(np.take_along_axis(best_scores, order, axis=1), -1.0, 1.0)
+        return top_indices, top_scores
+    
+    def ingest_tracks(self, tracks: list) -> dict:
+        """
+        Append new tracks to the catalog
+        
+        The tracks are written as one delta segment, then appended to the
+        in-memory catalog, similarity matrices and indexes, so the cost grows
+        with the number of new tracks rather than the catalog size. Segments
+        written by other processes are applied first. Tracks whose track_id
+        is already in the catalog are skipped.
+        
+        Args:
+            tracks: List of track dictionaries with every feature column and
+                optionally track_id, track_name, artists and popularity
+                
+        Returns:
+            Dictionary with ingested and skipped counts, the catalog size and
+            the new dataset version
+            
+        Raises:
+            ValueError: If a track is missing a feature or has a non-numeric one
+            RuntimeError: If another process replaced the base dataset
+        """
+        import pandas as pd
+        
+        with self._ingest_lock:
+            with self._segment_lock(create=True):
+                synced = self._sync_locked()
+                rows = []
+                skipped = 0
+                seen = set()
+                for track in tracks:
+                    track_id = track.get('track_id')
+                    if track_id is not None and (track_id in self._row_by_id or track_id in seen):
+                        skipped += 1
+                        continue
+                    seen.add(track_id)
+                    rows.append({col: track.get(col) for col in self.columns})
+                
+                if rows:
+                    frame = pd.DataFrame(rows, columns=self.columns)
+                    try:
+                        features = frame[self.feature_columns].astype(np.float64)
+                    except (ValueError, TypeError):
+                        raise ValueError("Track features must be numeric")
+                    if features.isnull().any().any():
+                        raise ValueError("Tracks must include every feature")
+                    frame[self.feature_columns] = features
+                    
+                    if self._current_manifest() is None:
+                        # The first ingest records the manifest the segments build on
+                        self._write_manifest(self._manifest)
+                    sequence = self._sequence + 1
+                    self._write_segment(frame, sequence)
+                    self._apply_segment(frame, sequence)
+            
+            # Worker processes read the new segment from disk (they take the
+            # segment lock themselves)
+            if (rows or synced) and self.executor is not None:
+                self.executor.sync_catalog(self.n_tracks, self._sequence)
+            
+            result = {
+                'ingested': len(rows),
+                'skipped': skipped,
+                'total_tracks': self.n_tracks,
+                'dataset_version': self.version
             }
-            similar_tracks.append(track)
         
-        return similar_tracks
+        if rows and 0 < self.compact_after <= len(self._segment_files()):
+            threading.Thread(target=self.compact, name='catalog-compaction', daemon=True).start()
+        self._schedule_fold()
+        return result
+    
+    def sync_segments(self, sequence: int = None, n_tracks: int = None) -> int:
+        """
+        Apply tracks ingested by other processes since this service loaded
+        
+        Tracks come from newer delta segments, or from the end of the base
+        file for segments that were compacted in the meantime.
+        
+        Args:
+            sequence: Stop at this segment sequence (default: the latest)
+            n_tracks: Catalog size at that sequence (required with sequence)
+            
+        Returns:
+            Number of tracks in the catalog
+            
+        Raises:
+            RuntimeError: If another process replaced the base dataset
+        """
+        with self._ingest_lock:
+            with self._segment_lock():
+                synced = self._sync_locked(sequence, n_tracks)
+            if synced and self.executor is not None:
+                self.executor.sync_catalog(self.n_tracks, self._sequence)
+            n_tracks = self.n_tracks
+        if synced:
+            self._schedule_fold()
+        return n_tracks
+    
+    def _sync_locked(self, sequence: int = None, n_tracks: int = None) -> int:
+        """Apply newer tracks (see sync_segments) under both locks; returns the number applied"""
+        import pandas as pd
+        
+        applied = 0
+        manifest = self._current_manifest()
+        if (manifest['base_id'] != self._base_id if manifest is not None
+                else self._base_stat() != self._manifest['base_stat']):
+            raise RuntimeError("The base dataset was replaced; restart to load it")
+        if manifest is not None and manifest['sequence'] > self._sequence:
+            target = manifest['sequence'] if sequence is None else min(sequence, manifest['sequence'])
+            if target > self._sequence:
+                # Compacted rows follow the ones already loaded in the base file
+                end = manifest['base_rows'] if target == manifest['sequence'] else n_tracks
+                header = pd.read_csv(self.dataset_path, nrows=0).columns
+                frame = pd.read_csv(
+                    self.dataset_path, header=None, names=header,
+                    skiprows=self.n_tracks + 1, nrows=end - self.n_tracks
+                )
+                self._apply_segment(frame, target)
+                applied += len(frame)
+        
+        for segment_sequence, name in self._segment_files():
+            if segment_sequence > self._sequence and (sequence is None or segment_sequence <= sequence):
+                frame = pd.read_csv(os.path.join(self.segment_dir, name))
+                self._apply_segment(frame, segment_sequence)
+                applied += len(frame)
+        return applied
+    
+    def start_sync(self, interval: float):
+        """
+        Poll for tracks ingested by other processes every interval seconds
+        (on a daemon thread)
+        """
+        if self._sync_thread is None:
+            self._sync_thread = threading.Thread(
+                target=self._run_sync, args=(interval,), name='catalog-sync', daemon=True
+            )
+            self._sync_thread.start()
+        return self
+    
+    def stop_sync(self):
+        self._sync_stop.set()
+        if self._sync_thread is not None and self._sync_thread.is_alive():
+            self._sync_thread.join()
+    
+    def _run_sync(self, interval: float):
+        while not self._sync_stop.wait(interval):
+            try:
+                self.sync_segments()
+            except Exception as e:
+                print(f"Warning: Catalog sync failed, keeping the current catalog: {str(e)}")
+    
+    def compact(self) -> int:
+        """
+        Fold the delta segments into the base dataset file
+        
+        The in-memory catalog keeps its rows; its separate segment indexes
+        are merged (see fold_segments). The next process to load the dataset
+        reads a single file.
+        
+        Returns:
+            Number of segments folded in
+        """
+        import pandas as pd
+        
+        with self._compact_lock:
+            with self._segment_lock():
+                manifest = self._current_manifest()
+                compacted = manifest['sequence'] if manifest else 0
+                segments = [(sequence, name) for sequence, name in self._segment_files() if sequence > compacted]
+            if segments:
+                try:
+                    frames = [pd.read_csv(self.dataset_path)]
+                    frames += [pd.read_csv(os.path.join(self.segment_dir, name)) for _, name in segments]
+                except FileNotFoundError:
+                    # Another process compacted these segments first
+                    return 0
+                merged = pd.concat(frames, ignore_index=True)
+                temp_path = self.dataset_path + '.compacting'
+                merged.to_csv(temp_path, index=False)
+                stat = os.stat(temp_path)
+                
+                # Record the compaction, swap the base file and drop the folded
+                # segments under the lock, so a concurrent load or sync never
+                # sees the same rows twice
+                with self._segment_lock():
+                    if self._read_manifest() != manifest:
+                        # Another process compacted first
+                        os.remove(temp_path)
+                        return 0
+                    self._write_manifest(dict(
+                        manifest or self._manifest,
+                        base_stat=[stat.st_size, stat.st_mtime_ns],
+                        base_rows=len(merged),
+                        sequence=segments[-1][0]
+                    ))
+                    os.replace(temp_path, self.dataset_path)
+                    for _, name in segments:
+                        os.remove(os.path.join(self.segment_dir, name))
+        self.fold_segments()
+        return len(segments)
+    
+    def fold_segments(self) -> int:
+        """
+        Merge the per-segment side structures (sorted column blocks, genre and
+        artist groups, search index shards) into the base ones
+        
+        Ingestion appends to them in O(segment); this O(catalog) merge runs
+        after compaction or once FOLD_SEGMENTS segments are pending, off the
+        ingest lock.
+        
+        Returns:
+            Number of segments folded
+        """
+        with self._fold_lock:
+            base_rows, columns, blocks = self._sorted_state
+            if not blocks:
+                return 0
+            folded = {
+                index: np.sort(np.concatenate([column] + [block[:, index] for block in blocks]), kind='stable')
+                for index, column in columns.items()
+            }
+            self._genre_rows.fold()
+            self._artist_rows.fold()
+            self._search_index.fold()
+            with self._ingest_lock:
+                self._sorted_state = (
+                    base_rows + sum(len(block) for block in blocks),
+                    folded,
+                    self._sorted_state[2][len(blocks):]
+                )
+            return len(blocks)
+    
+    def _schedule_fold(self):
+        if len(self._sorted_state[2]) >= FOLD_SEGMENTS and not self._fold_lock.locked():
+            threading.Thread(target=self.fold_segments, name='catalog-fold', daemon=True).start()
+    
+    def _write_segment(self, frame, sequence: int):
+        """Persist a delta segment atomically"""
+        os.makedirs(self.segment_dir, exist_ok=True)
+        path = os.path.join(self.segment_dir, f'segment-{sequence:06d}.csv')
+        frame.to_csv(path + '.tmp', index=False)
+        os.replace(path + '.tmp', path)
+    
+    def _apply_segment(self, frame, sequence: int):
+        """Append a segment's rows to the in-memory catalog"""
+        features = frame[self.feature_columns].to_numpy(dtype=np.float64)
+        scaled = self.scaler.transform(features)
+        
+        # Metadata first and unit rows last: any index a similarity scan can
+        # return is already valid everywhere else
+        track_ids = self._column_values(frame, 'track_id', None)
+        self.track_ids.extend(track_ids)
+        self.track_names.extend(self._column_values(frame, 'track_name', 'Unknown'))
+        self.artists.extend(self._column_values(frame, 'artists', 'Unknown'))
+        self.feature_matrix = self._features.append(features)
+        self.scaled_features = self._scaled.append(scaled)
+        self._unit_features = self._unit.append(_unit_rows(scaled))
+        
+        # Filter structures after the unit rows, so a filter never selects a
+        # row the similarity scan cannot see yet. Each gets this segment as a
+        # separate part, merged later by fold_segments.
+        popularity = self._popularity(frame)
+        if popularity is None:
+            popularity = np.full(len(frame), np.nan)
+        self.popularity_scores = self._popularity_scores.append(popularity[:, None])[:, 0]
+        first_row = len(self.genres)
+        self._index_track_ids(track_ids, first_row)
+        genres = self._column_values(frame, 'track_genre', None)
+        self.genres.extend(genres)
+        self._genre_rows.add(_group_rows(genres, first_row))
+        artists = self._artist_lists(self._column_values(frame, 'artists', 'Unknown'))
+        self._artist_rows.add(_group_rows(artists, first_row))
+        self._search_index.add(self.track_names[first_row:], self.artists[first_row:], first_row)
+        
+        self._pending_frames.append(frame)
+        self._sequence = sequence
+        self.version = self._catalog_version()
+        if self._eda_accumulator is not None:
+            self._eda_accumulator.update(features, self._popularity(frame))
+        base_rows, columns, blocks = self._sorted_state
+        self._sorted_state = (base_rows, columns, blocks + (np.sort(features, axis=0),))
+        self._eda_cache = None
+    
+    @staticmethod
+    def _artist_lists(artists) -> list:
+        return [tuple(_artist_names(value)) for value in artists]
+    
+    @staticmethod
+    def _popularity(frame):
+        """Popularity scores as floats (NaN where missing), or None without the column"""
+        if 'popularity' not in frame.columns:
+            return None
+        import pandas as pd
+        return pd.to_numeric(frame['popularity'], errors='coerce').to_numpy(dtype=np.float64)
+    
+    def _shared_build(self, key, build):
+        """
+        Result of build(), run once per key on a background thread
+        
+        Builds fill caches that every later request uses (the EDA accumulator,
+        sorted columns), so they run outside any request deadline; a caller
+        only stops waiting at its own deadline. A failed build is retried by
+        the next caller.
+        
+        Raises:
+            DeadlineExceeded: If the caller's deadline passes first
+        """
+        with self._builds_lock:
+            future = self._builds.get(key)
+            if future is None:
+                future = self._builds[key] = concurrent.futures.Future()
+                threading.Thread(
+                    target=self._run_build, args=(key, future, build), name='catalog-build', daemon=True
+                ).start()
+        return wait_for(future)
+    
+    def _run_build(self, key, future, build):
+        try:
+            future.set_result(build())
+        except BaseException as e:
+            future.set_exception(e)
+        finally:
+            with self._builds_lock:
+                del self._builds[key]
+    
+    def _eda_statistics(self) -> EDAAccumulator:
+        """The catalog's EDA accumulator, built in chunks on first use"""
+        accumulator = self._eda_accumulator
+        if accumulator is None:
+            accumulator = self._shared_build('eda-statistics', self._build_eda_statistics)
+        return accumulator
+    
+    def _build_eda_statistics(self) -> EDAAccumulator:
+        # Ingestion updates the accumulator, so hold it off while building
+        with self._ingest_lock:
+            if self._eda_accumulator is None:
+                accumulator = EDAAccumulator(self.feature_columns)
+                popularity = self._popularity(self.df)
+                for start in range(0, self.n_tracks, EDA_CHUNK_ROWS):
+                    stop = start + EDA_CHUNK_ROWS
+                    accumulator.update(
+                        self.feature_matrix[start:stop],
+                        popularity[start:stop] if popularity is not None else None
+                    )
+                self._eda_accumulator = accumulator
+            return self._eda_accumulator
     
     def get_eda_data(self) -> dict:
         """
         Generate EDA statistics and distributions
         
+        Means, deviations, correlations and hit/miss counts come from one
+        chunked pass over the catalog (see app.eda_engine). Histograms and
+        quartiles come from the sorted feature columns, so everything is
+        exact; the engine's sketch estimates are only used by
+        compute_eda_file for data that does not fit in memory.
+        
         Returns:
             Dictionary with EDA data including distributions, correlations, and statistics
         """
-        # Calculate feature distributions (histograms)
-        feature_distributions = {}
-        for col in self.feature_columns:
-            hist, bin_edges = np.histogram(self.df[col].dropna(), bins=20)
-            feature_distributions[col] = {
-                'bins': bin_edges.tolist(),
-                'counts': hist.tolist()
+        eda_result = self._eda_cache
+        if eda_result is None:
+            accumulator = self._eda_statistics()
+            distributions = {}
+            for col in self.feature_columns:
+                histogram = self.feature_histogram(col, bins=20)
+                distributions[col] = {'bins': histogram['bins'], 'counts': histogram['counts']}
+            eda_result = self._eda_cache = {
+                'feature_distributions': distributions,
+                'correlations': {
+                    'features': self.feature_columns,
+                    'matrix': accumulator.correlation_matrix()
+                },
+                'summary_statistics': self.get_feature_statistics(),
+                'hit_miss_distribution': accumulator.hit_miss_distribution()
             }
+        return eda_result
+    
+    def get_feature_statistics(self) -> dict:
+        """
+        Calculate summary statistics for features
         
-        # Calculate correlation matrix
-        corr_matrix = self.df[self.feature_columns].corr()
-        correlations = {
-            'features': self.feature_columns,
-            'matrix': corr_matrix.values.tolist()
-        }
+        Returns:
+            Dictionary with feature statistics (mean, std, min, max, quartiles);
+            quartiles are exact, from the sorted feature columns
+        """
+        statistics = self._eda_statistics().summary_statistics()
+        for col in self.feature_columns:
+            q25, q50, q75 = self.feature_quantiles(col, [0.25, 0.50, 0.75])
+            statistics[col].update(q25=q25, q50=q50, q75=q75)
+        return statistics
+    
+    def _sorted_runs(self, feature: str) -> list:
+        """
+        A feature's values as sorted runs: the base column, then one run per
+        ingested segment not yet folded in
         
-        # Calculate summary statistics
-        summary_statistics = self.get_feature_statistics()
-        
-        # Calculate hit/miss distribution if popularity exists
-        hit_miss_distribution = {'hit': 0, 'miss': 0}
-        if 'popularity' in self.df.columns:
-            threshold = self.df['popularity'].quantile(0.70)
-            hits = (self.df['popularity'] >= threshold).sum()
-            misses = len(self.df) - hits
-            hit_miss_distribution = {
-                'hit': int(hits),
-                'miss': int(misses)
-            }
+        Raises:
+            ValueError: If the feature is unknown
+            DeadlineExceeded: If the request deadline passes while the column
+                is first sorted (the sort finishes for later requests)
+        """
+        if feature not in self.feature_columns:
+            raise ValueError(f"Unknown feature: {feature}")
+        index = self.feature_columns.index(feature)
+        base_rows, columns, blocks = self._sorted_state
+        column = columns.get(index)
+        if column is None:
+            column = self._shared_build(
+                ('sorted-column', index, base_rows), lambda: self._sort_column(index, base_rows)
+            )
+        return [column] + [block[:, index] for block in blocks]
+    
+    def _sort_column(self, index: int, base_rows: int) -> np.ndarray:
+        """Sort a column's base rows and publish them with the sorted state"""
+        state_rows, columns, _ = self._sorted_state
+        if state_rows == base_rows and index in columns:
+            return columns[index]
+        column = np.sort(self.feature_matrix[:base_rows, index])
+        with self._ingest_lock:
+            state = self._sorted_state
+            # Dropped if a fold moved the base on meanwhile
+            if state[0] == base_rows:
+                self._sorted_state = (base_rows, {**state[1], index: column}, state[2])
+        return column
+    
+    def feature_histogram(self, feature: str, bins: int = 20, value_range: tuple = None) -> dict:
+        """
+        Histogram of one feature at any resolution
         
+        Counts come from binary searches on the sorted runs, O(bins * log N),
+        and match np.histogram (the last bin includes its right edge).
+        
+        Args:
+            feature: Feature column name
+            bins: Number of equal-width bins (1 to MAX_HISTOGRAM_BINS)
+            value_range: (low, high) to bin over; defaults to the observed range
+                
+        Returns:
+            Dictionary with the feature, bin edges and counts
+            
+        Raises:
+            ValueError: If the feature is unknown or bins or range are invalid
+        """
+        runs = [run for run in self._sorted_runs(feature) if len(run)]
+        if not 1 <= bins <= MAX_HISTOGRAM_BINS:
+            raise ValueError(f"bins must be between 1 and {MAX_HISTOGRAM_BINS}")
+        if value_range is None:
+            low, high = float(min(run[0] for run in runs)), float(max(run[-1] for run in runs))
+            if low == high:
+                low, high = low - 0.5, high + 0.5
+        else:
+            low, high = value_range
+            if not low < high:
+                raise ValueError("range must be an increasing pair of values")
+        
+        edges = np.linspace(low, high, bins + 1)
+        positions = sum(np.searchsorted(run, edges, side='left') for run in runs)
+        positions[-1] = sum(np.searchsorted(run, high, side='right') for run in runs)
         return {
-            'feature_distributions': feature_distributions,
-            'correlations': correlations,
-            'summary_statistics': summary_statistics,
-            'hit_miss_distribution': hit_miss_distribution
+            'feature': feature,
+            'bins': edges,
+            'counts': np.diff(positions)
         }
     
-    def get_feature_statistics(self) -> dict:
+    def feature_quantiles(self, feature: str, quantiles) -> np.ndarray:
         """
-        Calculate summary statistics for features
+        Exact quantiles of one feature from its sorted runs
         
+        Args:
+            feature: Feature column name
+            quantiles: Quantiles between 0 and 1
+                
         Returns:
-            Dictionary with feature statistics (mean, std, min, max, quartiles)
+            Array of values, linearly interpolated as pandas and numpy do
+            
+        Raises:
+            ValueError: If the feature is unknown or a quantile is out of range
         """
-        statistics = {}
-        for col in self.feature_columns:
-            col_data = self.df[col].dropna()
-            statistics[col] = {
-                'mean': float(col_data.mean()),
-                'std': float(col_data.std()),
-                'min': float(col_data.min()),
-                'max': float(col_data.max()),
-                'q25': float(col_data.quantile(0.25)),
-                'q50': float(col_data.quantile(0.50)),
-                'q75': float(col_data.quantile(0.75))
-            }
-        
-        return statistics
+        runs = self._sorted_runs(feature)
+        quantiles = np.asarray(quantiles, dtype=np.float64)
+        if np.any((quantiles < 0) | (quantiles > 1)):
+            raise ValueError("quantiles must be between 0 and 1")
+        column = runs[0]
+        ingested = np.sort(np.concatenate(runs[1:])) if len(runs) > 1 else column[:0]
+        position = quantiles * (len(column) + len(ingested) - 1)
+        lower = np.floor(position).astype(np.int64)
+        upper = np.ceil(position).astype(np.int64)
+        if len(ingested):
+            lower_values = _order_statistics(column, ingested, lower)
+            upper_values = _order_statistics(column, ingested, upper)
+        else:
+            lower_values, upper_values = column[lower], column[upper]
+        return lower_values + (upper_values - lower_values) * (position - lower)
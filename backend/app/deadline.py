@@ -0,0 +1,165 @@
+"""
+Deadline Module
+Request deadlines (from a header or a per-endpoint default) that expensive
+scans check between blocks, so work for abandoned requests stops early
+"""
+import concurrent.futures
+import contextlib
+import contextvars
+import time
+
+from flask import request
+
+# Header a client can send to shorten its deadline, in milliseconds
+DEADLINE_HEADER = 'X-Request-Timeout-Ms'
+# WSGI environ key of the request's time.monotonic() arrival, set by servers
+# that queue requests before Flask sees them (see app.asgi)
+ARRIVAL_ENVIRON_KEY = 'app.arrival'
+
+# Absolute time.monotonic() deadline of the work running in this context
+_deadline = contextvars.ContextVar('deadline', default=None)
+
+
+class DeadlineExceeded(Exception):
+    """Raised when a request's deadline passes before its work is done"""
+
+
+def current_deadline():
+    """The deadline of the current context (time.monotonic() seconds), or None"""
+    return _deadline.get()
+
+
+def remaining():
+    """Seconds left until the current deadline, or None when there is none"""
+    deadline = _deadline.get()
+    return None if deadline is None else deadline - time.monotonic()
+
+
+def check_deadline():
+    """
+    Stop work whose deadline has passed
+
+    Raises:
+        DeadlineExceeded: If the current context has a deadline in the past
+    """
+    deadline = _deadline.get()
+    if deadline is not None and time.monotonic() >= deadline:
+        raise DeadlineExceeded("Request deadline exceeded")
+
+
+def wait_for(future):
+    """
+    Wait for shared work running outside the request (such as a cache build)
+    until the current deadline
+
+    The work is not cancelled: it keeps running, so a later request finds it
+    done.
+
+    Returns:
+        The future's result
+
+    Raises:
+        DeadlineExceeded: If the deadline passes first
+    """
+    timeout = remaining()
+    try:
+        return future.result(timeout=None if timeout is None else max(timeout, 0))
+    except concurrent.futures.TimeoutError:
+        raise DeadlineExceeded("Request deadline exceeded")
+
+
+def parse_timeouts(spec: str) -> dict:
+    """
+    Parse per-endpoint timeouts such as "similar_tracks_batch=30000,eda_data=20000"
+
+    Args:
+        spec: Comma-separated view=milliseconds entries
+
+    Returns:
+        Dictionary mapping view names to timeouts in seconds
+
+    Raises:
+        ValueError: If an entry is malformed
+    """
+    timeouts = {}
+    for entry in (spec or '').split(','):
+        entry = entry.strip()
+        if not entry:
+            continue
+        name, _, value = entry.partition('=')
+        try:
+            timeouts[name.strip()] = float(value) / 1000
+        except ValueError:
+            raise ValueError(f"Invalid request timeout: {entry!r} (expected view=milliseconds)")
+    return timeouts
+
+
+@contextlib.contextmanager
+def deadline_scope(deadline):
+    """
+    Run a block under an absolute deadline
+
+    time.monotonic() is system-wide, so a deadline can be handed to worker
+    processes and threads that do work on a request's behalf.
+
+    Args:
+        deadline: time.monotonic() seconds, or None for no deadline
+    """
+    token = _deadline.set(deadline)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+class RequestDeadlines:
+    def __init__(self, default_timeout: float = 10.0, timeouts: dict = None):
+        """
+        Initialize request deadlines
+
+        Args:
+            default_timeout: Seconds a request may take (0 for no deadline)
+            timeouts: View names mapped to their own timeout in seconds
+        """
+        self.default_timeout = default_timeout
+        self.timeouts = dict(timeouts or {})
+
+    def init_app(self, app):
+        """
+        Register request deadlines on a Flask application
+
+        Register before admission control, so time spent queued counts
+        against the deadline.
+        """
+        app.extensions['deadlines'] = self
+        app.before_request(self.start)
+        app.teardown_request(self.finish)
+
+    def timeout_for(self, view: str, header: str = None):
+        """
+        Timeout of a request in seconds, or None when it has no deadline
+
+        A client may shorten, but not extend, the endpoint's timeout.
+        """
+        timeout = self.timeouts.get(view, self.default_timeout)
+        timeout = timeout if timeout and timeout > 0 else None
+        if header:
+            try:
+                requested = float(header) / 1000
+            except ValueError:
+                requested = None
+            if requested is not None and requested > 0:
+                timeout = requested if timeout is None else min(timeout, requested)
+        return timeout
+
+    def start(self):
+        """Set the deadline of the current request, counted from its arrival"""
+        if request.endpoint is None:
+            return None
+        timeout = self.timeout_for(request.endpoint.rpartition('.')[2], request.headers.get(DEADLINE_HEADER))
+        arrival = request.environ.get(ARRIVAL_ENVIRON_KEY) or time.monotonic()
+        _deadline.set(None if timeout is None else arrival + timeout)
+        return None
+
+    def finish(self, exc=None):
+        _deadline.set(None)
@@ -0,0 +1,336 @@
+"""
+EDA Engine Module
+Single-pass, chunked exploratory statistics built from mergeable accumulators:
+moments and co-moments for means, deviations and correlations, fine
+fixed-range histograms, KLL quantile sketches and exact popularity counts.
+Accumulators built over separate chunks or processes merge into the same result.
+"""
+import math
+
+import numpy as np
+
+# Histogram domain per feature, covering typical values; values outside go to
+# a KLL sketch, exact until it first compacts, so memory stays bounded however
+# much of the data leaves the domain
+HISTOGRAM_RANGES = {
+    'tempo': (0, 250),
+    'energy': (0.0, 1.0),
+    'danceability': (0.0, 1.0),
+    'loudness': (-60, 5),
+    'valence': (0.0, 1.0),
+    'acousticness': (0.0, 1.0),
+    'instrumentalness': (0.0, 1.0),
+    'liveness': (0.0, 1.0),
+    'speechiness': (0.0, 1.0),
+    'duration_ms': (0, 1200000),
+    'key': (0, 11),
+    'mode': (0, 1),
+    'time_signature': (3, 7)
+}
+
+# Fine bins per feature; rebinned to the requested histogram at the end
+FINE_BINS = 16384
+# Popularity is an integer score from 0 to 100
+MAX_POPULARITY = 100
+# Share of tracks counted as misses (hits are the top 30% by popularity)
+HIT_QUANTILE = 0.70
+
+
+class KLLSketch:
+    def __init__(self, k: int = 256, seed=None):
+        """
+        Initialize a KLL quantile sketch
+
+        Level h holds items of weight 2**h. A full level is sorted and every
+        other item (random offset) is promoted, so rank error stays around
+        1/k with O(k) memory however many values are added.
+
+        Args:
+            k: Capacity of the top level; larger is more accurate
+            seed: Seed for the compaction coin flips
+        """
+        self.k = k
+        self.levels = [np.empty(0)]
+        self.compacted = False
+        self._rng = np.random.default_rng(seed)
+
+    def __len__(self) -> int:
+        return sum(len(level) << h for h, level in enumerate(self.levels))
+
+    def _capacity(self, level: int) -> int:
+        depth = len(self.levels) - level - 1
+        return int(math.ceil(self.k * (2 / 3) ** depth)) + 1
+
+    def _max_size(self) -> int:
+        return sum(self._capacity(h) for h in range(len(self.levels)))
+
+    def update(self, values: np.ndarray):
+        """Add a batch of values"""
+        values = np.asarray(values, dtype=np.float64).ravel()
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self._compress()
+
+    def merge(self, other: 'KLLSketch'):
+        """Fold another sketch into this one"""
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0))
+        for h, level in enumerate(other.levels):
+            self.levels[h] = np.concatenate([self.levels[h], level])
+        self.compacted = self.compacted or other.compacted
+        self._compress()
+
+    def _compress(self):
+        while sum(len(level) for level in self.levels) >= self._max_size():
+            for h in range(len(self.levels)):
+                if len(self.levels[h]) >= self._capacity(h):
+                    if h + 1 == len(self.levels):
+                        self.levels.append(np.empty(0))
+                    items = np.sort(self.levels[h])
+                    # An odd item out stays behind at this level
+                    keep = items[-1:] if len(items) % 2 else items[:0]
+                    items = items[:len(items) - len(keep)]
+                    offset = int(self._rng.integers(2))
+                    self.levels[h + 1] = np.concatenate([self.levels[h + 1], items[offset::2]])
+                    self.levels[h] = keep
+                    self.compacted = True
+                    break
+
+    def weighted_items(self):
+        """Held items and the number of values each stands for"""
+        items = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(level), 1 << h) for h, level in enumerate(self.levels)])
+        return items, weights
+
+    def quantiles(self, qs) -> np.ndarray:
+        """
+        Estimate quantiles
+
+        Until the first compaction every value is held, and the result matches
+        linear interpolation (as numpy and pandas compute it).
+        """
+        if not self.compacted:
+            return np.quantile(self.levels[0], qs)
+        items, weights = self.weighted_items()
+        order = np.argsort(items, kind='stable')
+        items, cumulative = items[order], np.cumsum(weights[order])
+        ranks = np.asarray(qs) * (cumulative[-1] - 1)
+        return items[np.minimum(np.searchsorted(cumulative, ranks, side='right'), len(items) - 1)]
+
+
+class EDAAccumulator:
+    def __init__(self, feature_columns, ranges=None, fine_bins: int = FINE_BINS,
+                 sketch_k: int = 256, seed: int = 0):
+        """
+        Initialize an empty accumulator
+
+        Args:
+            feature_columns: Feature names, in the column order of update()
+            ranges: Histogram domain per feature (defaults to HISTOGRAM_RANGES)
+            fine_bins: Fine histogram bins per feature
+            sketch_k: KLL sketch size per feature
+            seed: Seed for the sketches
+        """
+        ranges = ranges or HISTOGRAM_RANGES
+        self.feature_columns = list(feature_columns)
+        n_features = len(self.feature_columns)
+        self.fine_bins = fine_bins
+        self.lows = np.array([ranges[col][0] for col in self.feature_columns], dtype=np.float64)
+        self.highs = np.array([ranges[col][1] for col in self.feature_columns], dtype=np.float64)
+
+        self.count = 0
+        self.mean = np.zeros(n_features)
+        self.comoment = np.zeros((n_features, n_features))
+        self.minimum = np.full(n_features, np.inf)
+        self.maximum = np.full(n_features, -np.inf)
+        self.fine_counts = np.zeros((n_features, fine_bins), dtype=np.int64)
+        self.sketches = [KLLSketch(sketch_k, seed=seed + i) for i in range(n_features)]
+        # Values outside the histogram domain
+        self.outliers = [KLLSketch(sketch_k, seed=seed + n_features + i) for i in range(n_features)]
+        self.popularity_counts = np.zeros(MAX_POPULARITY + 1, dtype=np.int64)
+        self.unrated = 0
+
+    def update(self, features: np.ndarray, popularity: np.ndarray = None):
+        """
+        Add a chunk of rows
+
+        Rows with a missing feature are skipped.
+
+        Args:
+            features: Array of shape (n_rows, n_features)
+            popularity: Popularity scores for the same rows (optional)
+        """
+        X = np.asarray(features, dtype=np.float64)
+        complete = ~np.isnan(X).any(axis=1)
+        if popularity is not None:
+            popularity = np.asarray(popularity, dtype=np.float64)
+            rated = ~np.isnan(popularity)
+            self.unrated += int(len(popularity) - rated.sum())
+            popularity = popularity[rated]
+            scores = np.clip(np.rint(popularity), 0, MAX_POPULARITY).astype(np.int64)
+            self.popularity_counts += np.bincount(scores, minlength=MAX_POPULARITY + 1)
+        X = X[complete]
+        if len(X) == 0:
+            return
+
+        # Chunk moments, merged like any other partial result
+        chunk_mean = X.mean(axis=0)
+        centered = X - chunk_mean
+        self._merge_moments(len(X), chunk_mean, centered.T @ centered, X.min(axis=0), X.max(axis=0))
+
+        # Fine histograms, all features in one bincount
+        position = (X - self.lows) / (self.highs - self.lows) * self.fine_bins
+        inside = (X >= self.lows) & (X <= self.highs)
+        bins = np.clip(position, 0, self.fine_bins - 1).astype(np.int64)
+        offsets = np.arange(X.shape[1]) * self.fine_bins
+        flat = (bins + offsets)[inside]
+        self.fine_counts += np.bincount(flat, minlength=self.fine_counts.size).reshape(self.fine_counts.shape)
+        for i in np.flatnonzero(~inside.all(axis=0)):
+            self.outliers[i].update(X[~inside[:, i], i])
+
+        for i, sketch in enumerate(self.sketches):
+            sketch.update(X[:, i])
+
+    def merge(self, other: 'EDAAccumulator') -> 'EDAAccumulator':
+        """Fold another accumulator (same features and domains) into this one"""
+        if other.count:
+            self._merge_moments(other.count, other.mean, other.comoment, other.minimum, other.maximum)
+        self.fine_counts += other.fine_counts
+        for sketch, other_sketch in zip(self.sketches + self.outliers, other.sketches + other.outliers):
+            sketch.merge(other_sketch)
+        self.popularity_counts += other.popularity_counts
+        self.unrated += other.unrated
+        return self
+
+    def _merge_moments(self, count, mean, comoment, minimum, maximum):
+        """Combine co-moments of two row sets (Chan et al. pairwise update)"""
+        total = self.count + count
+        delta = mean - self.mean
+        self.comoment = self.comoment + comoment + np.outer(delta, delta) * (self.count * count / total)
+        self.mean = self.mean + delta * (count / total)
+        self.count = total
+        self.minimum = np.minimum(self.minimum, minimum)
+        self.maximum = np.maximum(self.maximum, maximum)
+
+    def histograms(self, bins: int = 20) -> dict:
+        """Equal-width histograms over each feature's observed range"""
+        distributions = {}
+        centers = (np.arange(self.fine_bins) + 0.5) / self.fine_bins
+        for i, col in enumerate(self.feature_columns):
+            low, high = self.minimum[i], self.maximum[i]
+            if low == high:
+                # Same convention as np.histogram for a constant column
+                low, high = low - 0.5, high + 0.5
+            edges = np.linspace(low, high, bins + 1)
+            values = self.lows[i] + centers * (self.highs[i] - self.lows[i])
+            coarse = np.clip(((values - low) / (high - low) * bins).astype(np.int64), 0, bins - 1)
+            counts = np.bincount(coarse, weights=self.fine_counts[i], minlength=bins).astype(np.int64)
+            if len(self.outliers[i]):
+                items, weights = self.outliers[i].weighted_items()
+                counts += np.histogram(items, bins=edges, weights=weights)[0].astype(np.int64)
+            distributions[col] = {'bins': edges, 'counts': counts}
+        return distributions
+
+    def correlation_matrix(self) -> np.ndarray:
+        with np.errstate(divide='ignore', invalid='ignore'):
+            deviation = np.sqrt(np.diag(self.comoment))
+            return self.comoment / np.outer(deviation, deviation)
+
+    def summary_statistics(self) -> dict:
+        std = np.sqrt(np.diag(self.comoment) / (self.count - 1)) if self.count > 1 else np.full(len(self.mean), np.nan)
+        statistics = {}
+        for i, col in enumerate(self.feature_columns):
+            q25, q50, q75 = self.sketches[i].quantiles([0.25, 0.50, 0.75])
+            statistics[col] = {
+                'mean': self.mean[i],
+                'std': std[i],
+                'min': self.minimum[i],
+                'max': self.maximum[i],
+                'q25': q25,
+                'q50': q50,
+                'q75': q75
+            }
+        return statistics
+
+    def hit_miss_distribution(self) -> dict:
+        """
+        Hits are tracks at or above the HIT_QUANTILE popularity quantile;
+        tracks without a popularity score count as misses
+        """
+        total = int(self.popularity_counts.sum())
+        if total == 0:
+            return {'hit': 0, 'miss': self.unrated}
+        # Exact linearly interpolated quantile from the value counts
+        cumulative = np.cumsum(self.popularity_counts)
+        position = HIT_QUANTILE * (total - 1)
+        lower = np.searchsorted(cumulative, math.floor(position), side='right')
+        upper = np.searchsorted(cumulative, math.ceil(position), side='right')
+        threshold = lower + (upper - lower) * (position - math.floor(position))
+        hits = int(self.popularity_counts[int(math.ceil(threshold)):].sum())
+        return {'hit': hits, 'miss': total + self.unrated - hits}
+
+    def result(self, bins: int = 20) -> dict:
+        """EDA payload in the /api/eda-data format"""
+        return {
+            'feature_distributions': self.histograms(bins),
+            'correlations': {
+                'features': self.feature_columns,
+                'matrix': self.correlation_matrix()
+            },
+            'summary_statistics': self.summary_statistics(),
+            'hit_miss_distribution': self.hit_miss_distribution()
+        }
+
+
+def _accumulate_chunk(args) -> EDAAccumulator:
+    """Build an accumulator for one chunk (runs in a worker process)"""
+    feature_columns, features, popularity, seed = args
+    accumulator = EDAAccumulator(feature_columns, seed=seed)
+    accumulator.update(features, popularity)
+    return accumulator
+
+
+def compute_eda_file(path: str, feature_columns, chunksize: int = 100000,
+                     processes: int = 1, bins: int = 20) -> dict:
+    """
+    Compute the EDA payload for a CSV file in one chunked pass
+
+    Memory use is bounded by the chunk size, so the file may be larger than RAM.
+
+    Args:
+        path: Dataset CSV path
+        feature_columns: Feature columns to analyse
+        chunksize: Rows read per chunk
+        processes: Worker processes that build per-chunk accumulators (1 runs inline)
+        bins: Histogram bins per feature
+
+    Returns:
+        Dictionary in the /api/eda-data format
+    """
+    import pandas as pd
+
+    feature_columns = list(feature_columns)
+
+    def chunks():
+        reader = pd.read_csv(path, chunksize=chunksize)
+        for index, chunk in enumerate(reader):
+            popularity = chunk['popularity'].to_numpy(dtype=np.float64) if 'popularity' in chunk else None
+            yield feature_columns, chunk[feature_columns].to_numpy(dtype=np.float64), popularity, index
+
+    total = EDAAccumulator(feature_columns)
+    if processes <= 1:
+        for _, features, popularity, _ in chunks():
+            total.update(features, popularity)
+        return total.result(bins)
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        # Keep a bounded number of chunks in flight
+        pending = []
+        for args in chunks():
+            pending.append(executor.submit(_accumulate_chunk, args))
+            if len(pending) >= 2 * processes:
+                total.merge(pending.pop(0).result())
+        for future in pending:
+            total.merge(future.result())
+    return total.result(bins)
@@ -0,0 +1,103 @@
+"""
+JSON Provider Module
+Fast JSON serialization for API responses with native NumPy support
+"""
+import numpy as np
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # orjson is optional, fall back to the stdlib encoder
+    orjson = None
+
+
+def _numpy_default(obj):
+    """
+    Convert NumPy values the fast path could not serialize
+
+    Args:
+        obj: Object that is not natively JSON serializable
+
+    Returns:
+        JSON-compatible Python equivalent of the object
+    """
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    if isinstance(obj, np.generic):
+        return obj.item()
+    return DefaultJSONProvider.default(obj)
+
+
+class NumpyJSONProvider(DefaultJSONProvider):
+    """
+    Flask JSON provider backed by orjson
+
+    NumPy arrays and scalars are serialized directly, so services can return
+    them without ``.tolist()``/``float()`` conversions. When orjson is not
+    installed the stdlib encoder is used with an equivalent NumPy fallback.
+    """
+
+    def _orjson_options(self, indent: bool = False) -> int:
+        """Build the orjson option flags matching the provider settings"""
+        option = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return option
+
+    def _dumps_bytes(self, obj, indent: bool = False) -> bytes:
+        """Serialize an object to UTF-8 JSON bytes"""
+        if orjson is not None:
+            try:
+                return orjson.dumps(obj, default=_numpy_default, option=self._orjson_options(indent))
+            except TypeError:
+                # Values orjson rejects (e.g. integers wider than 64 bits) take the slow path
+                pass
+        kwargs = {'default': _numpy_default}
+        if indent:
+            kwargs['indent'] = 2
+        return super().dumps(obj, **kwargs).encode('utf-8')
+
+    def dumps(self, obj, **kwargs) -> str:
+        """
+        Serialize data as JSON
+
+        Args:
+            obj: The data to serialize
+            **kwargs: Passed to :func:`json.dumps`; forces the stdlib encoder
+
+        Returns:
+            JSON string
+        """
+        if kwargs:
+            kwargs.setdefault('default', _numpy_default)
+            return super().dumps(obj, **kwargs)
+        return self._dumps_bytes(obj).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        """
+        Deserialize data as JSON
+
+        Args:
+            s: Text or UTF-8 bytes
+            **kwargs: Passed to :func:`json.loads`; forces the stdlib decoder
+
+        Returns:
+            Deserialized Python object
+        """
+        if orjson is not None and not kwargs:
+            return orjson.loads(s)
+        return super().loads(s, **kwargs)
+
+    def response(self, *args, **kwargs):
+        """
+        Serialize the given arguments as JSON and return a response
+
+        Serializes straight to bytes instead of building an intermediate string.
+        """
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        return self._app.response_class(
+            self._dumps_bytes(obj, indent=indent) + b'\n', mimetype=self.mimetype
+        )
@@ -0,0 +1,113 @@
+"""
+k-NN Graph Module
+Offline nearest-neighbour graph over the catalog, stored as compact arrays
+(int32 neighbour rows and float16 cosine similarities) for O(k) lookups
+"""
+import hashlib
+import os
+import tempfile
+
+import numpy as np
+
+# Size of one block of the row x catalog similarity matrix
+GRAPH_BLOCK_BYTES = 64 * 1024 * 1024
+
+# Unit-length catalog rows, memory-mapped in each worker process
+_worker_features = None
+
+
+def catalog_digest(track_ids) -> str:
+    """Identifies the catalog rows a graph was built for (by their track ids, in order)"""
+    digest = hashlib.sha256()
+    for track_id in track_ids:
+        digest.update(str(track_id).encode('utf-8'))
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+
+def _neighbors_for_rows(features: np.ndarray, start: int, stop: int, k: int):
+    """Top k neighbours (excluding the row itself) of rows start..stop"""
+    block_rows = max(1, GRAPH_BLOCK_BYTES // (8 * len(features)))
+    neighbors = np.empty((stop - start, k), dtype=np.int32)
+    scores = np.empty((stop - start, k), dtype=np.float16)
+    for block_start in range(start, stop, block_rows):
+        block_stop = min(block_start + block_rows, stop)
+        similarities = features[block_start:block_stop] @ features.T
+        rows = np.arange(block_stop - block_start)
+        similarities[rows, rows + block_start] = -np.inf
+
+        top = np.argpartition(-similarities, k - 1, axis=1)[:, :k]
+        top_scores = np.take_along_axis(similarities, top, axis=1)
+        order = np.lexsort((top, -top_scores), axis=1)
+        neighbors[block_start - start:block_stop - start] = np.take_along_axis(top, order, axis=1)
+        scores[block_start - start:block_stop - start] = np.clip(np.take_along_axis(top_scores, order, axis=1), -1.0, 1.0)
+    return neighbors, scores
+
+
+def _init_worker(features_path: str):
+    global _worker_features
+    _worker_features = np.load(features_path, mmap_mode='r')
+
+
+def _worker_neighbors(args):
+    start, stop, k = args
+    return start, _neighbors_for_rows(_worker_features, start, stop, k)
+
+
+def build_knn_graph(unit_features: np.ndarray, k: int = 10, processes: int = 1):
+    """
+    Compute every track's k nearest neighbours by cosine similarity
+
+    Rows are processed in blocks of at most GRAPH_BLOCK_BYTES of similarities.
+    With several processes, the catalog is shared through a memory-mapped
+    temporary file and each process handles a range of rows.
+
+    Args:
+        unit_features: Catalog rows scaled to unit length, shape (n_tracks, n_features)
+        k: Neighbours per track
+        processes: Worker processes (1 runs inline)
+
+    Returns:
+        Tuple of (neighbors, scores): int32 and float16 arrays of shape
+        (n_tracks, k), most similar first
+    """
+    unit_features = np.ascontiguousarray(unit_features, dtype=np.float64)
+    n_tracks = len(unit_features)
+    k = min(k, n_tracks - 1)
+    if k < 1:
+        raise ValueError("The catalog needs at least two tracks")
+    if processes <= 1:
+        return _neighbors_for_rows(unit_features, 0, n_tracks, k)
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    neighbors = np.empty((n_tracks, k), dtype=np.int32)
+    scores = np.empty((n_tracks, k), dtype=np.float16)
+    ranges = np.linspace(0, n_tracks, 4 * processes + 1).astype(int)
+    with tempfile.TemporaryDirectory() as directory:
+        features_path = os.path.join(directory, 'features.npy')
+        np.save(features_path, unit_features)
+        with ProcessPoolExecutor(processes, initializer=_init_worker, initargs=(features_path,)) as executor:
+            tasks = [(start, stop, k) for start, stop in zip(ranges[:-1], ranges[1:]) if stop > start]
+            for start, (rows_neighbors, rows_scores) in executor.map(_worker_neighbors, tasks):
+                neighbors[start:start + len(rows_neighbors)] = rows_neighbors
+                scores[start:start + len(rows_scores)] = rows_scores
+    return neighbors, scores
+
+
+def save_knn_graph(path: str, neighbors: np.ndarray, scores: np.ndarray, track_ids):
+    """Write a graph with the digest of the catalog rows it covers"""
+    temp_path = path + '.tmp.npz'
+    np.savez(temp_path, neighbors=neighbors, scores=scores, catalog_digest=np.array(catalog_digest(track_ids)))
+    os.replace(temp_path, path)
+
+
+def load_knn_graph(path: str):
+    """
+    Read a graph written by save_knn_graph
+
+    Returns:
+        Tuple of (neighbors, scores, catalog_digest)
+    """
+    with np.load(path, allow_pickle=False) as arrays:
+        return arrays['neighbors'], arrays['scores'], str(arrays['catalog_digest'])
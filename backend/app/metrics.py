@@ -0,0 +1,120 @@
+"""
+Metrics Module
+Thread-safe in-process counters, gauges and histograms exposed at /api/metrics
+"""
+import bisect
+import threading
+
+# Default histogram buckets (upper bounds); suitable for millisecond latencies
+DEFAULT_BUCKETS = (0.5, 1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+class Counter:
+    def __init__(self):
+        self._value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1):
+        with self._lock:
+            self._value += amount
+
+    def snapshot(self):
+        return self._value
+
+
+class Gauge:
+    def __init__(self):
+        self._value = 0
+        self._lock = threading.Lock()
+
+    def set(self, value):
+        with self._lock:
+            self._value = value
+
+    def inc(self, amount: float = 1):
+        with self._lock:
+            self._value += amount
+
+    def dec(self, amount: float = 1):
+        with self._lock:
+            self._value -= amount
+
+    def snapshot(self):
+        return self._value
+
+
+class Histogram:
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        """
+        Initialize the histogram
+
+        Args:
+            buckets: Sorted bucket upper bounds; an overflow bucket is added
+        """
+        self.buckets = tuple(buckets)
+        self._counts = [0] * (len(self.buckets) + 1)
+        self._count = 0
+        self._sum = 0.0
+        self._max = None
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self._counts[index] += 1
+            self._count += 1
+            self._sum += value
+            if self._max is None or value > self._max:
+                self._max = value
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            bounds = [str(bound) for bound in self.buckets] + ['+Inf']
+            return {
+                'count': self._count,
+                'sum': self._sum,
+                'mean': self._sum / self._count if self._count else 0.0,
+                'max': self._max,
+                'buckets': dict(zip(bounds, self._counts))
+            }
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, name: str, factory):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = factory()
+                self._metrics[name] = metric
+            return metric
+
+    def counter(self, name: str) -> Counter:
+        """Get or create a counter"""
+        return self._get_or_create(name, Counter)
+
+    def gauge(self, name: str) -> Gauge:
+        """Get or create a gauge"""
+        return self._get_or_create(name, Gauge)
+
+    def histogram(self, name: str, buckets=DEFAULT_BUCKETS) -> Histogram:
+        """Get or create a histogram"""
+        return self._get_or_create(name, lambda: Histogram(buckets))
+
+    def snapshot(self) -> dict:
+        """
+        Get the current value of every metric
+
+        Returns:
+            Dictionary mapping metric names to their current values
+        """
+        with self._lock:
+            metrics = dict(self._metrics)
+        return {name: metrics[name].snapshot() for name in sorted(metrics)}
+
+
+# Process-wide registry used by the services and routes
+metrics = MetricsRegistry()
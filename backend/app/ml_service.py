@@ -2,47 +2,190 @@
 ML Service Module
 Handles model loading and prediction logic
 """
-import joblib
+import hashlib
 import numpy as np
 import os
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from functools import partial
+
+from app.artifacts import PREPROCESS_NAME, load_booster_model, load_preprocessor, verify_bundle
+from app.batching import MicroBatcher
+
+# Input features behind each engineered column (build_feature_matrix order); an
+# engineered column's contribution is split evenly between its inputs
+ENGINEERED_INPUTS = [
+    ('energy', 'loudness'),
+    ('danceability', 'energy'),
+    ('valence', 'energy'),
+    ('acousticness', 'instrumentalness'),
+    ('energy',),
+    ('danceability',),
+    ('loudness',),
+    ('duration_ms',),
+    ('speechiness', 'instrumentalness'),
+    ('liveness',)
+]
+
+
+def _joblib_load(path: str):
+    """Unpickle an artifact (joblib is imported on first use, not at startup)"""
+    import joblib
+    return joblib.load(path)
+
 
 class ModelService:
-    def __init__(self, model_path: str, scaler_path: str = None, genre_encoder_path: str = None):
+    def __init__(self, model_path: str, scaler_path: str = None, genre_encoder_path: str = None,
+                 batching: bool = False, max_batch_size: int = 32, max_wait_ms: float = 2.0,
+                 executor=None, shadow=None, fast_model_path: str = None,
+                 default_tier: str = 'full', explanation_cache_size: int = 100000):
         """
         Initialize the model service
         
         Args:
-            model_path: Path to the trained model file
-            scaler_path: Path to the scaler file (optional)
-            genre_encoder_path: Path to the genre encoder file (optional)
+            model_path: Path to the trained model file (.pkl, or .ubj from the native bundle)
+            scaler_path: Path to the scaler file (optional; .pkl or the bundle's preprocess.npz)
+            genre_encoder_path: Path to the genre encoder file (optional; the bundle
+                stores genre classes in preprocess.npz)
+            batching: Coalesce concurrent predict() calls into batched model calls
+            max_batch_size: Largest number of requests per batched call
+            max_wait_ms: Longest time a request waits for others to join its batch
+            executor: Optional InferencePool that runs model evaluation in worker processes
+            shadow: Optional ShadowScorer that compares a candidate model on the same inputs
+            fast_model_path: Path to the distilled fast-tier model (optional)
+            default_tier: Tier used when a request does not ask for one
+            explanation_cache_size: Most explanations kept per tier (the least
+                recently used are dropped)
         """
         self.model_path = model_path
-        self.scaler_path = scaler_path or model_path.replace('model.pkl', 'scaler.pkl')
+        if scaler_path:
+            self.scaler_path = scaler_path
+        elif model_path.endswith('.ubj'):
+            self.scaler_path = os.path.join(os.path.dirname(model_path), PREPROCESS_NAME)
+        else:
+            self.scaler_path = model_path.replace('model.pkl', 'scaler.pkl')
         self.genre_encoder_path = genre_encoder_path
         
-        self.model = self._load_model()
-        self.scaler = self._load_scaler()
-        self.genre_encoder = self._load_genre_encoder() if genre_encoder_path else None
-        
         # Base feature columns (must match training order)
         self.base_features = [
             'tempo', 'energy', 'danceability', 'loudness', 'valence',
             'acousticness', 'instrumentalness', 'liveness', 'speechiness',
             'duration_ms', 'key', 'mode', 'time_signature'
         ]
+        
+        self.model = self._load_model()
+        self.scaler = self._load_scaler()
+        if genre_encoder_path:
+            self.genre_encoder = self._load_genre_encoder()
+        else:
+            self.genre_encoder = getattr(self.scaler, 'genre_encoder', None)
+        self.executor = executor
+        self.shadow = shadow
+        
+        # Models by tier; every tier shares the scaler and genre encoder
+        self.model_paths = {'full': model_path}
+        self.models = {'full': self.model}
+        if fast_model_path:
+            self.model_paths['fast'] = fast_model_path
+            self.models['fast'] = self._load_model(fast_model_path)
+        if default_tier not in self.models:
+            raise ValueError(f"Model tier not available: {default_tier}")
+        self.default_tier = default_tier
+        
+        # Native bundle files must match their manifest
+        if model_path.endswith('.ubj'):
+            verify_bundle(list(self.model_paths.values()) + [self.scaler_path], self.base_features)
+        
+        # Content hash of each tier's artifacts, reported with every prediction
+        self.versions = {tier: self._compute_version(tier) for tier in self.models}
+        self.version = self.versions['full']
+        
+        # Requests currently using this service (drained before close)
+        self._active = 0
+        self._active_cond = threading.Condition()
+        
+        # Explanations by (tier, version): base feature row bytes -> (probabilities,
+        # contributions, base_value), least recently used first. A hot reload
+        # builds a new service, so they never outlive their model version.
+        self.explanation_cache_size = explanation_cache_size
+        self._explanations = {(tier, version): OrderedDict() for tier, version in self.versions.items()}
+        self._explanations_lock = threading.Lock()
+        
+        # Micro-batching schedulers for concurrent predictions, one per tier and
+        # kind (predictions with explanations are batched separately)
+        self._batchers = {}
+        if batching:
+            for tier in self.models:
+                suffix = '' if tier == 'full' else f'_{tier}'
+                self._batchers[tier] = MicroBatcher(
+                    partial(self.predict_batch, tier=tier),
+                    max_batch_size=max_batch_size, max_wait_ms=max_wait_ms,
+                    name=f'predict{suffix}'
+                )
+                self._batchers[(tier, 'explain')] = MicroBatcher(
+                    partial(self.predict_batch, tier=tier, explain=True),
+                    max_batch_size=max_batch_size, max_wait_ms=max_wait_ms,
+                    name=f'explain{suffix}'
+                )
+        
+        # Warm these model versions up in the worker processes
+        if self.executor is not None:
+            for tier in self.models:
+                self.executor.load_model(self.versions[tier], self._model_args(tier))
+    
+    @property
+    def tiers(self) -> list:
+        """Model tiers this service can serve"""
+        return list(self.models)
+    
+    def resolve_tier(self, tier: str = None) -> str:
+        """Default the tier and check it is available"""
+        tier = tier or self.default_tier
+        if tier not in self.models:
+            raise ValueError(f"Model tier not available: {tier}")
+        return tier
+    
+    def can_explain(self, tier: str = None) -> bool:
+        """Whether a tier's model can explain its predictions (XGBoost models only)"""
+        return self._booster(self.resolve_tier(tier)) is not None
+    
+    def _booster(self, tier: str):
+        """The XGBoost booster of a tier's model, or None for other models"""
+        model = self.models[tier]
+        return model.get_booster() if hasattr(model, 'get_booster') else getattr(model, 'booster', None)
     
-    def _load_model(self):
-        """Load the trained model from disk"""
+    def _model_args(self, tier: str = 'full') -> tuple:
+        """Constructor arguments that reload a tier's artifacts in another process"""
+        return (self.model_paths[tier], self.scaler_path, self.genre_encoder_path)
+    
+    def _compute_version(self, tier: str = 'full') -> str:
+        """Hash a tier's artifact files into a short version identifier"""
+        digest = hashlib.sha256()
+        for path in self._model_args(tier):
+            if path and os.path.exists(path):
+                with open(path, 'rb') as f:
+                    for block in iter(lambda: f.read(1 << 20), b''):
+                        digest.update(block)
+        return digest.hexdigest()[:12]
+    
+    def _load_model(self, path: str = None):
+        """Load a trained model from disk"""
+        path = path or self.model_path
         try:
-            model = joblib.load(self.model_path)
+            if path.endswith('.ubj'):
+                return load_booster_model(path)
+            model = _joblib_load(path)
             return model
         except Exception as e:
-            raise RuntimeError(f"Failed to load model from {self.model_path}: {str(e)}")
+            raise RuntimeError(f"Failed to load model from {path}: {str(e)}")
     
     def _load_scaler(self):
         """Load the feature scaler from disk"""
         try:
-            scaler = joblib.load(self.scaler_path)
+            if self.scaler_path.endswith('.npz'):
+                return load_preprocessor(self.scaler_path)
+            scaler = _joblib_load(self.scaler_path)
             return scaler
         except Exception as e:
             raise RuntimeError(f"Failed to load scaler from {self.scaler_path}: {str(e)}")
@@ -51,31 +194,173 @@ class ModelService:
         """Load the genre encoder from disk if it exists"""
         if self.genre_encoder_path and os.path.exists(self.genre_encoder_path):
             try:
-                encoder = joblib.load(self.genre_encoder_path)
+                encoder = _joblib_load(self.genre_encoder_path)
                 return encoder
             except Exception as e:
                 print(f"Warning: Failed to load genre encoder: {str(e)}")
                 return None
         return None
     
-    def predict(self, features: dict) -> dict:
+    def predict(self, features: dict, tier: str = None, explain: bool = False) -> dict:
         """
         Generate prediction and confidence scores
         
+        Concurrent calls are coalesced into a single model call when batching
+        is enabled.
+        
         Args:
             features: Dictionary of track features
+            tier: Model tier ('full' or 'fast'); defaults to default_tier
+            explain: Also return per-feature contributions (see explain_matrix)
             
         Returns:
             Dictionary with prediction ('hit' or 'miss'), confidence, and probabilities
         """
-        # Preprocess features
-        X = self.preprocess_features(features)
+        tier = self.resolve_tier(tier)
+        with self._track_active():
+            batcher = self._batchers.get((tier, 'explain') if explain else tier)
+            if batcher is not None:
+                return batcher.submit(features)
+            return self.predict_batch([features], tier=tier, explain=explain)[0]
+    
+    def predict_batch(self, features_list: list, tier: str = None, explain: bool = False) -> list:
+        """
+        Generate predictions for several tracks with one model call
         
-        # Get prediction
-        prediction = self.model.predict(X)[0]
+        Args:
+            features_list: List of track feature dictionaries
+            tier: Model tier ('full' or 'fast'); defaults to default_tier
+            explain: Also return per-feature contributions, from the same
+                booster call that produces the probabilities
+            
+        Returns:
+            List of prediction dictionaries in the same order
+        """
+        tier = self.resolve_tier(tier)
+        with self._track_active():
+            if not explain:
+                probabilities = self.predict_proba_batch(features_list, tier=tier)
+                return [self._format_prediction(row, tier) for row in probabilities]
+            
+            base = self._base_matrix(features_list)
+            probabilities, contributions, base_values = self.explain_matrix(base, tier=tier)
+            if self.shadow is not None and tier == 'full':
+                self.shadow.submit(base, probabilities)
+        
+        predictions = []
+        for row, row_contributions, base_value in zip(probabilities, contributions, base_values):
+            prediction = self._format_prediction(row, tier)
+            prediction['explanation'] = {
+                'base_value': float(base_value),
+                'contributions': dict(zip(self.base_features, row_contributions.tolist()))
+            }
+            predictions.append(prediction)
+        return predictions
+    
+    def explain_matrix(self, base: np.ndarray, tier: str = 'full'):
+        """
+        Probabilities and per-feature contributions for a matrix of base features
+        
+        Contributions are the booster's tree SHAP values (pred_contribs) in
+        log-odds of a hit. Engineered columns are split evenly between the input
+        features they are built from, and the constant genre columns are folded
+        into the base value, so base_value plus the 13 contributions equals the
+        hit log-odds. Rows explained recently (or precomputed with
+        precompute_explanations) are served from a bounded LRU cache; the
+        rest are computed in one booster call.
+        
+        Args:
+            base: Array of shape (n_tracks, 13) in base_features order
+            tier: Model tier ('full' or 'fast')
+            
+        Returns:
+            Tuple of (probabilities, contributions, base_values) with shapes
+            (n_tracks, 2), (n_tracks, 13) and (n_tracks,)
+            
+        Raises:
+            ValueError: If the tier's model is not an XGBoost model
+        """
+        base = np.ascontiguousarray(base, dtype=np.float64)
+        cache = self._explanations[(tier, self.versions[tier])]
+        keys = [row.tobytes() for row in base]
+        with self._explanations_lock:
+            results = [cache.get(key) for key in keys]
+            for key, cached in zip(keys, results):
+                if cached is not None:
+                    cache.move_to_end(key)
+        missing = [i for i, cached in enumerate(results) if cached is None]
+        if missing:
+            computed = list(zip(*self._compute_explanations(base[missing], tier)))
+            for i, explanation in zip(missing, computed):
+                results[i] = explanation
+            self._cache_explanations(cache, [keys[i] for i in missing], computed)
         
-        # Get probabilities
-        probabilities = self.predict_proba(features)
+        probabilities = np.array([result[0] for result in results]).reshape(len(base), 2)
+        contributions = np.array([result[1] for result in results]).reshape(len(base), len(self.base_features))
+        base_values = np.array([result[2] for result in results], dtype=np.float64)
+        return probabilities, contributions, base_values
+    
+    def precompute_explanations(self, base: np.ndarray, tier: str = 'full', block_rows: int = 4096) -> int:
+        """
+        Compute and keep explanations for known tracks (e.g. the catalog)
+        
+        Only the first explanation_cache_size rows are computed, since the
+        cache would drop the rest.
+        
+        Args:
+            base: Array of shape (n_tracks, 13) in base_features order
+            tier: Model tier ('full' or 'fast')
+            block_rows: Rows per booster call
+            
+        Returns:
+            Number of explanations held for the tier
+        """
+        base = np.ascontiguousarray(base[:self.explanation_cache_size], dtype=np.float64)
+        cache = self._explanations[(tier, self.versions[tier])]
+        for start in range(0, len(base), block_rows):
+            block = base[start:start + block_rows]
+            computed = list(zip(*self._compute_explanations(block, tier)))
+            self._cache_explanations(cache, [row.tobytes() for row in block], computed)
+        return len(cache)
+    
+    def _cache_explanations(self, cache: OrderedDict, keys: list, explanations: list):
+        """Store explanations, dropping the least recently used beyond explanation_cache_size"""
+        with self._explanations_lock:
+            for key, explanation in zip(keys, explanations):
+                cache[key] = explanation
+                cache.move_to_end(key)
+            while len(cache) > self.explanation_cache_size:
+                cache.popitem(last=False)
+    
+    def _compute_explanations(self, base: np.ndarray, tier: str):
+        """One pred_contribs booster call, mapped back to the base features"""
+        booster = self._booster(tier)
+        if booster is None:
+            raise ValueError("Explanations need an XGBoost model")
+        import xgboost
+        
+        X = self.scaler.transform(self.build_feature_matrix(base))
+        raw = booster.predict(xgboost.DMatrix(np.asarray(X, dtype=np.float32)), pred_contribs=True)
+        feature_contributions, bias = raw[:, :-1].astype(np.float64), raw[:, -1].astype(np.float64)
+        
+        n_base = len(self.base_features)
+        n_genre = X.shape[1] - n_base - len(ENGINEERED_INPUTS)
+        contributions = feature_contributions[:, :n_base].copy()
+        for j, inputs in enumerate(ENGINEERED_INPUTS):
+            column = feature_contributions[:, n_base + n_genre + j]
+            for name in inputs:
+                contributions[:, self.base_features.index(name)] += column / len(inputs)
+        base_values = bias + feature_contributions[:, n_base:n_base + n_genre].sum(axis=1)
+        
+        margin = base_values + contributions.sum(axis=1)
+        hit = 1.0 / (1.0 + np.exp(-margin))
+        probabilities = np.column_stack([1 - hit, hit])
+        return probabilities, contributions, base_values
+    
+    def _format_prediction(self, probabilities: np.ndarray, tier: str = 'full') -> dict:
+        """Build the prediction response for one row of class probabilities"""
+        # The predicted class is the most probable one (ties go to 'miss')
+        prediction = int(np.argmax(probabilities))
         
         # Convert prediction to hit/miss
         prediction_label = 'hit' if prediction == 1 else 'miss'
@@ -89,23 +374,85 @@ class ModelService:
             'probabilities': {
                 'miss': float(probabilities[0]),
                 'hit': float(probabilities[1])
-            }
+            },
+            'model_version': self.versions[tier],
+            'model_tier': tier
         }
     
-    def predict_proba(self, features: dict) -> np.ndarray:
+    def predict_proba(self, features: dict, tier: str = None) -> np.ndarray:
         """
         Get probability distribution
         
         Args:
             features: Dictionary of track features
+            tier: Model tier ('full' or 'fast'); defaults to default_tier
             
         Returns:
             Probability array [prob_miss, prob_hit]
         """
-        X = self.preprocess_features(features)
-        probabilities = self.model.predict_proba(X)[0]
+        return self.predict_proba_batch([features], tier=tier)[0]
+    
+    def predict_proba_batch(self, features_list: list, tier: str = None) -> np.ndarray:
+        """
+        Get probability distributions for several tracks
+        
+        Args:
+            features_list: List of track feature dictionaries
+            tier: Model tier ('full' or 'fast'); defaults to default_tier
+            
+        Returns:
+            Array of shape (n_tracks, 2) with [prob_miss, prob_hit] rows
+        """
+        tier = self.resolve_tier(tier)
+        base = self._base_matrix(features_list)
+        if self.executor is not None:
+            probabilities = self.executor.predict_proba(
+                base, self.versions[tier], self._model_args(tier)
+            )
+        else:
+            probabilities = self.predict_proba_matrix(base, tier=tier)
+        
+        # Hand the same inputs to the shadow model without waiting for it
+        if self.shadow is not None and tier == 'full':
+            self.shadow.submit(base, probabilities)
+        return probabilities
+    
+    def score_matrix(self, base: np.ndarray, tier: str = None) -> np.ndarray:
+        """
+        Get probability distributions for raw rows of base features, such as
+        a chunk read from a catalog file
+        
+        Args:
+            base: Array of shape (n_tracks, 13) in base_features order; rows
+                with a missing (NaN) value are not scored
+            tier: Model tier ('full' or 'fast'); defaults to default_tier
+            
+        Returns:
+            Array of shape (n_tracks, 2) with [prob_miss, prob_hit] rows, NaN
+            for the rows that were not scored
+        """
+        tier = self.resolve_tier(tier)
+        base = np.asarray(base, dtype=np.float64)
+        probabilities = np.full((len(base), 2), np.nan)
+        complete = ~np.isnan(base).any(axis=1)
+        if complete.any():
+            probabilities[complete] = self.predict_proba_matrix(base[complete], tier=tier)
         return probabilities
     
+    def predict_proba_matrix(self, base: np.ndarray, tier: str = 'full') -> np.ndarray:
+        """
+        Get probability distributions for a matrix of base features
+        
+        Args:
+            base: Array of shape (n_tracks, 13) in base_features order
+            tier: Model tier ('full' or 'fast')
+            
+        Returns:
+            Array of shape (n_tracks, 2) with [prob_miss, prob_hit] rows
+        """
+        X = self.scaler.transform(self.build_feature_matrix(base))
+        return self.models[tier].predict_proba(X)
+    
     def preprocess_features(self, features: dict) -> np.ndarray:
         """
         Scale and transform input features
@@ -116,8 +463,42 @@ class ModelService:
         Returns:
             Preprocessed feature array ready for model input
         """
-        # Extract base features in correct order
-        feature_values = [features.get(col, 0) for col in self.base_features]
+        return self.preprocess_batch([features])
+    
+    def preprocess_batch(self, features_list: list) -> np.ndarray:
+        """
+        Scale and transform the features of several tracks
+        
+        Args:
+            features_list: List of track feature dictionaries
+            
+        Returns:
+            Preprocessed feature matrix ready for model input
+        """
+        base = self._base_matrix(features_list)
+        
+        # Scale features
+        return self.scaler.transform(self.build_feature_matrix(base))
+    
+    def _base_matrix(self, features_list: list) -> np.ndarray:
+        """Extract base features in correct order as an (n_tracks, 13) matrix"""
+        return np.array(
+            [[features.get(col, 0) for col in self.base_features] for features in features_list],
+            dtype=np.float64
+        ).reshape(len(features_list), len(self.base_features))
+    
+    def build_feature_matrix(self, base: np.ndarray) -> np.ndarray:
+        """
+        Build the unscaled model input from base features (must match training)
+        
+        Args:
+            base: Array of shape (n_tracks, 13) in base_features order
+            
+        Returns:
+            Feature matrix with genre and engineered columns appended
+        """
+        n_rows = base.shape[0]
+        columns = [base]
         
         # Add genre features if encoder exists (use default values if not provided)
         if self.genre_encoder is not None:
@@ -129,48 +510,82 @@ class ModelService:
             genre_pop_std = 15.0
             genre_pop_median = 50.0
             
-            feature_values.extend([genre_encoded, genre_pop_mean, genre_pop_std, genre_pop_median])
-        
-        # Engineer additional features (must match training)
-        energy = features.get('energy', 0)
-        danceability = features.get('danceability', 0)
-        loudness = features.get('loudness', 0)
-        valence = features.get('valence', 0)
-        acousticness = features.get('acousticness', 0)
-        instrumentalness = features.get('instrumentalness', 0)
-        liveness = features.get('liveness', 0)
-        speechiness = features.get('speechiness', 0)
-        duration_ms = features.get('duration_ms', 0)
-        
-        # Interaction features
-        energy_loudness = energy * loudness
-        dance_energy = danceability * energy
-        valence_energy = valence * energy
-        acoustic_instrumental = acousticness * instrumentalness
-        
-        # Polynomial features
-        energy_squared = energy ** 2
-        danceability_squared = danceability ** 2
-        loudness_squared = loudness ** 2
-        
-        # Duration in minutes
-        duration_min = duration_ms / 60000
-        
-        # Ratio features
-        speech_to_music = speechiness / (instrumentalness + 0.01)
-        live_to_studio = liveness / (1 - liveness + 0.01)
-        
-        # Add engineered features
-        feature_values.extend([
-            energy_loudness, dance_energy, valence_energy, acoustic_instrumental,
-            energy_squared, danceability_squared, loudness_squared,
-            duration_min, speech_to_music, live_to_studio
-        ])
-        
-        # Convert to numpy array and reshape
-        X = np.array(feature_values).reshape(1, -1)
+            genre_values = np.array([genre_encoded, genre_pop_mean, genre_pop_std, genre_pop_median])
+            columns.append(np.broadcast_to(genre_values, (n_rows, 4)))
         
-        # Scale features
-        X_scaled = self.scaler.transform(X)
+        # Engineer additional features
+        feature = {col: base[:, i] for i, col in enumerate(self.base_features)}
+        energy = feature['energy']
+        danceability = feature['danceability']
+        loudness = feature['loudness']
+        valence = feature['valence']
+        acousticness = feature['acousticness']
+        instrumentalness = feature['instrumentalness']
+        liveness = feature['liveness']
+        speechiness = feature['speechiness']
+        duration_ms = feature['duration_ms']
         
-        return X_scaled
+        columns.append(np.column_stack([
+            # Interaction features
+            energy * loudness,
+            danceability * energy,
+            valence * energy,
+            acousticness * instrumentalness,
+            # Polynomial features
+            energy ** 2,
+            danceability ** 2,
+            loudness ** 2,
+            # Duration in minutes
+            duration_ms / 60000,
+            # Ratio features
+            speechiness / (instrumentalness + 0.01),
+            liveness / (1 - liveness + 0.01)
+        ]))
+        
+        return np.hstack(columns)
+    
+    def validate(self):
+        """
+        Run a smoke prediction to check the artifacts work together
+        
+        Raises:
+            RuntimeError: If the prediction fails or is not a valid distribution
+        """
+        base = np.array([[120.0, 0.6, 0.6, -7.0, 0.5, 0.2, 0.0, 0.15, 0.05, 210000, 5, 1, 4]])
+        for tier in self.models:
+            try:
+                probabilities = self.predict_proba_matrix(base, tier=tier)
+            except Exception as e:
+                raise RuntimeError(f"Model validation failed ({tier} tier): {str(e)}")
+            
+            if (probabilities.shape != (1, 2)
+                    or not np.all(np.isfinite(probabilities))
+                    or abs(float(probabilities.sum()) - 1.0) > 1e-3):
+                raise RuntimeError(f"Model validation failed ({tier} tier): invalid probability output")
+    
+    @contextmanager
+    def _track_active(self):
+        """Count a request as using this service for the duration of the block"""
+        with self._active_cond:
+            self._active += 1
+        try:
+            yield
+        finally:
+            with self._active_cond:
+                self._active -= 1
+                self._active_cond.notify_all()
+    
+    def close(self, timeout: float = 30.0):
+        """
+        Stop background workers owned by this service
+        
+        Waits up to timeout seconds for in-flight requests to finish first.
+        """
+        for batcher in self._batchers.values():
+            batcher.close()
+        with self._active_cond:
+            self._active_cond.wait_for(lambda: self._active == 0, timeout=timeout)
+        # Free the previous model version's explanations now rather than on collection
+        with self._explanations_lock:
+            for cache in self._explanations.values():
+                cache.clear()
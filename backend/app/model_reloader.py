@@ -0,0 +1,72 @@
+"""
+Model Reloader Module
+Watches the model artifacts on disk and triggers a hot reload when they change
+"""
+import os
+import threading
+
+
+class ModelWatcher:
+    def __init__(self, paths, on_change, interval: float = 5.0, optional_paths=()):
+        """
+        Initialize the watcher
+
+        A change is only reported once the files have stopped changing for one
+        polling interval, so partially copied artifacts are not loaded.
+
+        Args:
+            paths: Artifact file paths to watch; while one is missing (e.g.
+                mid-copy) no change is reported
+            on_change: Callable invoked (on the watcher thread) after a change
+            interval: Seconds between polls
+            optional_paths: Artifact file paths that may be absent (e.g. the
+                fast-tier model); appearing or disappearing counts as a change
+        """
+        self.paths = [path for path in paths if path]
+        self.optional_paths = [path for path in optional_paths if path]
+        self.on_change = on_change
+        self.interval = interval
+
+        self._last = self._snapshot()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='model-watcher', daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread.is_alive():
+            self._thread.join()
+
+    @staticmethod
+    def _stat(path):
+        try:
+            stat = os.stat(path)
+            return stat.st_mtime_ns, stat.st_size
+        except OSError:
+            return None
+
+    def _snapshot(self) -> tuple:
+        """Modification time and size of every watched file (None if missing), required ones first"""
+        return tuple(self._stat(path) for path in self.paths + self.optional_paths)
+
+    def _run(self):
+        candidate = None
+        while not self._stop.wait(self.interval):
+            snapshot = self._snapshot()
+            if snapshot == self._last or None in snapshot[:len(self.paths)]:
+                candidate = None
+                continue
+            if snapshot != candidate:
+                # Changed since the last poll; wait until it is stable
+                candidate = snapshot
+                continue
+
+            self._last = snapshot
+            candidate = None
+            try:
+                self.on_change()
+            except Exception as e:
+                print(f"Warning: Model reload failed, keeping the current model: {str(e)}")
@@ -0,0 +1,442 @@
+"""
+Process Pool Module
+Runs model inference and similarity scans in pre-warmed worker processes.
+Each worker loads the artifacts once; request inputs and outputs move through
+a per-worker shared memory block, and only small control messages are pickled.
+"""
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from collections import OrderedDict
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from app.deadline import DeadlineExceeded, check_deadline, current_deadline, deadline_scope, remaining
+from app.metrics import metrics
+
+N_BASE_FEATURES = 13
+# Largest neighbour count a similarity call can return per query
+MAX_NEIGHBORS = 10
+# Output slots per row: two class probabilities, or neighbour ids and scores
+OUTPUT_WIDTH = max(2, 2 * MAX_NEIGHBORS)
+# Model versions each worker keeps loaded (current plus the one being retired)
+MODELS_PER_WORKER = 2
+
+
+def _buffer_views(buffer, max_rows: int):
+    """Create the input and output array views over a shared memory buffer"""
+    inputs = np.ndarray((max_rows, N_BASE_FEATURES), dtype=np.float64, buffer=buffer)
+    outputs = np.ndarray(
+        (max_rows, OUTPUT_WIDTH), dtype=np.float64, buffer=buffer,
+        offset=inputs.nbytes
+    )
+    return inputs, outputs
+
+
+def _worker_main(conn, shm_name: str, max_rows: int, dataset_path):
+    """
+    Worker process loop
+
+    Args:
+        conn: Pipe end for control messages
+        shm_name: Name of the shared memory block owned by the parent
+        max_rows: Rows available in the shared input/output buffers
+        dataset_path: DataService dataset path, or None
+    """
+    from app.data_service import DataService
+    from app.ml_service import ModelService
+
+    shm = shared_memory.SharedMemory(name=shm_name)
+    inputs, outputs = _buffer_views(shm.buf, max_rows)
+    try:
+        data_service = DataService(dataset_path) if dataset_path else None
+    except Exception as e:
+        conn.send(('error', str(e)))
+        return
+    conn.send(('ready', os.getpid()))
+
+    # Loaded model versions, least recently used first
+    models = OrderedDict()
+
+    def get_model(key, model_args):
+        if key not in models:
+            service = ModelService(*model_args)
+            if service.version != key:
+                raise ValueError("Model artifacts on disk do not match the requested version")
+            models[key] = service
+            while len(models) > MODELS_PER_WORKER:
+                models.popitem(last=False)
+        models.move_to_end(key)
+        return models[key]
+
+    try:
+        while True:
+            try:
+                message = conn.recv()
+            except EOFError:
+                break
+            op = message[0]
+            try:
+                if op == 'ping':
+                    conn.send(('pong', os.getpid()))
+                elif op == 'load_model':
+                    get_model(message[1], message[2])
+                    conn.send(('ok',))
+                elif op == 'predict_proba':
+                    n_rows, key, model_args = message[1], message[2], message[3]
+                    model_service = get_model(key, model_args)
+                    outputs[:n_rows, :2] = model_service.predict_proba_matrix(inputs[:n_rows])
+                    conn.send(('ok',))
+                elif op == 'sync_catalog':
+                    conn.send(('ok', data_service.sync_segments(message[2], message[1])))
+                elif op == 'similar':
+                    n_rows, k, filters, deadline = message[1], message[2], message[3], message[4]
+                    with deadline_scope(deadline):
+                        indices, scores = data_service.similarity_top_k(inputs[:n_rows], k, filters)
+                    outputs[:n_rows, :k] = indices
+                    outputs[:n_rows, k:2 * k] = scores
+                    conn.send(('ok',))
+                elif op == 'stop':
+                    break
+                else:
+                    conn.send(('error', f"Unknown operation: {op}"))
+            except DeadlineExceeded as e:
+                conn.send(('deadline', str(e)))
+            except Exception as e:
+                conn.send(('error', str(e)))
+    finally:
+        # Release the views before closing the mapping
+        del inputs, outputs
+        shm.close()
+
+
+class _Worker:
+    def __init__(self, context, max_rows: int, dataset_path):
+        self.context = context
+        self.max_rows = max_rows
+        self.dataset_path = dataset_path
+
+        size = max_rows * (N_BASE_FEATURES + OUTPUT_WIDTH) * 8
+        self.shm = shared_memory.SharedMemory(create=True, size=size)
+        self.inputs, self.outputs = _buffer_views(self.shm.buf, max_rows)
+        self.process = None
+        self.conn = None
+
+    def start(self, timeout: float):
+        """Spawn the worker process and wait until its artifacts are loaded"""
+        parent_conn, child_conn = self.context.Pipe()
+        self.process = self.context.Process(
+            target=_worker_main,
+            args=(child_conn, self.shm.name, self.max_rows, self.dataset_path),
+            daemon=True
+        )
+        self.process.start()
+        child_conn.close()
+        self.conn = parent_conn
+
+        if not self.conn.poll(timeout):
+            self.kill()
+            raise RuntimeError("Inference worker did not start in time")
+        status = self.conn.recv()
+        if status[0] != 'ready':
+            self.kill()
+            raise RuntimeError(f"Inference worker failed to start: {status[1]}")
+
+    def call(self, message, timeout: float):
+        """Send a control message and wait for the reply"""
+        self.conn.send(message)
+        if not self.conn.poll(timeout):
+            raise TimeoutError("Inference worker did not respond in time")
+        reply = self.conn.recv()
+        if reply[0] == 'deadline':
+            raise DeadlineExceeded(reply[1])
+        if reply[0] == 'error':
+            raise ValueError(reply[1])
+        return reply
+
+    def is_alive(self) -> bool:
+        return self.process is not None and self.process.is_alive()
+
+    def kill(self):
+        if self.process is not None and self.process.is_alive():
+            self.process.kill()
+        if self.process is not None:
+            self.process.join(timeout=5)
+        if self.conn is not None:
+            self.conn.close()
+        self.process = None
+        self.conn = None
+
+    def stop(self):
+        if self.is_alive():
+            try:
+                self.conn.send(('stop',))
+                self.process.join(timeout=5)
+            except (OSError, EOFError):
+                pass
+        self.kill()
+        del self.inputs, self.outputs
+        self.shm.close()
+        self.shm.unlink()
+
+
+class InferencePool:
+    def __init__(self, dataset_path: str = None, size: int = 2,
+                 max_batch_size: int = 256, start_timeout: float = 120.0,
+                 call_timeout: float = 30.0, health_interval: float = 30.0):
+        """
+        Initialize the process pool and start all workers
+
+        Models are registered per version by ModelService (see load_model), so
+        several versions can be served side by side during a hot reload.
+
+        Args:
+            dataset_path: Dataset path for similarity scans, or None
+            size: Number of worker processes
+            max_batch_size: Rows per shared memory transfer; larger inputs are split
+            start_timeout: Seconds a worker may take to load its artifacts
+            call_timeout: Seconds a single call may take before the worker is restarted
+            health_interval: Seconds between background health checks (0 disables them)
+        """
+        self.size = max(1, int(size))
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.start_timeout = start_timeout
+        self.call_timeout = call_timeout
+
+        # Spawn rather than fork: the parent runs threads (Flask, OpenMP)
+        context = multiprocessing.get_context('spawn')
+        self._workers = [
+            _Worker(context, self.max_batch_size, dataset_path)
+            for _ in range(self.size)
+        ]
+        self._idle = queue.Queue()
+        self._closed = False
+
+        self._alive = metrics.gauge('inference_pool_workers_alive')
+        self._restarts = metrics.counter('inference_pool_restarts_total')
+
+        try:
+            for worker in self._workers:
+                worker.start(self.start_timeout)
+                self._alive.inc()
+                self._idle.put(worker)
+        except Exception:
+            self.close()
+            raise
+
+        self._stop_health = threading.Event()
+        self._health_thread = None
+        if health_interval > 0:
+            self._health_thread = threading.Thread(
+                target=self._health_loop, args=(health_interval,),
+                name='inference-pool-health', daemon=True
+            )
+            self._health_thread.start()
+
+    def load_model(self, key: str, model_args: tuple):
+        """
+        Load a model version into every worker, one worker at a time
+
+        Workers that are not loading keep serving requests, so warming up a
+        new version does not stall inference.
+
+        Args:
+            key: Model version identifier (ModelService.version)
+            model_args: ModelService constructor arguments for the version
+        """
+        self._broadcast(('load_model', key, model_args), self.start_timeout)
+
+    def sync_catalog(self, n_tracks: int, sequence: int):
+        """
+        Have every worker apply the dataset's new delta segments
+
+        Args:
+            n_tracks: Catalog size the workers must reach
+            sequence: Last segment sequence in the parent's catalog (workers
+                stop there even if another process has written more)
+
+        Raises:
+            RuntimeError: If a worker's catalog does not match the parent's
+        """
+        for reply in self._broadcast(('sync_catalog', n_tracks, sequence), self.start_timeout):
+            if reply[1] != n_tracks:
+                raise RuntimeError(
+                    f"Inference worker catalog has {reply[1]} tracks, expected {n_tracks}"
+                )
+
+    def predict_proba(self, base: np.ndarray, key: str, model_args: tuple) -> np.ndarray:
+        """
+        Compute class probabilities for a matrix of base features
+
+        Args:
+            base: Array of shape (n_rows, 13) in ModelService.base_features order
+            key: Model version identifier
+            model_args: ModelService constructor arguments, used if a worker
+                has not loaded this version yet (e.g. after a restart)
+
+        Returns:
+            Array of shape (n_rows, 2)
+        """
+        base = np.asarray(base, dtype=np.float64)
+        result = np.empty((base.shape[0], 2), dtype=np.float64)
+        for start in range(0, base.shape[0], self.max_batch_size):
+            check_deadline()
+            chunk = base[start:start + self.max_batch_size]
+            result[start:start + len(chunk)] = self._run(
+                'predict_proba', chunk, lambda outputs, n: outputs[:n, :2].copy(),
+                key, model_args
+            )
+        return result
+
+    def similarity_top_k(self, query: np.ndarray, k: int, filters: dict = None):
+        """
+        Find the k most similar catalog rows for each query
+
+        Args:
+            query: Array of shape (n_queries, 13) of unscaled features
+            k: Number of neighbours per query (at most MAX_NEIGHBORS)
+            filters: Normalized search filters (see DataService.normalize_filters)
+
+        Returns:
+            Tuple of (indices, scores) arrays of shape (n_queries, k), padded
+            with index -1 when fewer than k rows match the filters
+        """
+        if k > MAX_NEIGHBORS:
+            raise ValueError(f"k must be at most {MAX_NEIGHBORS}")
+        query = np.asarray(query, dtype=np.float64)
+        indices = np.empty((query.shape[0], k), dtype=np.int64)
+        scores = np.empty((query.shape[0], k), dtype=np.float64)
+        for start in range(0, query.shape[0], self.max_batch_size):
+            check_deadline()
+            chunk = query[start:start + self.max_batch_size]
+            chunk_indices, chunk_scores = self._run(
+                'similar', chunk,
+                lambda outputs, n: (outputs[:n, :k].astype(np.int64), outputs[:n, k:2 * k].copy()),
+                k, filters, current_deadline()
+            )
+            indices[start:start + len(chunk)] = chunk_indices
+            scores[start:start + len(chunk)] = chunk_scores
+        return indices, scores
+
+    def health_check(self) -> dict:
+        """
+        Ping every idle worker, restarting any that are dead or unresponsive
+
+        Returns:
+            Dictionary with the pool size and number of healthy workers
+        """
+        healthy = 0
+        checked = []
+        while True:
+            try:
+                worker = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            checked.append(worker)
+            try:
+                if not worker.is_alive():
+                    raise RuntimeError("worker exited")
+                worker.call(('ping',), timeout=5)
+                healthy += 1
+            except Exception:
+                try:
+                    self._restart(worker)
+                    healthy += 1
+                except RuntimeError:
+                    pass
+        for worker in checked:
+            self._idle.put(worker)
+        return {'size': self.size, 'checked': len(checked), 'healthy': healthy}
+
+    def close(self):
+        """Stop all worker processes and release their shared memory"""
+        if self._closed:
+            return
+        self._closed = True
+        if getattr(self, '_health_thread', None) is not None:
+            self._stop_health.set()
+            self._health_thread.join()
+        for worker in self._workers:
+            if worker.is_alive():
+                self._alive.dec()
+            worker.stop()
+
+    def _broadcast(self, message, timeout: float) -> list:
+        """Send a message to every worker, one at a time, and collect the replies"""
+        replies = []
+        pending = set(range(self.size))
+        while pending:
+            worker = self._idle.get()
+            index = self._workers.index(worker)
+            try:
+                if index in pending:
+                    pending.discard(index)
+                    replies.append(self._call_worker(worker, message, timeout))
+                else:
+                    # Already done; give the busy workers a chance to come back
+                    time.sleep(0.001)
+            finally:
+                self._idle.put(worker)
+        return replies
+
+    def _health_loop(self, interval: float):
+        while not self._stop_health.wait(interval):
+            self.health_check()
+
+    def _restart(self, worker):
+        """Replace a crashed or hung worker process"""
+        if worker.process is not None:
+            self._alive.dec()
+        worker.kill()
+        self._restarts.inc()
+        worker.start(self.start_timeout)
+        self._alive.inc()
+
+    def _run(self, op: str, rows: np.ndarray, read_outputs, *args):
+        """Execute one operation on an idle worker, restarting it if it crashed"""
+        if self._closed:
+            raise RuntimeError("Inference pool is closed")
+        # Wait for a free worker no longer than the request's deadline allows
+        time_left = remaining()
+        try:
+            worker = self._idle.get(timeout=None if time_left is None else max(0.0, time_left))
+        except queue.Empty:
+            raise DeadlineExceeded("Request deadline exceeded while waiting for an inference worker")
+        try:
+            n_rows = rows.shape[0]
+
+            def call():
+                worker.inputs[:n_rows] = rows
+                worker.call((op, n_rows) + args, timeout=self.call_timeout)
+
+            self._call_worker(worker, call, self.call_timeout)
+            return read_outputs(worker.outputs, n_rows)
+        finally:
+            self._idle.put(worker)
+
+    def _call_worker(self, worker, message, timeout: float):
+        """
+        Run a call on a checked-out worker, restarting it and retrying once on a crash
+
+        Args:
+            worker: Worker taken from the idle queue
+            message: Control message tuple, or a callable performing the call
+            timeout: Seconds to wait for the reply
+        """
+        for attempt in range(2):
+            try:
+                if not worker.is_alive():
+                    self._restart(worker)
+                if callable(message):
+                    return message()
+                return worker.call(message, timeout=timeout)
+            except (EOFError, OSError, TimeoutError) as e:
+                # Worker crashed or hung: restart it and retry once
+                self._restart(worker)
+                if attempt == 1:
+                    raise RuntimeError(f"Inference worker failed: {e}")
+            except ValueError as e:
+                raise RuntimeError(f"Inference failed: {e}")
@@ -1,52 +1,228 @@
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, Response, jsonify, request
+from decimal import Decimal
 from app.ml_service import ModelService
 from app.data_service import DataService
+from app.artifacts import MANIFEST_NAME
+from app.config import (
+    DATASET_PATH, FAST_MODEL_PATH, GENRE_ENCODER_PATH, KNN_GRAPH_PATH, MODEL_PATH, MODEL_TIER,
+    NATIVE_ARTIFACTS, SCALER_PATH, resolve_path
+)
+from app.compression import cached_response, mark_cacheable
+from app.deadline import DeadlineExceeded
+from app.metrics import metrics
+from app.model_reloader import ModelWatcher
+from app.shadow import ShadowScorer
+import hashlib
+import hmac
+import math
 import os
+import threading
+import time
 
 api_bp = Blueprint('api', __name__)
 
-# Initialize services
-# Get the backend directory path
-BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-
-# Resolve paths relative to backend directory
-def resolve_path(path):
-    """Resolve path relative to backend directory if not absolute"""
-    if os.path.isabs(path):
-        return path
-    # Try the path as-is first
-    if os.path.exists(path):
-        return path
-    # Try relative to backend directory
-    backend_relative = os.path.join(BACKEND_DIR, path)
-    if os.path.exists(backend_relative):
-        return backend_relative
-    # Return the backend-relative path as default
-    return backend_relative
-
-MODEL_PATH = resolve_path(os.getenv('MODEL_PATH', 'models/model.pkl'))
-SCALER_PATH = resolve_path(os.getenv('SCALER_PATH', 'models/scaler.pkl'))
-GENRE_ENCODER_PATH = resolve_path(os.getenv('GENRE_ENCODER_PATH', 'models/genre_encoder.pkl'))
-DATASET_PATH = resolve_path(os.getenv('DATASET_PATH', 'data/dataset.csv'))
+# Fold ingested delta segments into the dataset file once there are this many (0 disables)
+DATA_COMPACT_SEGMENTS = int(os.getenv('DATA_COMPACT_SEGMENTS', 20))
+# Seconds between checks for tracks ingested by other server processes (0 disables)
+DATA_SYNC_INTERVAL = float(os.getenv('DATA_SYNC_INTERVAL', 5))
+
+# Precompute prediction explanations for the catalog tracks whenever a model is
+# loaded (off by default: it runs the booster over the whole catalog)
+EXPLAIN_PRECOMPUTE = os.getenv('EXPLAIN_PRECOMPUTE', 'false').lower() in ('1', 'true', 'yes')
+# Most prediction explanations kept in memory per model tier
+EXPLAIN_CACHE_SIZE = int(os.getenv('EXPLAIN_CACHE_SIZE', 100000))
+
+# Seconds shared caches may reuse GET /api/predict and /api/similar responses
+# (responses for a pinned, current ?v= version are cached for a year)
+PUBLIC_CACHE_MAX_AGE = int(os.getenv('PUBLIC_CACHE_MAX_AGE', 300))
+
+# Largest number of queries accepted by /api/similar/batch
+SIMILAR_BATCH_MAX_QUERIES = int(os.getenv('SIMILAR_BATCH_MAX_QUERIES', 1000))
+
+# Micro-batching of concurrent /api/predict requests
+PREDICT_BATCHING = os.getenv('PREDICT_BATCHING', 'true').lower() in ('1', 'true', 'yes')
+PREDICT_MAX_BATCH_SIZE = int(os.getenv('PREDICT_MAX_BATCH_SIZE', 32))
+PREDICT_MAX_WAIT_MS = float(os.getenv('PREDICT_MAX_WAIT_MS', 2.0))
+
+# Worker processes for model inference and similarity scans (0 runs them in-process)
+INFERENCE_PROCESSES = int(os.getenv('INFERENCE_PROCESSES', 0))
+
+# Poll the model artifacts every N seconds and hot-reload on change (0 disables)
+MODEL_WATCH_INTERVAL = float(os.getenv('MODEL_WATCH_INTERVAL', 0))
+# Candidate model scored in the background on live traffic (disabled when unset)
+SHADOW_MODEL_PATH = os.getenv('SHADOW_MODEL_PATH', '')
+SHADOW_SCALER_PATH = os.getenv('SHADOW_SCALER_PATH', '')
+SHADOW_QUEUE_SIZE = int(os.getenv('SHADOW_QUEUE_SIZE', 1000))
+# Token required by /api/admin/* endpoints (admin endpoints are disabled when unset)
+ADMIN_TOKEN = os.getenv('ADMIN_TOKEN', '')
 
 # Global service instances (initialized on first use)
 _model_service = None
 _data_service = None
+_inference_pool = None
+_inference_pool_lock = threading.Lock()
+_model_lock = threading.Lock()
+_model_watcher = None
+_shadow_scorer = None
+_shadow_lock = threading.Lock()
+
+def get_inference_pool():
+    """Get or start the inference process pool, or None when disabled"""
+    global _inference_pool
+    if INFERENCE_PROCESSES <= 0:
+        return None
+    with _inference_pool_lock:
+        if _inference_pool is None:
+            from app.process_pool import InferencePool
+            _inference_pool = InferencePool(
+                dataset_path=DATASET_PATH,
+                size=INFERENCE_PROCESSES
+            )
+    return _inference_pool
+
+def get_shadow_scorer():
+    """Get or start the shadow scorer, or None when no shadow model is configured"""
+    global _shadow_scorer
+    if not SHADOW_MODEL_PATH:
+        return None
+    with _shadow_lock:
+        if _shadow_scorer is None:
+            shadow_service = ModelService(
+                resolve_path(SHADOW_MODEL_PATH),
+                resolve_path(SHADOW_SCALER_PATH) if SHADOW_SCALER_PATH else None,
+                GENRE_ENCODER_PATH
+            )
+            _shadow_scorer = ShadowScorer(shadow_service, queue_size=SHADOW_QUEUE_SIZE)
+    return _shadow_scorer
+
+def prime_explanations(model_service):
+    """
+    Precompute explanations for the catalog tracks in the background, with
+    the default tier of a newly loaded model (only if EXPLAIN_PRECOMPUTE is set)
+    """
+    if not EXPLAIN_PRECOMPUTE:
+        return
+    
+    def precompute():
+        try:
+            model_service.precompute_explanations(
+                get_data_service().feature_matrix, tier=model_service.default_tier
+            )
+        except Exception:
+            # Explanations are then computed per request
+            pass
+    
+    threading.Thread(target=precompute, name='explanation-precompute', daemon=True).start()
+
+def build_model_service():
+    """Load a new model service from the artifacts currently on disk"""
+    return ModelService(
+        MODEL_PATH, SCALER_PATH, GENRE_ENCODER_PATH,
+        batching=PREDICT_BATCHING,
+        max_batch_size=PREDICT_MAX_BATCH_SIZE,
+        max_wait_ms=PREDICT_MAX_WAIT_MS,
+        executor=get_inference_pool(),
+        shadow=get_shadow_scorer(),
+        fast_model_path=FAST_MODEL_PATH if os.path.exists(FAST_MODEL_PATH) else None,
+        default_tier=MODEL_TIER,
+        explanation_cache_size=EXPLAIN_CACHE_SIZE
+    )
+
+def model_artifact_paths():
+    """
+    Artifact files watched for hot reload, as (required, optional) lists; the
+    fast-tier model is optional, so its absence does not hold off reloads
+    """
+    paths = [MODEL_PATH, SCALER_PATH, GENRE_ENCODER_PATH]
+    if NATIVE_ARTIFACTS:
+        # The manifest is written last, so a bundle update ends with it
+        paths.append(os.path.join(os.path.dirname(MODEL_PATH), MANIFEST_NAME))
+    return paths, [FAST_MODEL_PATH]
 
 def get_model_service():
     """Get or initialize the model service"""
+    global _model_service, _model_watcher
+    service = _model_service
+    if service is None:
+        with _model_lock:
+            if _model_service is None:
+                _model_service = build_model_service()
+                metrics.gauge('model_version').set(_model_service.version)
+                prime_explanations(_model_service)
+                if MODEL_WATCH_INTERVAL > 0 and _model_watcher is None:
+                    required, optional = model_artifact_paths()
+                    _model_watcher = ModelWatcher(
+                        required,
+                        reload_model_service,
+                        interval=MODEL_WATCH_INTERVAL,
+                        optional_paths=optional
+                    ).start()
+            service = _model_service
+    return service
+
+def reload_model_service():
+    """
+    Load, validate and atomically swap in the model artifacts on disk
+    
+    Requests already holding the previous service finish on it; it is closed
+    in the background once they have drained.
+    
+    Returns:
+        Tuple of (active_version, previous_version, reloaded)
+    """
     global _model_service
-    if _model_service is None:
-        _model_service = ModelService(MODEL_PATH, SCALER_PATH, GENRE_ENCODER_PATH)
-    return _model_service
+    with _model_lock:
+        old_service = _model_service
+        new_service = build_model_service()
+        
+        if old_service is not None and new_service.versions == old_service.versions:
+            new_service.close()
+            return old_service.version, old_service.version, False
+        
+        try:
+            new_service.validate()
+        except RuntimeError:
+            metrics.counter('model_reload_failures_total').inc()
+            new_service.close()
+            raise
+        
+        _model_service = new_service
+    
+    metrics.counter('model_reloads_total').inc()
+    metrics.gauge('model_version').set(new_service.version)
+    prime_explanations(new_service)
+    previous_version = None
+    if old_service is not None:
+        previous_version = old_service.version
+        threading.Thread(target=old_service.close, name='model-drain', daemon=True).start()
+    return new_service.version, previous_version, True
+
+def is_admin_request():
+    """Check the admin token header against ADMIN_TOKEN"""
+    token = request.headers.get('X-Admin-Token', '')
+    return bool(ADMIN_TOKEN) and hmac.compare_digest(token, ADMIN_TOKEN)
 
 def get_data_service():
     """Get or initialize the data service"""
     global _data_service
     if _data_service is None:
-        _data_service = DataService(DATASET_PATH)
+        _data_service = DataService(
+            DATASET_PATH,
+            executor=get_inference_pool(),
+            compact_after=DATA_COMPACT_SEGMENTS,
+            knn_graph_path=KNN_GRAPH_PATH
+        )
+        if DATA_SYNC_INTERVAL > 0:
+            _data_service.start_sync(DATA_SYNC_INTERVAL)
     return _data_service
 
+# The 13 track features, in the order of the compact ?f= query parameter
+TRACK_FEATURES = [
+    'tempo', 'energy', 'danceability', 'loudness', 'valence',
+    'acousticness', 'instrumentalness', 'liveness', 'speechiness',
+    'duration_ms', 'key', 'mode', 'time_signature'
+]
+
 def validate_track_features(data):
     """
     Validate incoming track features
@@ -57,12 +233,6 @@ def validate_track_features(data):
     Returns:
         Tuple of (is_valid, error_message, validated_features)
     """
-    required_features = [
-        'tempo', 'energy', 'danceability', 'loudness', 'valence',
-        'acousticness', 'instrumentalness', 'liveness', 'speechiness',
-        'duration_ms', 'key', 'mode', 'time_signature'
-    ]
-    
     # Define acceptable ranges for each feature
     feature_ranges = {
         'tempo': (0, 250),
@@ -83,7 +253,7 @@ def validate_track_features(data):
     validated_features = {}
     
     # Check for missing required features
-    for feature in required_features:
+    for feature in TRACK_FEATURES:
         if feature not in data:
             return False, f"Missing required feature: {feature}", None
         
@@ -104,14 +274,138 @@ def validate_track_features(data):
     
     return True, None, validated_features
 
+def format_query_number(value) -> str:
+    """Shortest round-trip form of a number, formatted like JavaScript's String(number)"""
+    value = float(value)
+    if value == 0:
+        return '0'
+    sign, digits, exponent = Decimal(repr(abs(value))).normalize().as_tuple()
+    digits = ''.join(map(str, digits))
+    k, n = len(digits), exponent + len(digits)
+    if k <= n <= 21:
+        text = digits + '0' * (n - k)
+    elif 0 < n <= 21:
+        text = f"{digits[:n]}.{digits[n:]}"
+    elif -6 < n <= 0:
+        text = f"0.{'0' * -n}{digits}"
+    else:
+        mantissa = digits[0] + (f".{digits[1:]}" if k > 1 else '')
+        text = f"{mantissa}e{'+' if n > 0 else '-'}{abs(n - 1)}"
+    return ('-' if value < 0 else '') + text
+
+def parse_feature_query(value: str) -> dict:
+    """
+    Parse the compact ?f= encoding of a track's features
+    
+    Args:
+        value: The 13 feature values, comma-separated, in TRACK_FEATURES order
+        
+    Returns:
+        Dictionary of raw feature values (check with validate_track_features)
+    """
+    parts = value.split(',') if value else []
+    if len(parts) != len(TRACK_FEATURES):
+        raise ValueError(
+            f"Query parameter 'f' must hold {len(TRACK_FEATURES)} comma-separated values: "
+            f"{','.join(TRACK_FEATURES)}"
+        )
+    return dict(zip(TRACK_FEATURES, parts))
+
+def canonical_feature_query(features: dict) -> str:
+    """The canonical ?f= value of validated features, so equal inputs share one URL"""
+    return ','.join(format_query_number(features[feature]) for feature in TRACK_FEATURES)
+
+def parse_filter_query(args) -> dict:
+    """
+    Parse the search filters of GET /api/similar from query parameters
+    
+    genre, min_popularity, max_popularity and hits_only take one value;
+    exclude_artists may be repeated.
+    
+    Returns:
+        Dictionary of filters (check with DataService.normalize_filters)
+    """
+    filters = {}
+    if 'genre' in args:
+        filters['genre'] = args['genre']
+    if 'exclude_artists' in args:
+        filters['exclude_artists'] = args.getlist('exclude_artists')
+    for key in ('min_popularity', 'max_popularity'):
+        if key in args:
+            try:
+                filters[key] = float(args[key])
+            except ValueError:
+                raise ValueError(f"{key} must be a number")
+    if 'hits_only' in args:
+        value = args['hits_only'].lower()
+        if value not in ('true', 'false', '1', '0'):
+            raise ValueError("hits_only must be true or false")
+        filters['hits_only'] = value in ('true', '1')
+    return filters
+
+def cacheable_get(etag_parts: tuple, version: str, version_header: str, build):
+    """
+    Serve a deterministic GET response with HTTP caching headers
+    
+    The ETag is derived from the inputs and the versions the result depends
+    on, so a conditional request is answered with 304 before any work is
+    done. A request pinned to the current version, with ?v= or with the
+    version header, may be cached for a year; other responses for
+    PUBLIC_CACHE_MAX_AGE seconds. Responses vary on the version header, so
+    shared caches keep one entry per version a client pins.
+    
+    Args:
+        etag_parts: Inputs and versions that determine the response body
+        version: Current version string a client can pin
+        version_header: Request and response header carrying the version
+            (X-Model-Version or X-Dataset-Version)
+        build: Callable returning the (response, status) to serve
+    """
+    etag = hashlib.sha256(repr(etag_parts).encode('utf-8')).hexdigest()[:32]
+    if version in (request.args.get('v'), request.headers.get(version_header)):
+        cache_control = 'public, max-age=31536000, immutable'
+    else:
+        cache_control = f'public, max-age={PUBLIC_CACHE_MAX_AGE}'
+    
+    if request.if_none_match.contains_weak(etag):
+        response, status = Response(status=304), 304
+    else:
+        response, status = build()
+        if status != 200:
+            return response, status
+    # Weak, since compressed and uncompressed bodies share the tag
+    response.set_etag(etag, weak=True)
+    response.headers['Cache-Control'] = cache_control
+    response.headers['X-Cache-Version'] = version
+    response.headers[version_header] = version
+    response.vary.add(version_header)
+    return response, status
+
+@api_bp.errorhandler(DeadlineExceeded)
+def deadline_exceeded(e):
+    """Answer a request whose deadline passed; the rest of its work was skipped"""
+    return jsonify({
+        "error": {
+            "code": "DEADLINE_EXCEEDED",
+            "message": "The request did not complete before its deadline"
+        }
+    }), 504
+
 @api_bp.route('/health', methods=['GET'])
 def health_check():
     """Health check endpoint"""
     return jsonify({"status": "healthy", "message": "API is running"}), 200
 
-@api_bp.route('/predict', methods=['POST'])
+@api_bp.route('/metrics', methods=['GET'])
+def metrics_snapshot():
+    """Service metrics (batch sizes, queue waits, ...)"""
+    return jsonify(metrics.snapshot()), 200
+
+@api_bp.route('/predict', methods=['GET', 'POST'])
 def predict():
     """Predict if a track will be a hit or miss"""
+    if request.method == 'GET':
+        return predict_from_query()
     try:
         # Get request data
         data = request.get_json(silent=True)
@@ -135,12 +429,31 @@ def predict():
                 }
             }), 400
         
-        # Get model service and generate prediction
+        # Get model service and check the requested tier (per request, or the deployment default)
         model_service = get_model_service()
-        prediction_result = model_service.predict(validated_features)
+        tier = request.args.get('tier') or data.get('tier') or None
+        if tier is not None and tier not in model_service.tiers:
+            return jsonify({
+                "error": {
+                    "code": "VALIDATION_ERROR",
+                    "message": f"Invalid model tier: must be one of {', '.join(model_service.tiers)}"
+                }
+            }), 400
         
-        return jsonify(prediction_result), 200
+        explain = str(request.args.get('explain', data.get('explain', False))).lower() in ('1', 'true', 'yes')
+        if explain and not model_service.can_explain(tier):
+            return explanation_unavailable()
         
+        prediction_result = model_service.predict(validated_features, tier=tier, explain=explain)
+        
+        response = jsonify(prediction_result)
+        response.headers['X-Model-Version'] = prediction_result['model_version']
+        response.headers['X-Model-Tier'] = prediction_result['model_tier']
+        return response, 200
+        
+    except DeadlineExceeded:
+        # Answered with 504 by deadline_exceeded
+        raise
     except RuntimeError as e:
         # Model loading or prediction errors
         return jsonify({
@@ -158,9 +471,11 @@ def predict():
             }
         }), 500
 
-@api_bp.route('/similar', methods=['POST'])
+@api_bp.route('/similar', methods=['GET', 'POST'])
 def similar_tracks():
     """Find similar tracks"""
+    if request.method == 'GET':
+        return similar_tracks_from_query()
     try:
         # Get request data
         data = request.get_json(silent=True)
@@ -195,14 +510,371 @@ def similar_tracks():
         except (ValueError, TypeError):
             n_recommendations = 5
         
-        # Get data service and find similar tracks
+        # Get data service and find similar tracks among those matching the filters
         data_service = get_data_service()
-        similar_tracks_list = data_service.find_similar_tracks(validated_features, n_recommendations)
+        try:
+            similar_tracks_list = data_service.find_similar_tracks(
+                validated_features, n_recommendations, data.get('filters')
+            )
+        except ValueError as e:
+            return jsonify({
+                "error": {
+                    "code": "VALIDATION_ERROR",
+                    "message": str(e)
+                }
+            }), 400
         
         return jsonify({
             "similar_tracks": similar_tracks_list
         }), 200
         
+    except DeadlineExceeded:
+        # Answered with 504 by deadline_exceeded
+        raise
+    except RuntimeError as e:
+        # Dataset loading errors
+        return jsonify({
+            "error": {
+                "code": "DATA_ERROR",
+                "message": "Failed to load dataset"
+            }
+        }), 500
+    except Exception as e:
+        # Unexpected errors
+        return jsonify({
+            "error": {
+                "code": "INTERNAL_ERROR",
+                "message": "An unexpected error occurred"
+            }
+        }), 500
+
+def predict_from_query():
+    """
+    Cacheable GET form of /api/predict: ?f=<13 features>&tier=...&explain=true
+    
+    Served by the predict view, so admission limits and timeouts set for
+    predict apply to both forms.
+    """
+    try:
+        try:
+            raw_features = parse_feature_query(request.args.get('f', ''))
+        except ValueError as e:
+            return jsonify({
+                "error": {
+                    "code": "INVALID_REQUEST",
+                    "message": str(e)
+                }
+            }), 400
+        
+        is_valid, error_message, validated_features = validate_track_features(raw_features)
+        if not is_valid:
+            return jsonify({
+                "error": {
+                    "code": "VALIDATION_ERROR",
+                    "message": error_message
+                }
+            }), 400
+        
+        model_service = get_model_service()
+        tier = request.args.get('tier') or None
+        if tier is not None and tier not in model_service.tiers:
+            return jsonify({
+                "error": {
+                    "code": "VALIDATION_ERROR",
+                    "message": f"Invalid model tier: must be one of {', '.join(model_service.tiers)}"
+                }
+            }), 400
+        explain = request.args.get('explain', '').lower() in ('1', 'true', 'yes')
+        if explain and not model_service.can_explain(tier):
+            return explanation_unavailable()
+        resolved_tier = tier or model_service.default_tier
+        version = model_service.versions[resolved_tier]
+        
+        def build():
+            prediction_result = model_service.predict(validated_features, tier=tier, explain=explain)
+            response = jsonify(prediction_result)
+            response.headers['X-Model-Version'] = prediction_result['model_version']
+            response.headers['X-Model-Tier'] = prediction_result['model_tier']
+            return response, 200
+        
+        etag_parts = ('predict', version, resolved_tier, explain, canonical_feature_query(validated_features))
+        return cacheable_get(etag_parts, version, 'X-Model-Version', build)
+        
+    except DeadlineExceeded:
+        # Answered with 504 by deadline_exceeded
+        raise
+    except RuntimeError as e:
+        # Model loading or prediction errors
+        return jsonify({
+            "error": {
+                "code": "MODEL_ERROR",
+                "message": "Failed to generate prediction"
+            }
+        }), 500
+    except Exception as e:
+        # Unexpected errors
+        return jsonify({
+            "error": {
+                "code": "INTERNAL_ERROR",
+                "message": "An unexpected error occurred"
+            }
+        }), 500
+
+def explanation_unavailable():
+    """400 response for explain=true on a tier whose model cannot explain"""
+    return jsonify({
+        "error": {
+            "code": "EXPLANATION_UNAVAILABLE",
+            "message": "Explanations are only available for XGBoost model tiers"
+        }
+    }), 400
+
+def similar_tracks_from_query():
+    """
+    Cacheable GET form of /api/similar: ?f=<13 features>&n=5 plus optional
+    filters (see parse_filter_query)
+    
+    Served by the similar_tracks view, so admission limits and timeouts set
+    for similar_tracks apply to both forms.
+    """
+    try:
+        try:
+            raw_features = parse_feature_query(request.args.get('f', ''))
+        except ValueError as e:
+            return jsonify({
+                "error": {
+                    "code": "INVALID_REQUEST",
+                    "message": str(e)
+                }
+            }), 400
+        
+        is_valid, error_message, validated_features = validate_track_features(raw_features)
+        if not is_valid:
+            return jsonify({
+                "error": {
+                    "code": "VALIDATION_ERROR",
+                    "message": error_message
+                }
+            }), 400
+        
+        try:
+            n_recommendations = max(3, min(10, int(request.args.get('n', 5))))
+        except ValueError:
+            n_recommendations = 5
+        
+        data_service = get_data_service()
+        version = data_service.version
+        try:
+            filters = data_service.normalize_filters(parse_filter_query(request.args))
+        except ValueError as e:
+            return jsonify({
+                "error": {
+                    "code": "VALIDATION_ERROR",
+                    "message": str(e)
+                }
+            }), 400
+        
+        def build():
+            similar_tracks_list = data_service.find_similar_tracks(validated_features, n_recommendations, filters)
+            return jsonify({
+                "similar_tracks": similar_tracks_list
+            }), 200
+        
+        filter_key = tuple(sorted((key, repr(value)) for key, value in (filters or {}).items()))
+        etag_parts = ('similar', version, n_recommendations, filter_key, canonical_feature_query(validated_features))
+        return cacheable_get(etag_parts, version, 'X-Dataset-Version', build)
+        
+    except DeadlineExceeded:
+        # Answered with 504 by deadline_exceeded
+        raise
+    except RuntimeError as e:
+        # Dataset loading errors
+        return jsonify({
+            "error": {
+                "code": "DATA_ERROR",
+                "message": "Failed to load dataset"
+            }
+        }), 500
+    except Exception as e:
+        # Unexpected errors
+        return jsonify({
+            "error": {
+                "code": "INTERNAL_ERROR",
+                "message": "An unexpected error occurred"
+            }
+        }), 500
+
+@api_bp.route('/similar/batch', methods=['GET', 'POST'])
+def similar_tracks_batch():
+    """Find similar tracks for many feature vectors in one request"""
+    if request.method == 'GET':
+        # Registered so GET does not fall through to /similar/<track_id>
+        response = jsonify({
+            "error": {
+                "code": "METHOD_NOT_ALLOWED",
+                "message": "Use POST with a JSON 'queries' list"
+            }
+        })
+        response.status_code = 405
+        response.headers['Allow'] = 'POST'
+        return response
+    try:
+        data = request.get_json(silent=True)
+        queries = data.get('queries') if isinstance(data, dict) else None
+        
+        if not isinstance(queries, list) or not queries:
+            return jsonify({
+                "error": {
+                    "code": "INVALID_REQUEST",
+                    "message": "Request body must be JSON with a non-empty 'queries' list"
+                }
+            }), 400
+        if len(queries) > SIMILAR_BATCH_MAX_QUERIES:
+            return jsonify({
+                "error": {
+                    "code": "INVALID_REQUEST",
+                    "message": f"At most {SIMILAR_BATCH_MAX_QUERIES} queries are allowed per request"
+                }
+            }), 400
+        
+        # Validate every query (features nested under 'features' or at root level)
+        validated_queries = []
+        for index, query in enumerate(queries):
+            if not isinstance(query, dict):
+                is_valid, error_message = False, "must be an object"
+            else:
+                is_valid, error_message, validated_features = validate_track_features(query.get('features', query))
+            if not is_valid:
+                return jsonify({
+                    "error": {
+                        "code": "VALIDATION_ERROR",
+                        "message": f"Query {index}: {error_message}"
+                    }
+                }), 400
+            validated_queries.append(validated_features)
+        
+        # Get number of recommendations (default 5, between 3 and 10)
+        n_recommendations = data.get('n_recommendations', 5)
+        try:
+            n_recommendations = int(n_recommendations)
+            n_recommendations = max(3, min(10, n_recommendations))
+        except (ValueError, TypeError):
+            n_recommendations = 5
+        
+        data_service = get_data_service()
+        try:
+            results = data_service.find_similar_tracks_batch(
+                validated_queries, n_recommendations, data.get('filters')
+            )
+        except ValueError as e:
+            return jsonify({
+                "error": {
+                    "code": "VALIDATION_ERROR",
+                    "message": str(e)
+                }
+            }), 400
+        
+        return jsonify({
+            "results": [{"similar_tracks": similar_tracks_list} for similar_tracks_list in results]
+        }), 200
+        
+    except DeadlineExceeded:
+        # Answered with 504 by deadline_exceeded
+        raise
+    except RuntimeError as e:
+        # Dataset loading errors
+        return jsonify({
+            "error": {
+                "code": "DATA_ERROR",
+                "message": "Failed to load dataset"
+            }
+        }), 500
+    except Exception as e:
+        # Unexpected errors
+        return jsonify({
+            "error": {
+                "code": "INTERNAL_ERROR",
+                "message": "An unexpected error occurred"
+            }
+        }), 500
+
+@api_bp.route('/similar/<track_id>', methods=['GET'])
+def similar_to_track(track_id):
+    """Find tracks similar to a catalog track"""
+    try:
+        try:
+            n_recommendations = max(3, min(10, int(request.args.get('n', 5))))
+        except ValueError:
+            n_recommendations = 5
+        
+        data_service = get_data_service()
+        version = data_service.version
+        
+        def build():
+            try:
+                similar_tracks_list = data_service.similar_to_track(track_id, n_recommendations)
+            except KeyError:
+                return jsonify({
+                    "error": {
+                        "code": "NOT_FOUND",
+                        "message": f"Track {track_id} is not in the catalog"
+                    }
+                }), 404
+            return jsonify({
+                "track_id": track_id,
+                "similar_tracks": similar_tracks_list
+            }), 200
+        
+        return cacheable_get(('similar-track', version, track_id, n_recommendations), version, 'X-Dataset-Version', build)
+        
+    except DeadlineExceeded:
+        # Answered with 504 by deadline_exceeded
+        raise
+    except RuntimeError as e:
+        # Dataset loading errors
+        return jsonify({
+            "error": {
+                "code": "DATA_ERROR",
+                "message": "Failed to load dataset"
+            }
+        }), 500
+    except Exception as e:
+        # Unexpected errors
+        return jsonify({
+            "error": {
+                "code": "INTERNAL_ERROR",
+                "message": "An unexpected error occurred"
+            }
+        }), 500
+
+@api_bp.route('/tracks/search', methods=['GET'])
+def search_tracks():
+    """Find catalog tracks by name or artist"""
+    query = request.args.get('q', '').strip()
+    if not query or len(query) > 100:
+        return jsonify({
+            "error": {
+                "code": "INVALID_REQUEST",
+                "message": "q must be between 1 and 100 characters"
+            }
+        }), 400
+    try:
+        limit = max(1, min(50, int(request.args.get('limit', 10))))
+    except ValueError:
+        limit = 10
+    
+    try:
+        data_service = get_data_service()
+        start = time.perf_counter()
+        results = data_service.search_tracks(query, limit)
+        took_ms = (time.perf_counter() - start) * 1000
+        
+        return jsonify({
+            "query": query,
+            "results": results,
+            "took_ms": took_ms
+        }), 200
+        
     except RuntimeError as e:
         # Dataset loading errors
         return jsonify({
@@ -226,10 +898,138 @@ def eda_data():
     try:
         # Get data service and generate EDA data
         data_service = get_data_service()
-        eda_result = data_service.get_eda_data()
+        dataset_version = data_service.version
+        
+        def build():
+            # The EDA payload only changes with the dataset, so its serialized and
+            # compressed bodies are reused until the version changes
+            response = cached_response(
+                ('eda-data', dataset_version),
+                lambda: jsonify(data_service.get_eda_data())
+            )
+            return response, 200
+        
+        # Clients revalidate with If-None-Match and skip the download when unchanged
+        return cacheable_get(('eda-data', dataset_version), dataset_version, 'X-Dataset-Version', build)
+        
+    except DeadlineExceeded:
+        # Answered with 504 by deadline_exceeded
+        raise
+    except RuntimeError as e:
+        # Dataset loading errors
+        return jsonify({
+            "error": {
+                "code": "DATA_ERROR",
+                "message": "Failed to load dataset for EDA"
+            }
+        }), 500
+    except Exception as e:
+        # Unexpected errors
+        return jsonify({
+            "error": {
+                "code": "INTERNAL_ERROR",
+                "message": "An unexpected error occurred"
+            }
+        }), 500
+
+def parse_number_list(value: str) -> list:
+    """Parse a comma-separated query parameter into floats"""
+    numbers = [float(item) for item in value.split(',')]
+    if not all(math.isfinite(number) for number in numbers):
+        raise ValueError("values must be finite")
+    return numbers
+
+@api_bp.route('/eda-data/histogram', methods=['GET'])
+def eda_histogram():
+    """Get a histogram of one feature with a chosen number of bins and range"""
+    feature = request.args.get('feature')
+    try:
+        bins = int(request.args.get('bins', 20))
+        value_range = request.args.get('range')
+        if value_range is not None:
+            value_range = parse_number_list(value_range)
+            if len(value_range) != 2:
+                raise ValueError
+    except ValueError:
+        return jsonify({
+            "error": {
+                "code": "INVALID_REQUEST",
+                "message": "bins must be an integer and range a pair of numbers 'low,high'"
+            }
+        }), 400
+    
+    try:
+        data_service = get_data_service()
+        dataset_version = data_service.version
+        try:
+            histogram = data_service.feature_histogram(feature, bins, value_range)
+        except ValueError as e:
+            return jsonify({
+                "error": {
+                    "code": "VALIDATION_ERROR",
+                    "message": str(e)
+                }
+            }), 400
+        
+        cache_key = ('eda-histogram', dataset_version, feature, bins,
+                     tuple(value_range) if value_range else None)
+        return mark_cacheable(jsonify(histogram), cache_key), 200
+        
+    except DeadlineExceeded:
+        # Answered with 504 by deadline_exceeded
+        raise
+    except RuntimeError as e:
+        # Dataset loading errors
+        return jsonify({
+            "error": {
+                "code": "DATA_ERROR",
+                "message": "Failed to load dataset for EDA"
+            }
+        }), 500
+    except Exception as e:
+        # Unexpected errors
+        return jsonify({
+            "error": {
+                "code": "INTERNAL_ERROR",
+                "message": "An unexpected error occurred"
+            }
+        }), 500
+
+@api_bp.route('/eda-data/quantiles', methods=['GET'])
+def eda_quantiles():
+    """Get exact quantiles of one feature"""
+    feature = request.args.get('feature')
+    try:
+        quantiles = parse_number_list(request.args.get('q', '0.25,0.5,0.75'))
+    except ValueError:
+        return jsonify({
+            "error": {
+                "code": "INVALID_REQUEST",
+                "message": "q must be a comma-separated list of numbers"
+            }
+        }), 400
+    
+    try:
+        data_service = get_data_service()
+        try:
+            values = data_service.feature_quantiles(feature, quantiles)
+        except ValueError as e:
+            return jsonify({
+                "error": {
+                    "code": "VALIDATION_ERROR",
+                    "message": str(e)
+                }
+            }), 400
         
-        return jsonify(eda_result), 200
+        return jsonify({
+            "feature": feature,
+            "quantiles": quantiles,
+            "values": values
+        }), 200
         
+    except DeadlineExceeded:
+        # Answered with 504 by deadline_exceeded
+        raise
     except RuntimeError as e:
         # Dataset loading errors
         return jsonify({
@@ -246,3 +1046,90 @@ def eda_data():
                 "message": "An unexpected error occurred"
             }
         }), 500
+
+@api_bp.route('/admin/reload-model', methods=['POST'])
+def reload_model():
+    """Hot-reload the model artifacts from disk"""
+    if not is_admin_request():
+        return jsonify({
+            "error": {
+                "code": "FORBIDDEN",
+                "message": "Admin access is required for this operation"
+            }
+        }), 403
+    
+    try:
+        active_version, previous_version, reloaded = reload_model_service()
+        return jsonify({
+            "model_version": active_version,
+            "previous_version": previous_version,
+            "reloaded": reloaded
+        }), 200
+        
+    except RuntimeError as e:
+        # New artifacts failed to load or validate; the current model stays active
+        return jsonify({
+            "error": {
+                "code": "MODEL_ERROR",
+                "message": "Failed to reload model, the current model is still active"
+            }
+        }), 500
+
+@api_bp.route('/admin/tracks', methods=['POST'])
+def ingest_tracks():
+    """Append new tracks to the live catalog"""
+    if not is_admin_request():
+        return jsonify({
+            "error": {
+                "code": "FORBIDDEN",
+                "message": "Admin access is required for this operation"
+            }
+        }), 403
+    
+    try:
+        data = request.get_json(silent=True)
+        tracks = data.get('tracks') if isinstance(data, dict) else None
+        
+        if not isinstance(tracks, list) or not tracks:
+            return jsonify({
+                "error": {
+                    "code": "INVALID_REQUEST",
+                    "message": "Request body must be JSON with a non-empty 'tracks' list"
+                }
+            }), 400
+        
+        # Validate every track before anything is written
+        validated_tracks = []
+        for index, track in enumerate(tracks):
+            if not isinstance(track, dict):
+                is_valid, error_message = False, "must be an object"
+            else:
+                is_valid, error_message, validated_features = validate_track_features(track)
+            if not is_valid:
+                return jsonify({
+                    "error": {
+                        "code": "VALIDATION_ERROR",
+                        "message": f"Track {index}: {error_message}"
+                    }
+                }), 400
+            validated_tracks.append({**track, **validated_features})
+        
+        result = get_data_service().ingest_tracks(validated_tracks)
+        return jsonify(result), 200
+        
+    except RuntimeError as e:
+        # Dataset loading or worker sync errors
+        return jsonify({
+            "error": {
+                "code": "DATA_ERROR",
+                "message": "Failed to ingest tracks"
+            }
+        }), 500
+    except Exception as e:
+        # Unexpected errors
+        return jsonify({
+            "error": {
+                "code": "INTERNAL_ERROR",
+                "message": "An unexpected error occurred"
+            }
+        }), 500
@@ -0,0 +1,178 @@
+"""
+Bulk Scoring Module
+Streams a CSV or Parquet catalog through the model in chunks, optionally across
+worker processes, and writes predictions incrementally
+"""
+import os
+import time
+from collections import deque
+
+import numpy as np
+
+# Input columns copied to the output next to the predictions when present
+DEFAULT_KEEP_COLUMNS = ('track_id', 'track_name', 'artists')
+
+# ModelService of a scoring worker process, loaded once per process
+_worker_service = None
+
+
+def is_parquet(path: str) -> bool:
+    return path.lower().endswith(('.parquet', '.pq'))
+
+
+def require_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:  # pyarrow is optional, CSV is always available
+        raise RuntimeError("Parquet files need the optional pyarrow package")
+    return pyarrow
+
+
+def read_chunks(path: str, chunksize: int):
+    """Yield the rows of a CSV or Parquet file as DataFrames of up to chunksize rows"""
+    if is_parquet(path):
+        pyarrow = require_pyarrow()
+        parquet_file = pyarrow.parquet.ParquetFile(path)
+        for batch in parquet_file.iter_batches(batch_size=chunksize):
+            yield batch.to_pandas()
+    else:
+        import pandas as pd
+        yield from pd.read_csv(path, chunksize=chunksize)
+
+
+class _ChunkWriter:
+    """Appends DataFrames to a CSV or Parquet file, writing the header once"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.temp_path = path + '.partial'
+        self._parquet_writer = None
+        self._started = False
+
+    def write(self, frame):
+        if is_parquet(self.path):
+            pyarrow = require_pyarrow()
+            table = pyarrow.Table.from_pandas(frame, preserve_index=False)
+            if self._parquet_writer is None:
+                self._parquet_writer = pyarrow.parquet.ParquetWriter(self.temp_path, table.schema)
+            self._parquet_writer.write_table(table)
+        else:
+            frame.to_csv(self.temp_path, mode='a' if self._started else 'w', header=not self._started, index=False)
+        self._started = True
+
+    def close(self, complete: bool):
+        """Publish the output (or discard it when scoring failed)"""
+        if self._parquet_writer is not None:
+            self._parquet_writer.close()
+        if complete and self._started:
+            os.replace(self.temp_path, self.path)
+        elif os.path.exists(self.temp_path):
+            os.remove(self.temp_path)
+
+
+def _init_worker(model_args: tuple, fast_model_path, version: str, tier: str):
+    global _worker_service
+    from app.ml_service import ModelService
+
+    _worker_service = ModelService(*model_args, fast_model_path=fast_model_path)
+    if _worker_service.versions[tier] != version:
+        raise RuntimeError("Model artifacts changed on disk while scoring")
+
+
+def _worker_score(args):
+    base, tier = args
+    return _worker_service.score_matrix(base, tier)
+
+
+def score_file(input_path: str, output_path: str, model_service, tier: str = 'full',
+               chunksize: int = 50000, processes: int = 1, keep_columns=DEFAULT_KEEP_COLUMNS) -> dict:
+    """
+    Score every row of a catalog file
+
+    Chunks are read, scored and written in order with at most two chunks per
+    worker in flight, so memory stays constant however large the file is. The
+    output is written next to the target and moved into place once complete.
+    Rows with a missing feature get no prediction.
+
+    Args:
+        input_path: CSV or Parquet file with the 13 base feature columns
+        output_path: CSV or Parquet file to write (by extension)
+        model_service: ModelService whose artifacts and feature pipeline are used;
+            worker processes load the same artifacts
+        tier: Model tier ('full' or 'fast')
+        chunksize: Rows per chunk
+        processes: Worker processes (1 scores in this process)
+        keep_columns: Input columns copied to the output when present
+
+    Returns:
+        Dictionary with row, scored, skipped and hit counts, the model version
+        and the elapsed seconds
+
+    Raises:
+        ValueError: If the tier is unknown or the input lacks a feature column
+    """
+    import pandas as pd
+
+    tier = model_service.resolve_tier(tier)
+    version = model_service.versions[tier]
+    features = model_service.base_features
+    summary = {'rows': 0, 'scored': 0, 'skipped': 0, 'hits': 0, 'model_version': version, 'model_tier': tier}
+    start = time.perf_counter()
+
+    def prepared_chunks():
+        for chunk in read_chunks(input_path, chunksize):
+            missing = [col for col in features if col not in chunk.columns]
+            if missing:
+                raise ValueError(f"Input is missing feature columns: {', '.join(missing)}")
+            # Non-numeric values become NaN, so those rows are skipped
+            base = chunk[features].apply(pd.to_numeric, errors='coerce').to_numpy(dtype=np.float64)
+            yield chunk, base
+
+    def write_result(writer, chunk, probabilities):
+        output = chunk[[col for col in keep_columns if col in chunk.columns]].copy()
+        scored = ~np.isnan(probabilities[:, 1])
+        # The predicted class is the most probable one (ties go to 'miss'), as in the API
+        labels = np.where(probabilities[:, 1] > probabilities[:, 0], 'hit', 'miss')
+        output['prediction'] = np.where(scored, labels, '')
+        output['probability_miss'] = probabilities[:, 0]
+        output['probability_hit'] = probabilities[:, 1]
+        output['model_version'] = version
+        output['model_tier'] = tier
+        writer.write(output)
+
+        summary['rows'] += len(chunk)
+        summary['scored'] += int(scored.sum())
+        summary['skipped'] += int((~scored).sum())
+        summary['hits'] += int(np.sum(scored & (labels == 'hit')))
+
+    writer = _ChunkWriter(output_path)
+    complete = False
+    try:
+        if processes <= 1:
+            for chunk, base in prepared_chunks():
+                write_result(writer, chunk, model_service.score_matrix(base, tier))
+        else:
+            from concurrent.futures import ProcessPoolExecutor
+            import multiprocessing
+
+            model_args = (model_service.model_paths['full'], model_service.scaler_path, model_service.genre_encoder_path)
+            initargs = (model_args, model_service.model_paths.get('fast'), version, tier)
+            context = multiprocessing.get_context('spawn')
+            with ProcessPoolExecutor(processes, mp_context=context,
+                                     initializer=_init_worker, initargs=initargs) as executor:
+                pending = deque()
+                for chunk, base in prepared_chunks():
+                    pending.append((chunk, executor.submit(_worker_score, (base, tier))))
+                    if len(pending) >= 2 * processes:
+                        chunk, future = pending.popleft()
+                        write_result(writer, chunk, future.result())
+                while pending:
+                    chunk, future = pending.popleft()
+                    write_result(writer, chunk, future.result())
+        complete = True
+    finally:
+        writer.close(complete)
+
+    summary['seconds'] = time.perf_counter() - start
+    return summary
@@ -0,0 +1,186 @@
+"""
+Search Index Module
+Prefix and trigram indexes over track names and artists for type-ahead search
+"""
+import bisect
+import heapq
+import itertools
+import re
+import threading
+import unicodedata
+
+import numpy as np
+
+# Ranking of match kinds, best first
+MATCH_RANK = {'exact': 0, 'prefix': 1, 'word': 2, 'fuzzy': 3}
+# Smallest trigram similarity (Dice coefficient) reported as a fuzzy match
+MIN_FUZZY_SCORE = 0.4
+# Most prefix entries examined per query (a one-letter prefix matches a lot)
+MAX_PREFIX_SCAN = 1000
+
+_SEPARATORS = re.compile(r'[^0-9a-z]+')
+
+
+def normalize(text) -> str:
+    """Lowercase, strip accents and reduce punctuation to single spaces"""
+    text = unicodedata.normalize('NFKD', str(text))
+    text = ''.join(char for char in text if not unicodedata.combining(char))
+    return _SEPARATORS.sub(' ', text.casefold()).strip()
+
+
+def trigrams(text: str) -> set:
+    """Trigrams of a normalized string, padded so short strings have some"""
+    padded = f'  {text} '
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class TrackSearchIndex:
+    def __init__(self):
+        """
+        Initialize an empty index
+
+        Each track is indexed by its name and each of its artists (multiple
+        artists are separated by ';'), as whole strings and word by word. The
+        prefix index is a sorted list of (key, kind, row) entries searched
+        with bisect. The trigram index maps trigrams to the ids of the distinct
+        names, so a fuzzy query only scores names that share a trigram.
+
+        Each add() builds a new shard of both indexes, so its cost depends on
+        the number of new tracks; fold() merges the shards into one.
+        """
+        self._shards = ()
+        self._terms = []
+        self._term_ids = {}
+        self._term_rows = []
+        # Trigram count of each name, grown by doubling
+        self._term_trigram_counts = np.empty(0, dtype=np.float64)
+        self._shards_lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return sum(len(entries) for entries, _ in self._shards)
+
+    def add(self, track_names, artists, first_row: int = 0):
+        """Index tracks whose rows start at first_row as a new shard"""
+        new_entries = []
+        new_postings = {}
+        new_counts = []
+        for row, (track_name, track_artists) in enumerate(zip(track_names, artists), first_row):
+            names = [track_name] + [name for name in str(track_artists).split(';') if name.strip()]
+            for name in names:
+                key = normalize(name)
+                if not key:
+                    continue
+                new_entries.append((key, 'name', row))
+                words = key.split(' ')
+                new_entries.extend((word, 'word', row) for word in words[1:])
+
+                term_id = self._term_ids.get(key)
+                if term_id is None:
+                    term_id = self._term_ids[key] = len(self._terms)
+                    self._terms.append(key)
+                    self._term_rows.append([])
+                    grams = trigrams(key)
+                    new_counts.append(len(grams))
+                    for gram in grams:
+                        new_postings.setdefault(gram, []).append(term_id)
+                self._term_rows[term_id].append(row)
+
+        # Counts before the shard that refers to them; readers see either the
+        # old or the new shards
+        first_term = len(self._terms) - len(new_counts)
+        counts = self._term_trigram_counts
+        if len(self._terms) > len(counts):
+            counts = np.empty(max(len(self._terms), 2 * len(counts), 16), dtype=np.float64)
+            counts[:first_term] = self._term_trigram_counts[:first_term]
+        counts[first_term:len(self._terms)] = new_counts
+        self._term_trigram_counts = counts
+
+        new_entries.sort()
+        postings = {gram: np.array(term_ids, dtype=np.int32) for gram, term_ids in new_postings.items()}
+        with self._shards_lock:
+            self._shards = self._shards + ((new_entries, postings),)
+
+    def fold(self):
+        """
+        Merge the shards into one, so searches do one lookup per query again
+
+        Shards added while merging are kept after the merged one.
+        """
+        shards = self._shards
+        if len(shards) <= 1:
+            return
+        entries = list(heapq.merge(*(shard_entries for shard_entries, _ in shards)))
+        grouped = {}
+        for _, shard_postings in shards:
+            for gram, term_ids in shard_postings.items():
+                grouped.setdefault(gram, []).append(term_ids)
+        postings = {gram: np.concatenate(lists) if len(lists) > 1 else lists[0] for gram, lists in grouped.items()}
+        with self._shards_lock:
+            self._shards = ((entries, postings),) + self._shards[len(shards):]
+
+    def search(self, query: str, limit: int = 10) -> list:
+        """
+        Find tracks by name or artist
+
+        Exact and prefix matches on a whole name or artist rank first, then
+        prefix matches on a later word, then fuzzy matches by trigram
+        similarity for misspellings.
+
+        Args:
+            query: Text typed by the user
+            limit: Largest number of results
+
+        Returns:
+            List of (row, match_kind, score) tuples, best first
+        """
+        key = normalize(query)
+        if not key or limit <= 0:
+            return []
+
+        best = {}
+
+        def consider(row, kind, score):
+            candidate = (MATCH_RANK[kind], -score)
+            if row not in best or candidate < best[row][0]:
+                best[row] = (candidate, kind, score)
+
+        runs = []
+        for entries, _ in self._shards:
+            start = bisect.bisect_left(entries, (key,))
+            runs.append(entries[start:start + MAX_PREFIX_SCAN])
+        for key_entry, kind, row in itertools.islice(heapq.merge(*runs), MAX_PREFIX_SCAN):
+            if not key_entry.startswith(key):
+                break
+            if kind == 'name':
+                consider(row, 'exact' if key_entry == key else 'prefix', len(key) / len(key_entry))
+            else:
+                consider(row, 'word', len(key) / len(key_entry))
+
+        if len(best) < limit:
+            for term_id, score in self._fuzzy_terms(key):
+                for row in self._term_rows[term_id]:
+                    consider(row, 'fuzzy', score)
+
+        ranked = sorted(best.items(), key=lambda item: (item[1][0], item[0]))
+        return [(row, kind, score) for row, (_, kind, score) in ranked[:limit]]
+
+    def _fuzzy_terms(self, key: str, max_terms: int = 50) -> list:
+        """Names whose trigram Dice similarity with key is at least MIN_FUZZY_SCORE"""
+        grams = trigrams(key)
+        # Shards before counts: every term id found has its count
+        shards = self._shards
+        counts = self._term_trigram_counts
+        lists = [postings[gram] for _, postings in shards for gram in grams if gram in postings]
+        if not lists:
+            return []
+        shared = np.bincount(np.concatenate(lists))
+        # Dice >= MIN_FUZZY_SCORE needs at least this many shared trigrams
+        candidates = np.flatnonzero(shared >= MIN_FUZZY_SCORE * len(grams) / 2)
+        if len(candidates) == 0:
+            return []
+        sizes = counts[candidates]
+        scores = 2 * shared[candidates] / (len(grams) + sizes)
+        keep = scores >= MIN_FUZZY_SCORE
+        candidates, scores = candidates[keep], scores[keep]
+        order = np.argsort(-scores, kind='stable')[:max_terms]
+        return [(int(candidates[i]), float(scores[i])) for i in order]
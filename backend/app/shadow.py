@@ -0,0 +1,113 @@
+"""
+Shadow Scoring Module
+Scores live traffic with a candidate model off the request path
+"""
+import queue
+import threading
+import time
+
+import numpy as np
+
+from app.metrics import metrics
+
+# Buckets for absolute hit-probability differences between shadow and primary
+DELTA_BUCKETS = (0.01, 0.02, 0.05, 0.1, 0.2, 0.3, 0.5, 1.0)
+
+
+class ShadowScorer:
+    def __init__(self, shadow_service, queue_size: int = 1000, max_batch_size: int = 64):
+        """
+        Initialize the shadow scorer
+
+        Requests are handed over through a bounded queue and never wait: when
+        the queue is full the sample is dropped and counted instead.
+
+        Args:
+            shadow_service: ModelService loaded from the candidate artifacts.
+                It receives the same base feature matrix as the primary model
+                and applies its own feature engineering and scaler.
+            queue_size: Largest number of pending requests
+            max_batch_size: Largest number of requests scored per shadow call
+        """
+        self.shadow_service = shadow_service
+        self.version = shadow_service.version
+        self.max_batch_size = max(1, int(max_batch_size))
+        self._queue = queue.Queue(maxsize=queue_size)
+
+        self._scored = metrics.counter('shadow_scored_total')
+        self._agreements = metrics.counter('shadow_agreements_total')
+        self._dropped = metrics.counter('shadow_dropped_total')
+        self._errors = metrics.counter('shadow_errors_total')
+        self._agreement_rate = metrics.gauge('shadow_agreement_rate')
+        self._delta = metrics.histogram('shadow_probability_delta', DELTA_BUCKETS)
+        self._latency = metrics.histogram('shadow_latency_ms')
+        metrics.gauge('shadow_model_version').set(self.version)
+
+        self._closed = False
+        self._worker = threading.Thread(target=self._run, name='shadow-scorer', daemon=True)
+        self._worker.start()
+
+    def submit(self, base: np.ndarray, primary_probabilities: np.ndarray):
+        """
+        Queue a scored request for shadow comparison without blocking
+
+        Args:
+            base: Base feature matrix given to the primary model
+            primary_probabilities: The primary model's probabilities for base
+        """
+        if self._closed:
+            return
+        try:
+            self._queue.put_nowait((base, primary_probabilities))
+        except queue.Full:
+            self._dropped.inc(len(base))
+
+    def close(self):
+        """Stop the worker after the queued requests have been scored"""
+        if not self._closed:
+            self._closed = True
+            self._queue.put(None)
+            self._worker.join()
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+            items = [item]
+            stop = False
+            while len(items) < self.max_batch_size:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    stop = True
+                    break
+                items.append(item)
+
+            self._score(items)
+            if stop:
+                break
+
+    def _score(self, items):
+        """Score a batch with the shadow model and record the comparison"""
+        base = np.vstack([item[0] for item in items])
+        primary = np.vstack([item[1] for item in items])
+
+        start = time.perf_counter()
+        try:
+            shadow = self.shadow_service.predict_proba_matrix(base)
+        except Exception:
+            self._errors.inc(len(base))
+            return
+        self._latency.observe((time.perf_counter() - start) * 1000)
+
+        agreements = int(np.sum(np.argmax(shadow, axis=1) == np.argmax(primary, axis=1)))
+        for delta in np.abs(shadow[:, 1] - primary[:, 1]):
+            self._delta.observe(float(delta))
+
+        self._scored.inc(len(base))
+        self._agreements.inc(agreements)
+        scored = self._scored.snapshot()
+        self._agreement_rate.set(self._agreements.snapshot() / scored if scored else 0.0)
@@ -0,0 +1,77 @@
+"""
+Model Artifact Benchmark
+Compares ModelService load time and on-disk size for the joblib pickles
+against the native artifact bundle (UBJSON booster, .npz and manifest)
+"""
+import os
+import statistics
+import sys
+import tempfile
+import time
+import warnings
+
+import numpy as np
+
+# Add parent directory to path to import app modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.artifacts import MANIFEST_NAME, save_bundle
+from app.ml_service import ModelService
+
+MODEL_DIR = os.path.join(os.path.dirname(__file__), '..', 'models')
+PICKLE_FILES = ('model.pkl', 'scaler.pkl', 'genre_encoder.pkl')
+BUNDLE_FILES = ('model.ubj', 'preprocess.npz', MANIFEST_NAME)
+
+
+def load_times(build, repeat: int) -> list:
+    """Wall time of each ModelService construction in milliseconds"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        build()
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def total_size(directory: str, names) -> int:
+    return sum(os.path.getsize(os.path.join(directory, name)) for name in names)
+
+
+if __name__ == '__main__':
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    warnings.filterwarnings('ignore')
+
+    def load_pickles():
+        return ModelService(
+            os.path.join(MODEL_DIR, 'model.pkl'),
+            os.path.join(MODEL_DIR, 'scaler.pkl'),
+            os.path.join(MODEL_DIR, 'genre_encoder.pkl')
+        )
+
+    with tempfile.TemporaryDirectory() as bundle_dir:
+        pickled = load_pickles()
+        save_bundle(pickled.model, pickled.scaler, bundle_dir, pickled.genre_encoder)
+
+        def load_bundle():
+            return ModelService(os.path.join(bundle_dir, 'model.ubj'))
+
+        native = load_bundle()
+        base = np.random.default_rng(0).uniform(0, 1, (1000, 13)) * [200, 1, 1, -40, 1, 1, 1, 1, 1, 400000, 11, 1, 4]
+        max_diff = float(np.max(np.abs(
+            pickled.predict_proba_matrix(base) - native.predict_proba_matrix(base)
+        )))
+
+        rows = [
+            ('joblib pickles', load_times(load_pickles, repeat), total_size(MODEL_DIR, PICKLE_FILES)),
+            ('native bundle', load_times(load_bundle, repeat), total_size(bundle_dir, BUNDLE_FILES)),
+        ]
+
+    print("=" * 60)
+    print("Model Artifact Benchmark")
+    print(f"ModelService loads per format: {repeat}")
+    print("=" * 60)
+    print(f"\n{'format':<16s} {'median ms':>10s} {'min ms':>10s} {'size B':>12s}")
+    print("-" * 52)
+    for name, timings, size in rows:
+        print(f"{name:<16s} {statistics.median(timings):>10.2f} {min(timings):>10.2f} {size:>12,d}")
+    print(f"\nMax probability difference: {max_diff:.2e}")
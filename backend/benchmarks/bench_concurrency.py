@@ -0,0 +1,180 @@
+"""
+Concurrency Capacity Benchmark
+Compares the WSGI (thread-per-request) and ASGI serving modes when slow clients
+are connected. Both modes get the same number of worker threads; slow clients
+trickle their request bodies while fast clients measure /api/predict throughput.
+
+Requires uvicorn for the ASGI mode.
+"""
+import argparse
+import http.client
+import json
+import os
+import socket
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Add parent directory to path to import app modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from werkzeug.serving import BaseWSGIServer, WSGIRequestHandler
+
+from app import create_app
+from app.asgi import AsgiApp
+
+SAMPLE_BODY = json.dumps({
+    'tempo': 120.0, 'energy': 0.8, 'danceability': 0.7, 'loudness': -5.0,
+    'valence': 0.6, 'acousticness': 0.1, 'instrumentalness': 0.0,
+    'liveness': 0.2, 'speechiness': 0.05, 'duration_ms': 200000,
+    'key': 5, 'mode': 1, 'time_signature': 4
+}).encode('utf-8')
+
+
+class QuietRequestHandler(WSGIRequestHandler):
+    def log_request(self, *args, **kwargs):
+        pass
+
+
+class PooledWSGIServer(BaseWSGIServer):
+    """WSGI server with a fixed worker pool, like a gthread worker with N threads"""
+
+    def __init__(self, host, port, app, workers):
+        super().__init__(host, port, app, handler=QuietRequestHandler)
+        self.pool = ThreadPoolExecutor(max_workers=workers)
+
+    def process_request(self, request, client_address):
+        self.pool.submit(self._process, request, client_address)
+
+    def _process(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+
+def start_wsgi(port, workers):
+    server = PooledWSGIServer('127.0.0.1', port, create_app(), workers)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server.shutdown
+
+
+def start_asgi(port, workers):
+    import uvicorn
+
+    config = uvicorn.Config(
+        AsgiApp(create_app(), max_workers=workers), host='127.0.0.1', port=port,
+        log_level='error', lifespan='off', loop='asyncio', http='h11'
+    )
+    server = uvicorn.Server(config)
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.05)
+
+    def stop():
+        server.should_exit = True
+        thread.join()
+    return stop
+
+
+def slow_client(port, stop_event):
+    """Send a request body one byte at a time until told to stop"""
+    try:
+        sock = socket.create_connection(('127.0.0.1', port))
+        sock.sendall(
+            b'POST /api/predict HTTP/1.1\r\nHost: localhost\r\n'
+            b'Content-Type: application/json\r\n'
+            + f'Content-Length: {len(SAMPLE_BODY)}\r\n\r\n'.encode('latin-1')
+        )
+        for byte in SAMPLE_BODY:
+            if stop_event.wait(0.5):
+                break
+            sock.sendall(bytes([byte]))
+        sock.close()
+    except OSError:
+        pass
+
+
+def fast_client(port, deadline, latencies):
+    """Issue predictions back to back until the deadline"""
+    while time.perf_counter() < deadline:
+        conn = http.client.HTTPConnection('127.0.0.1', port, timeout=10)
+        start = time.perf_counter()
+        try:
+            conn.request('POST', '/api/predict', body=SAMPLE_BODY,
+                         headers={'Content-Type': 'application/json'})
+            response = conn.getresponse()
+            response.read()
+            if response.status == 200:
+                latencies.append(time.perf_counter() - start)
+        except OSError:
+            pass
+        finally:
+            conn.close()
+
+
+def run_mode(name, start_server, port, workers, slow_clients, fast_clients, duration):
+    stop_server = start_server(port, workers)
+    # Warm up the model and dataset before measuring
+    fast_client(port, time.perf_counter() + 0.5, [])
+
+    stop_event = threading.Event()
+    slow_threads = [
+        threading.Thread(target=slow_client, args=(port, stop_event), daemon=True)
+        for _ in range(slow_clients)
+    ]
+    for thread in slow_threads:
+        thread.start()
+    time.sleep(0.2)
+
+    latencies = []
+    deadline = time.perf_counter() + duration
+    fast_threads = [
+        threading.Thread(target=fast_client, args=(port, deadline, latencies))
+        for _ in range(fast_clients)
+    ]
+    for thread in fast_threads:
+        thread.start()
+    for thread in fast_threads:
+        thread.join(timeout=duration + 30)
+
+    stop_event.set()
+    stop_server()
+
+    latencies.sort()
+    if latencies:
+        p50 = latencies[len(latencies) // 2] * 1000
+        p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000
+    else:
+        p50 = p99 = float('nan')
+    print(f"{name:<6s} {len(latencies) / duration:>12.1f} {p50:>10.2f} {p99:>10.2f}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--workers', type=int, default=4, help='worker threads per mode')
+    parser.add_argument('--slow-clients', type=int, default=4, help='clients trickling bodies')
+    parser.add_argument('--fast-clients', type=int, default=8, help='clients measuring throughput')
+    parser.add_argument('--duration', type=float, default=5.0, help='seconds per mode')
+    args = parser.parse_args()
+
+    print("=" * 42)
+    print("Concurrency Capacity Benchmark")
+    print(f"{args.workers} workers, {args.slow_clients} slow clients, "
+          f"{args.fast_clients} fast clients, {args.duration:.0f}s")
+    print("=" * 42)
+    print(f"{'mode':<6s} {'req/s':>12s} {'p50 ms':>10s} {'p99 ms':>10s}")
+    print("-" * 42)
+
+    run_mode('wsgi', start_wsgi, 5101, args.workers, args.slow_clients, args.fast_clients, args.duration)
+    try:
+        import uvicorn  # noqa: F401
+    except ImportError:
+        print("asgi   skipped (uvicorn is not installed)")
+    else:
+        run_mode('asgi', start_asgi, 5102, args.workers, args.slow_clients, args.fast_clients, args.duration)
@@ -0,0 +1,89 @@
+"""
+EDA Benchmark
+Compares the whole-DataFrame pandas EDA against the chunked single-pass engine
+(inline and across worker processes) on a generated catalog
+"""
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+# Add parent directory to path to import app modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.eda_engine import HISTOGRAM_RANGES, compute_eda_file
+from generate_sample_dataset import generate_sample_dataset
+
+FEATURE_COLUMNS = list(HISTOGRAM_RANGES)
+
+
+def pandas_eda(path: str) -> dict:
+    """The previous in-memory implementation: load everything, one pass per statistic"""
+    df = pd.read_csv(path)
+    distributions = {}
+    statistics = {}
+    for col in FEATURE_COLUMNS:
+        values = df[col].dropna()
+        counts, edges = np.histogram(values, bins=20)
+        distributions[col] = {'bins': edges, 'counts': counts}
+        quartiles = values.quantile([0.25, 0.50, 0.75]).to_numpy()
+        statistics[col] = {
+            'mean': values.mean(), 'std': values.std(), 'min': values.min(), 'max': values.max(),
+            'q25': quartiles[0], 'q50': quartiles[1], 'q75': quartiles[2]
+        }
+    threshold = df['popularity'].quantile(0.70)
+    hits = int((df['popularity'] >= threshold).sum())
+    return {
+        'feature_distributions': distributions,
+        'correlations': {'features': FEATURE_COLUMNS, 'matrix': df[FEATURE_COLUMNS].corr().to_numpy()},
+        'summary_statistics': statistics,
+        'hit_miss_distribution': {'hit': hits, 'miss': len(df) - hits}
+    }
+
+
+def timed(run):
+    start = time.perf_counter()
+    result = run()
+    return result, time.perf_counter() - start
+
+
+if __name__ == '__main__':
+    n_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    processes = os.cpu_count() or 1
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'dataset.csv')
+        generate_sample_dataset(n_rows, path, processes=processes, verbose=False)
+        # Rank errors of the medians are measured on a sample of the catalog
+        sample = pd.read_csv(path, usecols=FEATURE_COLUMNS, nrows=200000)
+
+        runs = [
+            ('pandas (in memory)', lambda: pandas_eda(path)),
+            ('engine, 1 process', lambda: compute_eda_file(path, FEATURE_COLUMNS)),
+            (f'engine, {processes} processes', lambda: compute_eda_file(path, FEATURE_COLUMNS, processes=processes)),
+        ]
+        rows = [(name, *timed(run)) for name, run in runs]
+        exact = rows[0][1]
+
+    print("=" * 60)
+    print("EDA Benchmark")
+    print(f"Rows: {n_rows:,d}")
+    print("=" * 60)
+    print(f"\n{'method':<24s} {'seconds':>8s} {'corr err':>10s} {'q50 rank err':>13s} {'hist err':>9s}")
+    print("-" * 68)
+    for name, result, seconds in rows:
+        corr_error = np.nanmax(np.abs(result['correlations']['matrix'] - exact['correlations']['matrix']))
+        rank_error = max(
+            abs((sample[col] <= result['summary_statistics'][col]['q50']).mean()
+                - (sample[col] <= exact['summary_statistics'][col]['q50']).mean())
+            for col in FEATURE_COLUMNS
+        )
+        hist_error = max(
+            np.abs(result['feature_distributions'][col]['counts']
+                   - exact['feature_distributions'][col]['counts']).sum() / n_rows
+            for col in FEATURE_COLUMNS
+        )
+        print(f"{name:<24s} {seconds:>8.2f} {corr_error:>10.1e} {rank_error:>13.4f} {hist_error:>9.4f}")
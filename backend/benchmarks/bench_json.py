@@ -0,0 +1,90 @@
+"""
+JSON Serialization Benchmark
+Compares Flask's default JSON provider against the NumPy-aware fast provider
+for each API endpoint payload (serialization time and payload size)
+"""
+import os
+import sys
+import time
+
+import numpy as np
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+
+# Add parent directory to path to import app modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.json_provider import NumpyJSONProvider, orjson
+from app.routes import get_data_service, get_model_service
+
+SAMPLE_FEATURES = {
+    'tempo': 120.0, 'energy': 0.8, 'danceability': 0.7, 'loudness': -5.0,
+    'valence': 0.6, 'acousticness': 0.1, 'instrumentalness': 0.0,
+    'liveness': 0.2, 'speechiness': 0.05, 'duration_ms': 200000,
+    'key': 5, 'mode': 1, 'time_signature': 4
+}
+
+
+def to_builtin(obj):
+    """Recursively convert NumPy values to Python builtins (the pre-provider code path)"""
+    if isinstance(obj, dict):
+        return {key: to_builtin(value) for key, value in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [to_builtin(value) for value in obj]
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    if isinstance(obj, np.generic):
+        return obj.item()
+    return obj
+
+
+def time_call(fn, repeat: int) -> float:
+    """Return the best per-call time in milliseconds"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def bench_payload(name: str, payload, repeat: int = 50):
+    """Benchmark one payload with both providers and print a result row"""
+    default_app = Flask('bench_default')
+    fast_app = Flask('bench_fast')
+    fast_app.json = NumpyJSONProvider(fast_app)
+
+    with default_app.app_context():
+        default_ms = time_call(lambda: default_app.json.response(to_builtin(payload)), repeat)
+        default_size = len(default_app.json.response(to_builtin(payload)).get_data())
+
+    with fast_app.app_context():
+        fast_ms = time_call(lambda: fast_app.json.response(payload), repeat)
+        fast_size = len(fast_app.json.response(payload).get_data())
+
+    speedup = default_ms / fast_ms if fast_ms > 0 else float('inf')
+    print(f"{name:<14s} {default_ms:>10.3f} {fast_ms:>10.3f} {speedup:>8.1f}x "
+          f"{default_size:>12,d} {fast_size:>12,d}")
+
+
+if __name__ == '__main__':
+    print("=" * 74)
+    print("JSON Serialization Benchmark")
+    print(f"Fast provider backend: {'orjson ' + orjson.__version__ if orjson else 'stdlib json'}")
+    print("=" * 74)
+
+    data_service = get_data_service()
+    payloads = {
+        '/eda-data': data_service.get_eda_data(),
+        '/similar': {'similar_tracks': data_service.find_similar_tracks(SAMPLE_FEATURES, 10)},
+    }
+    try:
+        payloads['/predict'] = get_model_service().predict(SAMPLE_FEATURES)
+    except RuntimeError as e:
+        print(f"Skipping /predict: {e}")
+
+    print(f"\n{'endpoint':<14s} {'default ms':>10s} {'fast ms':>10s} {'speedup':>9s} "
+          f"{'default B':>12s} {'fast B':>12s}")
+    print("-" * 74)
+    for endpoint, payload in payloads.items():
+        bench_payload(endpoint, payload)
@@ -0,0 +1,47 @@
+"""
+Bulk Scoring Benchmark
+Rows per second of score_file on a generated catalog for an
+increasing number of worker processes
+"""
+import os
+import sys
+import tempfile
+import warnings
+
+# Add parent directory to path to import app modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.ml_service import ModelService
+from app.scoring import score_file
+from generate_sample_dataset import generate_sample_dataset
+
+MODEL_DIR = os.path.join(os.path.dirname(__file__), '..', 'models')
+
+
+if __name__ == '__main__':
+    n_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 500000
+    max_processes = os.cpu_count() or 1
+    warnings.filterwarnings('ignore')
+
+    model_service = ModelService(
+        os.path.join(MODEL_DIR, 'model.pkl'),
+        os.path.join(MODEL_DIR, 'scaler.pkl'),
+        os.path.join(MODEL_DIR, 'genre_encoder.pkl')
+    )
+
+    print("=" * 60)
+    print("Bulk Scoring Benchmark")
+    print(f"Rows: {n_rows:,d}")
+    print("=" * 60)
+    print(f"\n{'processes':>10s} {'seconds':>10s} {'rows/s':>12s}")
+    print("-" * 34)
+    with tempfile.TemporaryDirectory() as directory:
+        input_path = os.path.join(directory, 'catalog.csv')
+        generate_sample_dataset(n_rows, input_path, processes=max_processes, verbose=False)
+
+        processes = 1
+        while processes <= max_processes:
+            summary = score_file(input_path, os.path.join(directory, 'scores.csv'), model_service,
+                                 processes=processes)
+            print(f"{processes:>10d} {summary['seconds']:>10.2f} {n_rows / summary['seconds']:>12,.0f}")
+            processes *= 2
@@ -0,0 +1,94 @@
+"""
+Startup Import Budget Check
+Runs app startup under `python -X importtime`, reports the most expensive
+imports and fails when the total exceeds the budget or a heavy library is
+imported before the first request
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+# What a serving process runs before it can answer /api/health
+STARTUP_CODE = 'from app import create_app; create_app()'
+
+# Libraries that must only be imported on first use
+HEAVY_MODULES = ('pandas', 'sklearn', 'scipy', 'xgboost', 'joblib')
+
+DEFAULT_BUDGET_MS = 500
+
+
+def measure_imports(code: str = STARTUP_CODE) -> list:
+    """
+    Import cost of running code in a fresh interpreter
+
+    Returns:
+        List of (module, self_ms, cumulative_ms, depth) in import order
+    """
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', code],
+        cwd=BACKEND_DIR, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        errors = [line for line in result.stderr.splitlines() if not line.startswith('import time:')]
+        raise RuntimeError("Startup failed:\n" + "\n".join(errors))
+
+    imports = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip(' ')) - 1) // 2
+        imports.append((name.strip(), int(self_us) / 1000, int(cumulative_us) / 1000, depth))
+    return imports
+
+
+def check_import_budget(budget_ms: float = DEFAULT_BUDGET_MS, heavy_modules=HEAVY_MODULES):
+    """
+    Measure startup imports against the budget
+
+    Returns:
+        Tuple of (total_ms, imports, problems) where problems lists every
+        budget or heavy-import violation
+    """
+    imports = measure_imports()
+    total_ms = sum(cumulative for _, _, cumulative, depth in imports if depth == 0)
+
+    problems = []
+    if total_ms > budget_ms:
+        problems.append(f"startup imports took {total_ms:.0f} ms (budget {budget_ms:.0f} ms)")
+    loaded = {name.split('.')[0] for name, _, _, _ in imports}
+    for module in heavy_modules:
+        if module in loaded:
+            problems.append(f"{module} is imported at startup")
+    return total_ms, imports, problems
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--budget-ms', type=float,
+                        default=float(os.getenv('IMPORT_BUDGET_MS', DEFAULT_BUDGET_MS)))
+    parser.add_argument('--top', type=int, default=15, help='number of imports to list')
+    args = parser.parse_args()
+
+    total_ms, imports, problems = check_import_budget(args.budget_ms)
+
+    print("=" * 60)
+    print("Startup Import Budget Check")
+    print(f"Startup code: {STARTUP_CODE}")
+    print("=" * 60)
+    print(f"\n{'module':<36s} {'self ms':>10s} {'total ms':>10s}")
+    print("-" * 58)
+    # Top-level imports and the packages they pull in directly
+    outer = sorted((entry for entry in imports if entry[3] <= 1), key=lambda entry: -entry[2])
+    for name, self_ms, cumulative_ms, _ in outer[:args.top]:
+        print(f"{name:<36s} {self_ms:>10.1f} {cumulative_ms:>10.1f}")
+    print(f"\nTotal: {total_ms:.0f} ms (budget {args.budget_ms:.0f} ms)")
+
+    if problems:
+        for problem in problems:
+            print(f"FAIL: {problem}")
+        sys.exit(1)
+    print("OK")
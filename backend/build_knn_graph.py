@@ -0,0 +1,28 @@
+"""
+k-NN Graph Build Script
+Precomputes every catalog track's nearest neighbours for /api/similar/<track_id>
+"""
+import argparse
+import os
+import time
+
+from app.data_service import DataService
+from app.knn_graph import build_knn_graph, save_knn_graph
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--dataset', default=os.getenv('DATASET_PATH', 'data/dataset.csv'))
+    parser.add_argument('--output', default=os.getenv('KNN_GRAPH_PATH', 'data/knn_graph.npz'))
+    parser.add_argument('--k', type=int, default=10, help='neighbours per track')
+    parser.add_argument('--processes', type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    data_service = DataService(args.dataset, compact_after=0)
+    start = time.perf_counter()
+    neighbors, scores = build_knn_graph(data_service.unit_features, args.k, args.processes)
+    elapsed = time.perf_counter() - start
+
+    save_knn_graph(args.output, neighbors, scores, data_service.track_ids)
+    print(f"k-NN graph for {len(neighbors):,d} tracks (k={neighbors.shape[1]}) "
+          f"built in {elapsed:.1f}s with {args.processes} process(es)")
+    print(f"Saved to: {args.output} ({os.path.getsize(args.output):,d} bytes)")
@@ -0,0 +1,29 @@
+"""
+Artifact Export Script
+Converts the joblib pickles in models/ into the native artifact bundle
+(model.ubj, preprocess.npz and manifest.json)
+"""
+import os
+import sys
+
+import joblib
+
+from app.artifacts import save_bundle
+
+if __name__ == '__main__':
+    MODEL_DIR = sys.argv[1] if len(sys.argv) > 1 else 'models'
+    OUTPUT_DIR = sys.argv[2] if len(sys.argv) > 2 else MODEL_DIR
+
+    model = joblib.load(os.path.join(MODEL_DIR, 'model.pkl'))
+    scaler = joblib.load(os.path.join(MODEL_DIR, 'scaler.pkl'))
+
+    genre_path = os.path.join(MODEL_DIR, 'genre_encoder.pkl')
+    genre_encoder = joblib.load(genre_path) if os.path.exists(genre_path) else None
+
+    fast_path = os.path.join(MODEL_DIR, 'model_fast.pkl')
+    fast_model = joblib.load(fast_path) if os.path.exists(fast_path) else None
+
+    manifest = save_bundle(model, scaler, OUTPUT_DIR, genre_encoder, fast_model=fast_model)
+    print(f"Native artifact bundle saved to: {OUTPUT_DIR}")
+    for name, checksum in manifest['checksums'].items():
+        print(f"  {name:<16s} {checksum[:12]}")
@@ -1,126 +1,292 @@
 """
 Generate Sample Spotify Dataset
-Creates a synthetic dataset for testing when real Kaggle data is not available
+Creates a synthetic dataset for testing when real Kaggle data is not available.
+Rows are generated in fixed-size chunks, each with its own seeded random stream,
+so large catalogs can be produced across worker processes and streamed to disk.
 """
-import pandas as pd
-import numpy as np
+import argparse
 import os
+import time
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+from app.scoring import is_parquet, require_pyarrow
 
-def generate_sample_dataset(n_samples=5000, output_path='data/dataset.csv'):
+# The 114 genres of the Kaggle Spotify Tracks Dataset (its track_genre column)
+GENRES = [
+    'acoustic', 'afrobeat', 'alt-rock', 'alternative', 'ambient', 'anime', 'black-metal',
+    'bluegrass', 'blues', 'brazil', 'breakbeat', 'british', 'cantopop', 'chicago-house',
+    'children', 'chill', 'classical', 'club', 'comedy', 'country', 'dance', 'dancehall',
+    'death-metal', 'deep-house', 'detroit-techno', 'disco', 'disney', 'drum-and-bass',
+    'dub', 'dubstep', 'edm', 'electro', 'electronic', 'emo', 'folk', 'forro', 'french',
+    'funk', 'garage', 'german', 'gospel', 'goth', 'grindcore', 'groove', 'grunge', 'guitar',
+    'happy', 'hard-rock', 'hardcore', 'hardstyle', 'heavy-metal', 'hip-hop', 'honky-tonk',
+    'house', 'idm', 'indian', 'indie', 'indie-pop', 'industrial', 'iranian', 'j-dance',
+    'j-idol', 'j-pop', 'j-rock', 'jazz', 'k-pop', 'kids', 'latin', 'latino', 'malay',
+    'mandopop', 'metal', 'metalcore', 'minimal-techno', 'mpb', 'new-age', 'opera', 'pagode',
+    'party', 'piano', 'pop', 'pop-film', 'power-pop', 'progressive-house', 'psych-rock',
+    'punk', 'punk-rock', 'r-n-b', 'reggae', 'reggaeton', 'rock', 'rock-n-roll',
+    'rockabilly', 'romance', 'sad', 'salsa', 'samba', 'sertanejo', 'show-tunes',
+    'singer-songwriter', 'ska', 'sleep', 'songwriter', 'soul', 'spanish', 'study',
+    'swedish', 'synth-pop', 'tango', 'techno', 'trance', 'trip-hop', 'turkish',
+    'world-music'
+]
+
+# Rows generated per chunk (the output for a given seed depends on it)
+DEFAULT_CHUNK_ROWS = 100000
+
+N_ARTISTS = 500
+
+_DIGITS = np.frombuffer(b'0123456789abcdef', dtype=np.uint8)
+
+def format_ids(prefix: str, numbers, width: int, base: int = 10) -> np.ndarray:
     """
-    Generate a sample Spotify-like dataset with realistic distributions
+    Strings of prefix followed by each number zero-padded to width digits
     
-    Args:
-        n_samples: Number of tracks to generate
-        output_path: Path to save the CSV file
+    The characters are assembled in a byte matrix, without a Python loop.
     """
-    print(f"Generating sample dataset with {n_samples} tracks...")
-    
-    np.random.seed(42)
+    numbers = np.asarray(numbers, dtype=np.int64)
+    powers = base ** np.arange(width - 1, -1, -1, dtype=np.int64)
+    prefix_bytes = np.frombuffer(prefix.encode('ascii'), dtype=np.uint8)
+    chars = np.empty((len(numbers), len(prefix_bytes) + width), dtype=np.uint8)
+    chars[:, :len(prefix_bytes)] = prefix_bytes
+    chars[:, len(prefix_bytes):] = _DIGITS[(numbers[:, None] // powers) % base]
+    return chars.view(f'S{chars.shape[1]}').ravel().astype(str)
+
+def generate_chunk(start: int, n_rows: int, seed, name_width: int = 4,
+                   genres: bool = False, duplicate_fraction: float = 0.0) -> pd.DataFrame:
+    """
+    Generate rows start..start + n_rows with realistic distributions
     
-    # Generate track metadata
-    track_names = [f'Track_{i:04d}' for i in range(n_samples)]
-    artists = [f'Artist_{i % 500:03d}' for i in range(n_samples)]
+    Args:
+        start: Index of the first row in the whole dataset
+        n_rows: Number of rows
+        seed: Seed or np.random.SeedSequence of this chunk's random stream
+        name_width: Digits in the track number of track names
+        genres: Whether to add a track_genre column
+        duplicate_fraction: Share of rows that repeat another track of the
+            chunk under a different genre, as in the Kaggle dataset
+            
+    Returns:
+        DataFrame with the dataset columns
+    """
+    rng = np.random.default_rng(seed)
+    ids = np.arange(start, start + n_rows)
     
     # Generate popularity with realistic distribution (skewed towards lower values)
-    popularity = np.random.beta(2, 5, n_samples) * 100
+    popularity = rng.beta(2, 5, n_rows) * 100
     
     # Generate audio features with realistic ranges and correlations
     
     # Tempo: typically 60-200 BPM, normal distribution around 120
-    tempo = np.clip(np.random.normal(120, 30, n_samples), 40, 220)
+    tempo = np.clip(rng.normal(120, 30, n_rows), 40, 220)
     
     # Energy: 0-1, slightly skewed towards higher values
-    energy = np.random.beta(5, 3, n_samples)
+    energy = rng.beta(5, 3, n_rows)
     
     # Danceability: 0-1, normal-ish distribution
-    danceability = np.clip(np.random.beta(5, 5, n_samples), 0, 1)
+    danceability = np.clip(rng.beta(5, 5, n_rows), 0, 1)
     
     # Loudness: typically -60 to 0 dB, concentrated around -5 to -10
-    loudness = np.clip(np.random.normal(-7, 5, n_samples), -60, 0)
+    loudness = np.clip(rng.normal(-7, 5, n_rows), -60, 0)
     
     # Valence: 0-1, uniform-ish distribution
-    valence = np.random.beta(4, 4, n_samples)
+    valence = rng.beta(4, 4, n_rows)
     
     # Acousticness: 0-1, skewed towards lower values (most tracks are not acoustic)
-    acousticness = np.random.beta(2, 8, n_samples)
+    acousticness = rng.beta(2, 8, n_rows)
     
     # Instrumentalness: 0-1, heavily skewed towards 0 (most tracks have vocals)
-    instrumentalness = np.random.beta(1, 20, n_samples)
+    instrumentalness = rng.beta(1, 20, n_rows)
     
     # Liveness: 0-1, heavily skewed towards lower values (most tracks are studio)
-    liveness = np.random.beta(2, 10, n_samples)
+    liveness = rng.beta(2, 10, n_rows)
     
     # Speechiness: 0-1, heavily skewed towards lower values
-    speechiness = np.random.beta(2, 15, n_samples)
+    speechiness = rng.beta(2, 15, n_rows)
     
     # Duration: typically 2-5 minutes (120,000-300,000 ms)
-    duration_ms = np.random.normal(210000, 60000, n_samples).astype(int)
-    duration_ms = np.clip(duration_ms, 60000, 600000)
+    duration_ms = np.clip(rng.normal(210000, 60000, n_rows).astype(int), 60000, 600000)
     
     # Key: 0-11 (C, C#, D, ..., B)
-    key = np.random.randint(0, 12, n_samples)
+    key = rng.integers(0, 12, n_rows)
     
     # Mode: 0 (minor) or 1 (major), slightly more major
-    mode = np.random.choice([0, 1], n_samples, p=[0.4, 0.6])
+    mode = rng.choice([0, 1], n_rows, p=[0.4, 0.6])
     
     # Time signature: mostly 4/4, some 3/4
-    time_signature = np.random.choice([3, 4, 5], n_samples, p=[0.05, 0.90, 0.05])
+    time_signature = rng.choice([3, 4, 5], n_rows, p=[0.05, 0.90, 0.05])
+    
+    # Add some correlations to make it more realistic
+    # Higher energy tends to correlate with higher loudness
+    energetic = energy > 0.7
+    loudness[energetic] += rng.uniform(2, 5, energetic.sum())
+    loudness = np.clip(loudness, -60, 0)
     
-    # Create DataFrame
-    data = {
-        'track_id': [f'spotify:track:{i:016x}' for i in range(n_samples)],
-        'track_name': track_names,
-        'artists': artists,
+    # Higher danceability tends to correlate with higher valence
+    danceable = danceability > 0.7
+    valence[danceable] += rng.uniform(0.1, 0.2, danceable.sum())
+    valence = np.clip(valence, 0, 1)
+    
+    # Round like the Kaggle data (this also keeps CSV output compact and quick to write)
+    columns = {
+        'track_id': format_ids('spotify:track:', ids, 16, base=16),
+        'track_name': format_ids('Track_', ids, name_width),
+        'artists': format_ids('Artist_', ids % N_ARTISTS, 3),
         'popularity': popularity.astype(int),
-        'tempo': tempo,
-        'energy': energy,
-        'danceability': danceability,
-        'loudness': loudness,
-        'valence': valence,
-        'acousticness': acousticness,
-        'instrumentalness': instrumentalness,
-        'liveness': liveness,
-        'speechiness': speechiness,
+        'tempo': tempo.round(3),
+        'energy': energy.round(4),
+        'danceability': danceability.round(4),
+        'loudness': loudness.round(3),
+        'valence': valence.round(4),
+        'acousticness': acousticness.round(4),
+        'instrumentalness': instrumentalness.round(6),
+        'liveness': liveness.round(4),
+        'speechiness': speechiness.round(4),
         'duration_ms': duration_ms,
         'key': key,
         'mode': mode,
         'time_signature': time_signature
     }
     
-    df = pd.DataFrame(data)
+    if genres:
+        genre_codes = rng.integers(0, len(GENRES), n_rows)
+        if duplicate_fraction > 0 and n_rows > 1:
+            # A duplicate is a copy of another track of the chunk (same id and
+            # features) listed under a different genre
+            duplicates = np.flatnonzero(rng.random(n_rows) < duplicate_fraction)
+            originals = np.setdiff1d(np.arange(n_rows), duplicates)
+            if len(originals):
+                sources = originals[rng.integers(0, len(originals), len(duplicates))]
+                for values in columns.values():
+                    values[duplicates] = values[sources]
+                shift = rng.integers(1, len(GENRES), len(duplicates))
+                genre_codes[duplicates] = (genre_codes[sources] + shift) % len(GENRES)
+        columns['track_genre'] = np.array(GENRES)[genre_codes]
     
-    # Add some correlations to make it more realistic
-    # Higher energy tends to correlate with higher loudness
-    df.loc[df['energy'] > 0.7, 'loudness'] += np.random.uniform(2, 5, (df['energy'] > 0.7).sum())
-    df['loudness'] = np.clip(df['loudness'], -60, 0)
+    return pd.DataFrame(columns)
+
+def _encode_chunk(args):
+    """Generate one chunk in the form the writer appends"""
+    start, n_rows, seed, options, parquet, header = args
+    df = generate_chunk(start, n_rows, seed, **options)
+    if parquet:
+        return require_pyarrow().Table.from_pandas(df, preserve_index=False)
+    return df.to_csv(header=header, index=False).encode('utf-8')
+
+def generate_sample_dataset(n_samples=5000, output_path='data/dataset.csv', seed=42,
+                            chunk_rows=DEFAULT_CHUNK_ROWS, processes=1,
+                            genres=False, duplicate_fraction=0.0, verbose=True):
+    """
+    Generate a sample Spotify-like dataset with realistic distributions
     
-    # Higher danceability tends to correlate with higher valence
-    df.loc[df['danceability'] > 0.7, 'valence'] += np.random.uniform(0.1, 0.2, (df['danceability'] > 0.7).sum())
-    df['valence'] = np.clip(df['valence'], 0, 1)
-    
-    # Save to CSV
-    os.makedirs(os.path.dirname(output_path), exist_ok=True)
-    df.to_csv(output_path, index=False)
-    
-    print(f"\nDataset saved to: {output_path}")
-    print(f"Shape: {df.shape}")
-    print(f"\nSample statistics:")
-    print(df[['popularity', 'tempo', 'energy', 'danceability']].describe())
-    print(f"\nPopularity distribution:")
-    print(f"  Mean: {df['popularity'].mean():.2f}")
-    print(f"  Median: {df['popularity'].median():.2f}")
-    print(f"  70th percentile: {df['popularity'].quantile(0.70):.2f}")
-    
-    return df
+    Chunks are generated (and encoded) in worker processes and written in
+    order, with at most two chunks per worker in flight, so memory stays
+    constant however many rows are requested. Every chunk has an independent
+    random stream spawned from seed, so the output does not depend on the
+    number of processes.
+    
+    Args:
+        n_samples: Number of tracks to generate
+        output_path: CSV or Parquet file to write (by extension)
+        seed: Seed of the random streams
+        chunk_rows: Rows per chunk
+        processes: Worker processes (1 generates in this process)
+        genres: Whether to add a Kaggle-style track_genre column
+        duplicate_fraction: Share of rows that repeat a track under another
+            genre (needs genres)
+        verbose: Whether to print progress
+        
+    Returns:
+        Dictionary with the output path, row and chunk counts and elapsed seconds
+    """
+    if verbose:
+        print(f"Generating sample dataset with {n_samples:,d} tracks...")
+    start_time = time.perf_counter()
+    
+    parquet = is_parquet(output_path)
+    pyarrow = require_pyarrow() if parquet else None
+    starts = list(range(0, n_samples, chunk_rows))
+    seeds = np.random.SeedSequence(seed).spawn(len(starts))
+    options = {
+        'name_width': max(4, len(str(max(n_samples - 1, 0)))),
+        'genres': genres,
+        'duplicate_fraction': duplicate_fraction
+    }
+    tasks = [(start, min(chunk_rows, n_samples - start), chunk_seed, options, parquet, i == 0)
+             for i, (start, chunk_seed) in enumerate(zip(starts, seeds))]
+    
+    directory = os.path.dirname(output_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    temp_path = output_path + '.partial'
+    parquet_writer = None
+    complete = False
+    
+    def write(encoded):
+        nonlocal parquet_writer
+        if parquet:
+            if parquet_writer is None:
+                parquet_writer = pyarrow.parquet.ParquetWriter(temp_path, encoded.schema)
+            parquet_writer.write_table(encoded)
+        else:
+            output.write(encoded)
+    
+    try:
+        with open(temp_path, 'wb') as output:
+            if processes <= 1:
+                for task in tasks:
+                    write(_encode_chunk(task))
+            else:
+                from concurrent.futures import ProcessPoolExecutor
+                
+                with ProcessPoolExecutor(processes) as executor:
+                    pending = deque()
+                    for task in tasks:
+                        pending.append(executor.submit(_encode_chunk, task))
+                        if len(pending) >= 2 * processes:
+                            write(pending.popleft().result())
+                    while pending:
+                        write(pending.popleft().result())
+        complete = True
+    finally:
+        if parquet_writer is not None:
+            parquet_writer.close()
+        if complete:
+            os.replace(temp_path, output_path)
+        elif os.path.exists(temp_path):
+            os.remove(temp_path)
+    
+    seconds = time.perf_counter() - start_time
+    if verbose:
+        print(f"\nDataset saved to: {output_path}")
+        print(f"Rows: {n_samples:,d} in {len(tasks)} chunk(s), {seconds:.1f}s "
+              f"({n_samples / max(seconds, 1e-9):,.0f} rows/s)")
+    
+    return {'path': output_path, 'rows': n_samples, 'chunks': len(tasks), 'seconds': seconds}
 
 if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=5000, help='tracks to generate')
+    parser.add_argument('--output', default='data/dataset.csv', help='.csv, or .parquet (needs pyarrow)')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--chunk-rows', type=int, default=DEFAULT_CHUNK_ROWS)
+    parser.add_argument('--processes', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--genres', action='store_true', help='add a Kaggle-style track_genre column')
+    parser.add_argument('--duplicate-fraction', type=float, default=0.0,
+                        help='share of rows repeating a track under another genre (with --genres)')
+    args = parser.parse_args()
+    
     print("=" * 60)
     print("Sample Dataset Generator")
     print("=" * 60)
     
     # Generate dataset
-    df = generate_sample_dataset(n_samples=5000, output_path='data/dataset.csv')
+    generate_sample_dataset(n_samples=args.rows, output_path=args.output, seed=args.seed,
+                            chunk_rows=args.chunk_rows, processes=args.processes,
+                            genres=args.genres, duplicate_fraction=args.duplicate_fraction)
     
     print("\n" + "=" * 60)
     print("Sample dataset generated successfully!")
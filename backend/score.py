@@ -0,0 +1,34 @@
+"""
+Bulk Scoring Script
+Scores every track in a CSV or Parquet catalog and writes the predictions to a
+CSV or Parquet file (chosen by extension)
+"""
+import argparse
+import os
+
+from app.ml_service import ModelService
+from app.config import FAST_MODEL_PATH, GENRE_ENCODER_PATH, MODEL_PATH, MODEL_TIER, SCALER_PATH
+from app.scoring import score_file
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('input', help='CSV or Parquet file with the base feature columns')
+    parser.add_argument('output', help='CSV or Parquet file to write')
+    parser.add_argument('--tier', default=MODEL_TIER, help="model tier ('full' or 'fast')")
+    parser.add_argument('--chunksize', type=int, default=50000, help='rows per chunk')
+    parser.add_argument('--processes', type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    model_service = ModelService(
+        MODEL_PATH,
+        SCALER_PATH,
+        GENRE_ENCODER_PATH,
+        fast_model_path=FAST_MODEL_PATH if os.path.exists(FAST_MODEL_PATH) else None
+    )
+    summary = score_file(args.input, args.output, model_service, tier=args.tier,
+                         chunksize=args.chunksize, processes=args.processes)
+
+    print(f"Scored {summary['scored']:,d} of {summary['rows']:,d} tracks "
+          f"({summary['skipped']:,d} skipped for missing features) in {summary['seconds']:.1f}s")
+    print(f"Hits: {summary['hits']:,d}  model {summary['model_tier']} {summary['model_version']}")
+    print(f"Saved to: {args.output}")
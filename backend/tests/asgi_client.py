@@ -0,0 +1,98 @@
+"""
+Minimal ASGI test client
+Mirrors the parts of Flask's test client used by the endpoint tests
+"""
+import asyncio
+from urllib.parse import urlsplit
+
+from werkzeug.datastructures import Headers
+
+
+class AsgiTestResponse:
+    def __init__(self, status_code: int, headers: Headers, data: bytes):
+        self.status_code = status_code
+        self.headers = headers
+        self.data = data
+
+    def get_data(self):
+        return self.data
+
+
+class AsgiTestClient:
+    def __init__(self, asgi_app):
+        """
+        Initialize the test client
+
+        Args:
+            asgi_app: AsgiApp instance under test
+        """
+        self.asgi_app = asgi_app
+        self.application = asgi_app.flask_app
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.asgi_app.close()
+
+    def get(self, path, headers=None):
+        return self.open('GET', path, headers=headers)
+
+    def options(self, path, headers=None):
+        return self.open('OPTIONS', path, headers=headers)
+
+    def post(self, path, data=b'', content_type=None, headers=None):
+        return self.open('POST', path, data=data, content_type=content_type, headers=headers)
+
+    def open(self, method, path, data=b'', content_type=None, headers=None):
+        """Send one request through the ASGI app and collect the response"""
+        if isinstance(data, str):
+            data = data.encode('utf-8')
+        url = urlsplit(path)
+
+        raw_headers = [(b'host', b'localhost')]
+        if content_type:
+            raw_headers.append((b'content-type', content_type.encode('latin-1')))
+        if data:
+            raw_headers.append((b'content-length', str(len(data)).encode('latin-1')))
+        for name, value in (headers or {}).items():
+            raw_headers.append((name.lower().encode('latin-1'), value.encode('latin-1')))
+
+        scope = {
+            'type': 'http',
+            'asgi': {'version': '3.0'},
+            'http_version': '1.1',
+            'method': method,
+            'scheme': 'http',
+            'path': url.path,
+            'root_path': '',
+            'query_string': url.query.encode('latin-1'),
+            'headers': raw_headers,
+            'server': ('localhost', 80),
+            'client': ('127.0.0.1', 12345),
+        }
+        return asyncio.run(self._request(scope, data))
+
+    async def _request(self, scope, body):
+        # Deliver the body in two parts to exercise chunked reads
+        split = len(body) // 2
+        messages = [
+            {'type': 'http.request', 'body': body[:split], 'more_body': True},
+            {'type': 'http.request', 'body': body[split:], 'more_body': False},
+        ]
+        sent = []
+
+        async def receive():
+            return messages.pop(0) if messages else {'type': 'http.disconnect'}
+
+        async def send(message):
+            sent.append(message)
+
+        await self.asgi_app(scope, receive, send)
+
+        start = next(m for m in sent if m['type'] == 'http.response.start')
+        headers = Headers([
+            (name.decode('latin-1'), value.decode('latin-1')) for name, value in start['headers']
+        ])
+        data = b''.join(m.get('body', b'') for m in sent if m['type'] == 'http.response.body')
+        return AsgiTestResponse(start['status'], headers, data)
@@ -1,19 +1,29 @@
 """
 Unit tests for API endpoints
 Tests /api/predict, /api/similar, and /api/eda-data endpoints
+against both the WSGI (Flask) and ASGI serving modes
 """
 import pytest
 import json
+import math
+import threading
+import time
 from app import create_app
+from app.asgi import AsgiApp
+from tests.asgi_client import AsgiTestClient
 
 
-@pytest.fixture
-def client():
-    """Create a test client for the Flask app"""
+@pytest.fixture(params=['wsgi', 'asgi'])
+def client(request):
+    """Create a test client for the Flask app or its ASGI adapter"""
     app = create_app()
     app.config['TESTING'] = True
-    with app.test_client() as client:
-        yield client
+    if request.param == 'asgi':
+        with AsgiTestClient(AsgiApp(app, max_workers=2)) as client:
+            yield client
+    else:
+        with app.test_client() as client:
+            yield client
 
 
 @pytest.fixture
@@ -67,6 +77,54 @@ class TestPredictEndpoint:
         assert 0.0 <= data['probabilities']['hit'] <= 1.0
         assert 0.0 <= data['probabilities']['miss'] <= 1.0
     
+    def test_predict_with_unknown_tier(self, client, valid_track_features):
+        """Test /api/predict rejects a model tier that is not served"""
+        response = client.post(
+            '/api/predict?tier=tiny',
+            data=json.dumps(valid_track_features),
+            content_type='application/json'
+        )
+        
+        assert response.status_code == 400
+        data = json.loads(response.data)
+        assert data['error']['code'] == 'VALIDATION_ERROR'
+        assert 'tier' in data['error']['message']
+    
+    def test_predict_with_explanation(self, client, valid_track_features):
+        """Test /api/predict?explain=true adds per-feature contributions"""
+        response = client.post(
+            '/api/predict?explain=true',
+            data=json.dumps(valid_track_features),
+            content_type='application/json'
+        )
+        
+        assert response.status_code == 200
+        data = json.loads(response.data)
+        explanation = data['explanation']
+        assert set(explanation['contributions']) == set(valid_track_features)
+        margin = explanation['base_value'] + sum(explanation['contributions'].values())
+        assert 1 / (1 + math.exp(-margin)) == pytest.approx(data['probabilities']['hit'], abs=1e-5)
+        # An explained request does not start a catalog-wide precompute
+        assert 'explanation-precompute' not in [thread.name for thread in threading.enumerate()]
+    
+    def test_explain_on_non_xgboost_tier_is_rejected(self, client, monkeypatch, valid_track_features):
+        """Test explain=true on a tier without a booster is a 400, not a 500"""
+        from sklearn.dummy import DummyClassifier
+        from app.routes import canonical_feature_query, get_model_service
+        
+        model_service = get_model_service()
+        monkeypatch.setitem(model_service.models, model_service.default_tier, DummyClassifier())
+        post = client.post(
+            '/api/predict?explain=true',
+            data=json.dumps(valid_track_features),
+            content_type='application/json'
+        )
+        get = client.get(f'/api/predict?explain=true&f={canonical_feature_query(valid_track_features)}')
+        
+        for response in (post, get):
+            assert response.status_code == 400
+            assert json.loads(response.data)['error']['code'] == 'EXPLANATION_UNAVAILABLE'
+    
     def test_predict_with_missing_feature(self, client, valid_track_features):
         """Test /api/predict with missing required feature"""
         incomplete_features = valid_track_features.copy()
@@ -229,6 +287,147 @@ class TestSimilarEndpoint:
         assert response.status_code == 400
         data = json.loads(response.data)
         assert 'error' in data
+    
+    def test_similar_with_filters(self, client, valid_track_features):
+        """Test /api/similar only returns tracks matching the filters"""
+        request_data = {
+            'features': valid_track_features,
+            'n_recommendations': 10,
+            'filters': {'hits_only': True, 'exclude_artists': ['Artist_000', 'Artist_001']}
+        }
+        
+        response = client.post(
+            '/api/similar',
+            data=json.dumps(request_data),
+            content_type='application/json'
+        )
+        
+        assert response.status_code == 200
+        data = json.loads(response.data)
+        assert len(data['similar_tracks']) == 10
+        assert not {'Artist_000', 'Artist_001'} & {track['artist'] for track in data['similar_tracks']}
+    
+    def test_similar_with_invalid_filters(self, client, valid_track_features):
+        """Test /api/similar rejects unknown or malformed filters"""
+        for filters in ({'colour': 'red'}, {'min_popularity': 'high'}, {'hits_only': 'yes'}, ['genre']):
+            response = client.post(
+                '/api/similar',
+                data=json.dumps({'features': valid_track_features, 'filters': filters}),
+                content_type='application/json'
+            )
+            
+            assert response.status_code == 400
+            assert json.loads(response.data)['error']['code'] == 'VALIDATION_ERROR'
+
+
+class TestSimilarBatchEndpoint:
+    """Tests for /api/similar/batch endpoint"""
+    
+    def test_batch_matches_single_queries(self, client, valid_track_features):
+        """Test each batch result equals the /api/similar result for that query"""
+        queries = [valid_track_features, dict(valid_track_features, tempo=90.0, energy=0.3)]
+        
+        response = client.post(
+            '/api/similar/batch',
+            data=json.dumps({'queries': queries, 'n_recommendations': 4}),
+            content_type='application/json'
+        )
+        
+        assert response.status_code == 200
+        results = json.loads(response.data)['results']
+        assert len(results) == 2
+        for query, result in zip(queries, results):
+            single = client.post(
+                '/api/similar',
+                data=json.dumps(dict(query, n_recommendations=4)),
+                content_type='application/json'
+            )
+            assert result['similar_tracks'] == json.loads(single.data)['similar_tracks']
+    
+    def test_batch_with_nested_features_and_filters(self, client, valid_track_features):
+        """Test queries may nest features and filters apply to every query"""
+        response = client.post(
+            '/api/similar/batch',
+            data=json.dumps({
+                'queries': [{'features': valid_track_features}] * 3,
+                'filters': {'exclude_artists': 'Artist_000'}
+            }),
+            content_type='application/json'
+        )
+        
+        assert response.status_code == 200
+        for result in json.loads(response.data)['results']:
+            assert len(result['similar_tracks']) == 5
+            assert all(track['artist'] != 'Artist_000' for track in result['similar_tracks'])
+    
+    def test_batch_rejects_invalid_queries(self, client, valid_track_features):
+        """Test an empty batch or an invalid query is rejected with its index"""
+        empty = client.post('/api/similar/batch', data=json.dumps({'queries': []}),
+                            content_type='application/json')
+        assert empty.status_code == 400
+        
+        response = client.post(
+            '/api/similar/batch',
+            data=json.dumps({'queries': [valid_track_features, dict(valid_track_features, energy=5)]}),
+            content_type='application/json'
+        )
+        assert response.status_code == 400
+        error = json.loads(response.data)['error']
+        assert error['code'] == 'VALIDATION_ERROR' and error['message'].startswith('Query 1:')
+
+    
+    def test_batch_get_is_method_not_allowed(self, client):
+        """Test GET on the batch route is 405, not a lookup of track 'batch'"""
+        response = client.get('/api/similar/batch')
+        
+        assert response.status_code == 405
+        assert response.headers['Allow'] == 'POST'
+        assert json.loads(response.data)['error']['code'] == 'METHOD_NOT_ALLOWED'
+
+class TestSimilarByTrackEndpoint:
+    """Tests for /api/similar/<track_id> endpoint"""
+    
+    def test_similar_to_catalog_track(self, client):
+        """Test neighbours of a catalog track exclude the track itself"""
+        from app.routes import get_data_service
+        data_service = get_data_service()
+        track_id = data_service.track_ids[3]
+        
+        response = client.get(f'/api/similar/{track_id}?n=6')
+        
+        assert response.status_code == 200
+        data = json.loads(response.data)
+        assert data['track_id'] == track_id
+        assert len(data['similar_tracks']) == 6
+        assert data_service.track_names[3] not in [track['track_name'] for track in data['similar_tracks']]
+    
+    def test_unknown_track(self, client):
+        """Test an unknown track id returns 404"""
+        response = client.get('/api/similar/spotify:track:unknown')
+        
+        assert response.status_code == 404
+        assert json.loads(response.data)['error']['code'] == 'NOT_FOUND'
+
+
+class TestTrackSearchEndpoint:
+    """Tests for /api/tracks/search endpoint"""
+    
+    def test_search_by_name_prefix(self, client):
+        """Test a name prefix returns matching tracks with features"""
+        response = client.get('/api/tracks/search?q=Track_012&limit=5')
+        
+        assert response.status_code == 200
+        data = json.loads(response.data)
+        assert len(data['results']) == 5
+        for result in data['results']:
+            assert result['track_name'].startswith('Track_012')
+            assert set(result) >= {'track_id', 'artist', 'match', 'score', 'features'}
+        assert data['took_ms'] < 50
+    
+    def test_search_requires_query(self, client):
+        """Test an empty query is rejected"""
+        assert client.get('/api/tracks/search?q=').status_code == 400
+        assert client.get('/api/tracks/search').status_code == 400
 
 
 class TestEDAEndpoint:
@@ -247,6 +446,16 @@ class TestEDAEndpoint:
         assert 'summary_statistics' in data
         assert 'hit_miss_distribution' in data
     
+    def test_eda_data_revalidates_with_etag(self, client):
+        """Test /api/eda-data answers a matching If-None-Match with 304"""
+        first = client.get('/api/eda-data')
+        again = client.get('/api/eda-data', headers={'If-None-Match': first.headers['ETag']})
+        
+        assert first.headers['ETag'].startswith('W/"')
+        assert again.status_code == 304
+        assert again.data == b''
+        assert again.headers['X-Cache-Version'] == first.headers['X-Cache-Version']
+    
     def test_eda_feature_distributions(self, client):
         """Test /api/eda-data feature distributions structure"""
         response = client.get('/api/eda-data')
@@ -312,6 +521,46 @@ class TestEDAEndpoint:
         assert 'miss' in hit_miss
         assert isinstance(hit_miss['hit'], int)
         assert isinstance(hit_miss['miss'], int)
+    
+    def test_histogram_with_bins_and_range(self, client):
+        """Test /api/eda-data/histogram bins one feature over a chosen range"""
+        response = client.get('/api/eda-data/histogram?feature=tempo&bins=8&range=80,160')
+        
+        assert response.status_code == 200
+        data = json.loads(response.data)
+        assert data['feature'] == 'tempo'
+        assert len(data['counts']) == 8
+        assert data['bins'][0] == 80 and data['bins'][-1] == 160
+    
+    def test_histogram_defaults_match_eda_edges(self, client):
+        """Test the default histogram covers the same range as /api/eda-data"""
+        histogram = json.loads(client.get('/api/eda-data/histogram?feature=energy').data)
+        eda = json.loads(client.get('/api/eda-data').data)
+        
+        assert histogram['bins'] == pytest.approx(eda['feature_distributions']['energy']['bins'])
+        assert sum(histogram['counts']) == sum(eda['feature_distributions']['energy']['counts'])
+    
+    def test_histogram_rejects_invalid_parameters(self, client):
+        """Test unknown features, bad bin counts and bad ranges are rejected"""
+        assert client.get('/api/eda-data/histogram?feature=unknown').status_code == 400
+        assert client.get('/api/eda-data/histogram?feature=tempo&bins=0').status_code == 400
+        assert client.get('/api/eda-data/histogram?feature=tempo&bins=abc').status_code == 400
+        assert client.get('/api/eda-data/histogram?feature=tempo&range=5').status_code == 400
+        assert client.get('/api/eda-data/histogram?feature=tempo&range=9,1').status_code == 400
+    
+    def test_quantiles_are_exact(self, client):
+        """Test /api/eda-data/quantiles matches the dataset's quantiles"""
+        import pandas as pd
+        from app.routes import DATASET_PATH
+        
+        response = client.get('/api/eda-data/quantiles?feature=loudness&q=0.05,0.5,0.95')
+        
+        assert response.status_code == 200
+        data = json.loads(response.data)
+        df = pd.read_csv(DATASET_PATH)
+        expected = df['loudness'].fillna(df['loudness'].median()).quantile([0.05, 0.5, 0.95])
+        assert data['values'] == pytest.approx(expected.tolist())
+        assert client.get('/api/eda-data/quantiles?feature=loudness&q=1.5').status_code == 400
 
 
 class TestErrorHandling:
@@ -348,3 +597,531 @@ class TestErrorHandling:
         assert 'error' in data
         assert 'code' in data['error']
         assert 'message' in data['error']
+
+
+class TestJSONProvider:
+    """Tests for the NumPy-aware JSON provider"""
+    
+    def test_serializes_numpy_values(self):
+        """Test that NumPy arrays and scalars serialize like their Python equivalents"""
+        import numpy as np
+        
+        app = create_app()
+        payload = {
+            'matrix': np.arange(6, dtype=np.float64).reshape(2, 3),
+            'counts': np.array([1, 2, 3], dtype=np.int64),
+            'score': np.float32(0.5),
+            'flag': np.bool_(True),
+            'column': np.arange(10)[::2]
+        }
+        
+        with app.app_context():
+            data = json.loads(app.json.response(payload).get_data())
+        
+        assert data == {
+            'matrix': [[0.0, 1.0, 2.0], [3.0, 4.0, 5.0]],
+            'counts': [1, 2, 3],
+            'score': 0.5,
+            'flag': True,
+            'column': [0, 2, 4, 6, 8]
+        }
+
+
+class TestCompression:
+    """Tests for negotiated response compression"""
+    
+    def test_eda_data_gzip_when_accepted(self, client):
+        """Test /api/eda-data is gzip-compressed when the client accepts it"""
+        import gzip
+        
+        plain = client.get('/api/eda-data')
+        compressed = client.get('/api/eda-data', headers={'Accept-Encoding': 'gzip'})
+        
+        assert compressed.status_code == 200
+        assert compressed.headers['Content-Encoding'] == 'gzip'
+        assert 'Accept-Encoding' in compressed.headers['Vary']
+        assert json.loads(gzip.decompress(compressed.data)) == json.loads(plain.data)
+    
+    def test_no_compression_without_accept_encoding(self, client):
+        """Test responses are sent uncompressed when no coding is accepted"""
+        response = client.get('/api/eda-data', headers={'Accept-Encoding': 'identity'})
+        
+        assert 'Content-Encoding' not in response.headers
+        assert 'feature_distributions' in json.loads(response.data)
+    
+    def test_small_responses_not_compressed(self, client):
+        """Test responses below the size threshold are not compressed"""
+        response = client.get('/api/health', headers={'Accept-Encoding': 'gzip'})
+        
+        assert response.status_code == 200
+        assert 'Content-Encoding' not in response.headers
+    
+    def test_eda_compressed_body_served_from_cache(self, client, monkeypatch):
+        """Test the EDA payload is serialized and compressed once and then reused"""
+        from app.routes import get_data_service
+        compressor = client.application.extensions['compressor']
+        
+        first = client.get('/api/eda-data', headers={'Accept-Encoding': 'gzip'})
+        hits_before = compressor.cache_hits
+        # A cache hit neither rebuilds nor re-serializes the payload
+        monkeypatch.setattr(get_data_service(), 'get_eda_data', lambda: pytest.fail('EDA payload rebuilt'))
+        second = client.get('/api/eda-data', headers={'Accept-Encoding': 'gzip'})
+        plain = client.get('/api/eda-data', headers={'Accept-Encoding': 'identity'})
+        
+        # Serialized body and gzip form for the second request, serialized body for the third
+        assert compressor.cache_hits == hits_before + 3
+        assert second.data == first.data
+        assert json.loads(plain.data)['hit_miss_distribution']
+    
+    def test_accept_encoding_quality_values(self):
+        """Test q=0 excludes a coding from negotiation"""
+        from app.compression import choose_encoding
+        
+        assert choose_encoding('gzip;q=0, identity') is None
+        assert choose_encoding('deflate, gzip;q=0.5') == 'gzip'
+        assert choose_encoding('') is None
+
+
+class TestMetricsEndpoint:
+    """Tests for /api/metrics endpoint"""
+    
+    def test_metrics_report_prediction_batches(self, client, valid_track_features):
+        """Test /api/metrics exposes batch size and queue wait after a prediction"""
+        client.post(
+            '/api/predict',
+            data=json.dumps(valid_track_features),
+            content_type='application/json'
+        )
+        response = client.get('/api/metrics')
+        
+        assert response.status_code == 200
+        data = json.loads(response.data)
+        assert data['predict_batch_size']['count'] >= 1
+        assert 'predict_queue_wait_ms' in data
+
+
+class TestAdmissionControl:
+    """Tests for per-endpoint load shedding with 429 and Retry-After"""
+    
+    def test_saturated_endpoint_sheds_with_retry_after(self, client, valid_track_features):
+        """Test requests beyond the limit get 429 until a slot frees up"""
+        admission = client.application.extensions['admission']
+        admission.limits['predict'] = (1, 0)
+        limiter = admission.limiter('predict')
+        assert limiter.acquire(0)
+        try:
+            response = client.post(
+                '/api/predict',
+                data=json.dumps(valid_track_features),
+                content_type='application/json'
+            )
+            
+            assert response.status_code == 429
+            assert int(response.headers['Retry-After']) >= 1
+            assert json.loads(response.data)['error']['code'] == 'TOO_MANY_REQUESTS'
+            
+            # Probes and metrics are never shed
+            assert client.get('/api/health').status_code == 200
+            snapshot = json.loads(client.get('/api/metrics').data)
+            assert snapshot['admission_predict_saturation'] == 1.0
+            assert snapshot['admission_predict_rejected_total'] >= 1
+        finally:
+            limiter.release(0.01)
+        
+        response = client.post(
+            '/api/predict',
+            data=json.dumps(valid_track_features),
+            content_type='application/json'
+        )
+        assert response.status_code == 200
+        assert limiter.active == 0
+    
+    def test_full_asgi_queue_sheds_before_the_executor(self, valid_track_features):
+        """Test the ASGI adapter answers 429 instead of queueing past its bound"""
+        app = create_app()
+        app.config['TESTING'] = True
+        with AsgiTestClient(AsgiApp(app, max_workers=1, max_queue=1)) as client:
+            asgi_app = client.asgi_app
+            asgi_app.service_seconds = 3.0
+            asgi_app.pending = 2
+            try:
+                response = client.post(
+                    '/api/predict',
+                    data=json.dumps(valid_track_features),
+                    content_type='application/json'
+                )
+                
+                assert response.status_code == 429
+                assert response.headers['Retry-After'] == '6'
+                assert json.loads(response.data)['error']['code'] == 'TOO_MANY_REQUESTS'
+                
+                # Probes and metrics are never shed
+                assert client.get('/api/health').status_code == 200
+                assert json.loads(client.get('/api/metrics').data)['asgi_rejected_total'] >= 1
+            finally:
+                asgi_app.pending = 0
+            
+            response = client.post(
+                '/api/predict',
+                data=json.dumps(valid_track_features),
+                content_type='application/json'
+            )
+            assert response.status_code == 200
+            assert asgi_app.pending == 0
+    
+    def test_unknown_view_names_fail_at_startup(self, monkeypatch):
+        """Test per-endpoint limits and timeouts must name existing views"""
+        monkeypatch.setenv('ADMISSION_LIMITS', 'similar_batch=2:4')
+        with pytest.raises(ValueError, match='similar_batch'):
+            create_app()
+        
+        monkeypatch.setenv('ADMISSION_LIMITS', 'similar_tracks_batch=2:4')
+        monkeypatch.setenv('REQUEST_TIMEOUTS', 'eda=20000')
+        with pytest.raises(ValueError, match='REQUEST_TIMEOUTS'):
+            create_app()
+        
+        monkeypatch.setenv('REQUEST_TIMEOUTS', 'eda_data=20000')
+        assert create_app().extensions['admission'].limits == {'similar_tracks_batch': (2, 4)}
+
+
+class TestCacheableGetEndpoints:
+    """Tests for the GET forms of /api/predict and /api/similar with HTTP caching"""
+    
+    def feature_query(self, features):
+        from app.routes import canonical_feature_query
+        
+        return canonical_feature_query(features)
+    
+    def test_get_predict_matches_post(self, client, valid_track_features):
+        """Test GET /api/predict?f= returns the POST result with caching headers"""
+        posted = client.post(
+            '/api/predict',
+            data=json.dumps(valid_track_features),
+            content_type='application/json'
+        )
+        response = client.get(f'/api/predict?f={self.feature_query(valid_track_features)}')
+        
+        assert response.status_code == 200
+        assert json.loads(response.data) == json.loads(posted.data)
+        assert response.headers['Cache-Control'] == 'public, max-age=300'
+        assert response.headers['ETag'].startswith('W/"')
+        assert response.headers['X-Cache-Version'] == response.headers['X-Model-Version']
+    
+    def test_conditional_get_returns_304(self, client, valid_track_features):
+        """Test a matching If-None-Match is answered with 304 and no body"""
+        url = f'/api/similar?f={self.feature_query(valid_track_features)}&n=7'
+        first = client.get(url)
+        again = client.get(url, headers={'If-None-Match': first.headers['ETag']})
+        other = client.get(url.replace('n=7', 'n=6'), headers={'If-None-Match': first.headers['ETag']})
+        
+        assert first.status_code == 200
+        assert len(json.loads(first.data)['similar_tracks']) == 7
+        assert again.status_code == 304
+        assert again.data == b''
+        assert again.headers['ETag'] == first.headers['ETag']
+        assert other.status_code == 200
+    
+    def test_pinned_version_is_immutable(self, client, valid_track_features):
+        """Test a request pinned to the current version may be cached for a year"""
+        url = f'/api/similar?f={self.feature_query(valid_track_features)}'
+        version = client.get(url).headers['X-Cache-Version']
+        
+        assert client.get(f'{url}&v={version}').headers['Cache-Control'] == 'public, max-age=31536000, immutable'
+        assert client.get(f'{url}&v=stale').headers['Cache-Control'] == 'public, max-age=300'
+    
+    def test_version_header_pins_and_varies(self, client, valid_track_features):
+        """Test responses vary on the version header, which pins them like ?v="""
+        url = f'/api/similar?f={self.feature_query(valid_track_features)}'
+        response = client.get(url)
+        version = response.headers['X-Dataset-Version']
+        pinned = client.get(url, headers={'X-Dataset-Version': version})
+        
+        assert 'X-Dataset-Version' in response.headers['Vary']
+        assert version == response.headers['X-Cache-Version']
+        assert pinned.headers['Cache-Control'] == 'public, max-age=31536000, immutable'
+        
+        predicted = client.get(f'/api/predict?f={self.feature_query(valid_track_features)}')
+        assert 'X-Model-Version' in predicted.headers['Vary']
+    
+    def test_get_similar_with_filters(self, client, valid_track_features):
+        """Test GET /api/similar applies the same filters as the POST form"""
+        filters = {'hits_only': True, 'exclude_artists': ['Artist_000', 'Artist_001'], 'min_popularity': 10}
+        posted = client.post(
+            '/api/similar',
+            data=json.dumps({'features': valid_track_features, 'filters': filters}),
+            content_type='application/json'
+        )
+        query = (f'/api/similar?f={self.feature_query(valid_track_features)}'
+                 '&hits_only=true&exclude_artists=Artist_000&exclude_artists=Artist_001&min_popularity=10')
+        response = client.get(query)
+        unfiltered = client.get(f'/api/similar?f={self.feature_query(valid_track_features)}')
+        
+        assert response.status_code == 200
+        assert json.loads(response.data) == json.loads(posted.data)
+        assert response.headers['ETag'] != unfiltered.headers['ETag']
+        
+        for bad in ('hits_only=maybe', 'min_popularity=high'):
+            invalid = client.get(f'/api/similar?f={self.feature_query(valid_track_features)}&{bad}')
+            assert invalid.status_code == 400
+    
+    def test_get_forms_share_post_limits(self, client, valid_track_features):
+        """Test the GET forms are admitted under the predict and similar_tracks views"""
+        admission = client.application.extensions['admission']
+        admission.limits['similar_tracks'] = (1, 0)
+        limiter = admission.limiter('similar_tracks')
+        assert limiter.acquire(0)
+        try:
+            response = client.get(f'/api/similar?f={self.feature_query(valid_track_features)}')
+            assert response.status_code == 429
+        finally:
+            limiter.release(0.01)
+            del admission.limits['similar_tracks']
+        
+        # Deadlines are keyed on the same view name
+        with client.application.test_request_context('/api/predict?f=1', method='GET'):
+            from flask import request
+            assert request.endpoint == 'api.predict'
+    
+    def test_preflight_may_be_reused(self, client):
+        """Test CORS preflights of conditional GETs are cacheable by the browser"""
+        response = client.options('/api/eda-data', headers={
+            'Origin': 'http://localhost:5173',
+            'Access-Control-Request-Method': 'GET',
+            'Access-Control-Request-Headers': 'If-None-Match'
+        })
+        
+        assert response.headers['Access-Control-Max-Age'] == '600'
+        assert 'if-none-match' in response.headers['Access-Control-Allow-Headers'].lower()
+    
+    def test_invalid_feature_query(self, client, valid_track_features):
+        """Test malformed or out-of-range ?f= values are rejected"""
+        values = self.feature_query(valid_track_features).split(',')
+        
+        short = client.get(f"/api/predict?f={','.join(values[:-1])}")
+        assert short.status_code == 400
+        assert json.loads(short.data)['error']['code'] == 'INVALID_REQUEST'
+        
+        values[1] = '2'
+        out_of_range = client.get(f"/api/similar?f={','.join(values)}")
+        assert out_of_range.status_code == 400
+        assert json.loads(out_of_range.data)['error']['code'] == 'VALIDATION_ERROR'
+    
+    def test_canonical_numbers_match_javascript(self):
+        """Test query numbers are formatted like JavaScript's String(number)"""
+        from app.routes import format_query_number
+        
+        cases = {120.0: '120', 0.8: '0.8', -5.0: '-5', 200000: '200000', 1.01e-06: '0.00000101',
+                 1e-07: '1e-7', 0.0: '0', 1e21: '1e+21', 123.456: '123.456'}
+        assert {value: format_query_number(value) for value in cases} == cases
+
+
+class TestRequestDeadlines:
+    """Tests for request deadlines taken from X-Request-Timeout-Ms"""
+    
+    def test_similar_past_deadline_returns_504(self, client, valid_track_features):
+        """Test a scan whose deadline passes is abandoned with 504"""
+        response = client.post(
+            '/api/similar',
+            data=json.dumps({'features': valid_track_features}),
+            content_type='application/json',
+            headers={'X-Request-Timeout-Ms': '0.001'}
+        )
+        
+        assert response.status_code == 504
+        assert json.loads(response.data)['error']['code'] == 'DEADLINE_EXCEEDED'
+    
+    def test_deadline_counts_from_server_arrival(self, valid_track_features):
+        """Test time queued before Flask sees the request counts against its deadline"""
+        from app.deadline import ARRIVAL_ENVIRON_KEY
+        
+        app = create_app()
+        app.config['TESTING'] = True
+        with app.test_client() as client:
+            response = client.post(
+                '/api/similar',
+                data=json.dumps({'features': valid_track_features}),
+                content_type='application/json',
+                environ_base={ARRIVAL_ENVIRON_KEY: time.monotonic() - 60}
+            )
+        
+        assert response.status_code == 504
+        assert json.loads(response.data)['error']['code'] == 'DEADLINE_EXCEEDED'
+    
+    def test_column_sort_past_deadline_returns_504(self, client, monkeypatch):
+        """Test histograms and quantiles stop waiting for a column sort at the deadline"""
+        from app import routes
+        from app.data_service import DataService
+        
+        monkeypatch.setattr(routes, '_data_service', None)
+        release = threading.Event()
+        sort_column = DataService._sort_column
+        
+        def slow_sort(service, index, base_rows):
+            release.wait(5)
+            return sort_column(service, index, base_rows)
+        
+        monkeypatch.setattr(DataService, '_sort_column', slow_sort)
+        headers = {'X-Request-Timeout-Ms': '50'}
+        histogram = client.get('/api/eda-data/histogram?feature=tempo', headers=headers)
+        quantiles = client.get('/api/eda-data/quantiles?feature=tempo', headers=headers)
+        release.set()
+        
+        assert histogram.status_code == 504
+        assert quantiles.status_code == 504
+        assert json.loads(quantiles.data)['error']['code'] == 'DEADLINE_EXCEEDED'
+        assert client.get('/api/eda-data/histogram?feature=tempo').status_code == 200
+    
+    def test_generous_deadline_completes(self, client, valid_track_features):
+        """Test requests finishing within their deadline are unaffected"""
+        response = client.post(
+            '/api/similar',
+            data=json.dumps({'features': valid_track_features}),
+            content_type='application/json',
+            headers={'X-Request-Timeout-Ms': '5000'}
+        )
+        
+        assert response.status_code == 200
+        assert len(json.loads(response.data)['similar_tracks']) == 5
+
+
+@pytest.fixture
+def reloadable_model(tmp_path, monkeypatch):
+    """Serve the model from a temporary copy that tests can replace"""
+    import shutil
+    from app import routes
+    
+    model_path = tmp_path / 'model.pkl'
+    shutil.copy(routes.MODEL_PATH, model_path)
+    monkeypatch.setattr(routes, 'MODEL_PATH', str(model_path))
+    monkeypatch.setattr(routes, 'ADMIN_TOKEN', 'test-token')
+    monkeypatch.setattr(routes, '_model_service', None)
+    return model_path
+
+
+def write_retrained_model(path):
+    """Write a small stand-in for a retrained model to path"""
+    import joblib
+    import numpy as np
+    from xgboost import XGBClassifier
+    
+    rng = np.random.default_rng(7)
+    X = rng.normal(size=(200, 27))
+    y = (X[:, 0] > 0).astype(int)
+    joblib.dump(XGBClassifier(n_estimators=5, max_depth=2).fit(X, y), path)
+
+
+class TestModelReload:
+    """Tests for /api/admin/reload-model and versioned predictions"""
+    
+    def reload(self, client, token='test-token'):
+        return client.post('/api/admin/reload-model', headers={'X-Admin-Token': token})
+    
+    def predict(self, client, features):
+        return client.post(
+            '/api/predict',
+            data=json.dumps(features),
+            content_type='application/json'
+        )
+    
+    def test_reload_requires_admin_token(self, client, reloadable_model):
+        """Test the reload endpoint rejects requests without the admin token"""
+        response = self.reload(client, token='wrong')
+        
+        assert response.status_code == 403
+        assert json.loads(response.data)['error']['code'] == 'FORBIDDEN'
+    
+    def test_reload_unchanged_artifacts_is_noop(self, client, reloadable_model, valid_track_features):
+        """Test reloading identical artifacts keeps the active version"""
+        version = json.loads(self.predict(client, valid_track_features).data)['model_version']
+        
+        data = json.loads(self.reload(client).data)
+        
+        assert data == {'model_version': version, 'previous_version': version, 'reloaded': False}
+    
+    def test_reload_swaps_to_new_version(self, client, reloadable_model, valid_track_features):
+        """Test a new model is swapped in and reported in responses"""
+        old_version = self.predict(client, valid_track_features).headers['X-Model-Version']
+        
+        write_retrained_model(reloadable_model)
+        response = self.reload(client)
+        data = json.loads(response.data)
+        
+        assert response.status_code == 200
+        assert data['reloaded'] is True
+        assert data['previous_version'] == old_version
+        assert data['model_version'] != old_version
+        
+        prediction = self.predict(client, valid_track_features)
+        assert prediction.headers['X-Model-Version'] == data['model_version']
+        assert json.loads(prediction.data)['model_version'] == data['model_version']
+    
+    def test_invalid_model_keeps_current_version(self, client, reloadable_model, valid_track_features):
+        """Test a corrupt model file is rejected and the old model keeps serving"""
+        old_version = self.predict(client, valid_track_features).headers['X-Model-Version']
+        
+        reloadable_model.write_bytes(b'not a model')
+        response = self.reload(client)
+        
+        assert response.status_code == 500
+        assert json.loads(response.data)['error']['code'] == 'MODEL_ERROR'
+        assert self.predict(client, valid_track_features).headers['X-Model-Version'] == old_version
+
+
+@pytest.fixture
+def ingestible_catalog(tmp_path, monkeypatch):
+    """Serve the catalog from a temporary copy of the dataset"""
+    import shutil
+    from app import routes
+    
+    dataset_path = tmp_path / 'dataset.csv'
+    shutil.copy(routes.DATASET_PATH, dataset_path)
+    monkeypatch.setattr(routes, 'DATASET_PATH', str(dataset_path))
+    monkeypatch.setattr(routes, 'ADMIN_TOKEN', 'test-token')
+    monkeypatch.setattr(routes, '_data_service', None)
+    return dataset_path
+
+
+class TestTrackIngestion:
+    """Tests for /api/admin/tracks"""
+    
+    def ingest(self, client, tracks, token='test-token'):
+        return client.post(
+            '/api/admin/tracks',
+            data=json.dumps({'tracks': tracks}),
+            content_type='application/json',
+            headers={'X-Admin-Token': token}
+        )
+    
+    def test_ingest_requires_admin_token(self, client, ingestible_catalog, valid_track_features):
+        """Test the ingestion endpoint rejects requests without the admin token"""
+        response = self.ingest(client, [valid_track_features], token='wrong')
+        
+        assert response.status_code == 403
+    
+    def test_ingest_rejects_invalid_track(self, client, ingestible_catalog, valid_track_features):
+        """Test one invalid track rejects the whole request"""
+        invalid = dict(valid_track_features, energy=2.0)
+        
+        response = self.ingest(client, [valid_track_features, invalid])
+        
+        assert response.status_code == 400
+        assert 'Track 1' in json.loads(response.data)['error']['message']
+        assert not (ingestible_catalog.parent / 'dataset.segments').exists()
+    
+    def test_ingested_track_is_recommended(self, client, ingestible_catalog, valid_track_features):
+        """Test an ingested track is immediately returned by /api/similar"""
+        track = dict(valid_track_features, track_id='new:1', track_name='Fresh Release', artists='New Artist')
+        
+        response = self.ingest(client, [track])
+        data = json.loads(response.data)
+        
+        assert response.status_code == 200
+        assert data['ingested'] == 1
+        
+        similar = json.loads(client.post(
+            '/api/similar',
+            data=json.dumps({'features': valid_track_features, 'n_recommendations': 3}),
+            content_type='application/json'
+        ).data)
+        assert similar['similar_tracks'][0]['track_name'] == 'Fresh Release'
+
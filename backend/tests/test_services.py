@@ -0,0 +1,1389 @@
+"""
+Unit tests for service internals
+Tests the micro-batching scheduler, batched model inference, the
+inference process pool, streaming EDA and shadow scoring
+"""
+import os
+import sys
+import threading
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+
+# Add parent directory to path to import app modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.batching import MicroBatcher
+from app.data_service import DataService
+from app.deadline import DeadlineExceeded, deadline_scope
+from app.eda_engine import EDAAccumulator, KLLSketch, compute_eda_file
+from app.knn_graph import build_knn_graph, save_knn_graph
+from app.metrics import metrics
+from app.ml_service import ModelService
+from app.process_pool import InferencePool
+from app.scoring import score_file
+from app.search_index import TrackSearchIndex, normalize
+from app.shadow import ShadowScorer
+
+
+MODEL_PATH = os.path.join(os.path.dirname(__file__), '..', 'models', 'model.pkl')
+SCALER_PATH = os.path.join(os.path.dirname(__file__), '..', 'models', 'scaler.pkl')
+GENRE_ENCODER_PATH = os.path.join(os.path.dirname(__file__), '..', 'models', 'genre_encoder.pkl')
+DATASET_PATH = os.path.join(os.path.dirname(__file__), '..', 'data', 'dataset.csv')
+
+
+@pytest.fixture
+def valid_track_features():
+    """Sample valid track features for testing"""
+    return {
+        'tempo': 120.0,
+        'energy': 0.8,
+        'danceability': 0.7,
+        'loudness': -5.0,
+        'valence': 0.6,
+        'acousticness': 0.1,
+        'instrumentalness': 0.0,
+        'liveness': 0.2,
+        'speechiness': 0.05,
+        'duration_ms': 200000,
+        'key': 5,
+        'mode': 1,
+        'time_signature': 4
+    }
+
+
+class TestMicroBatcher:
+    """Tests for the MicroBatcher scheduler"""
+    
+    def test_concurrent_requests_are_coalesced(self):
+        """Test concurrent submissions share batched calls"""
+        batch_sizes = []
+        
+        def process(items):
+            batch_sizes.append(len(items))
+            time.sleep(0.01)
+            return [item * 2 for item in items]
+        
+        batcher = MicroBatcher(process, max_batch_size=8, max_wait_ms=50, name='test_coalesce')
+        results = {}
+        
+        def worker(i):
+            results[i] = batcher.submit(i)
+        
+        threads = [threading.Thread(target=worker, args=(i,)) for i in range(16)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        batcher.close()
+        
+        assert results == {i: i * 2 for i in range(16)}
+        assert sum(batch_sizes) == 16
+        assert max(batch_sizes) <= 8
+        assert len(batch_sizes) < 16
+    
+    def test_idle_request_is_not_delayed(self):
+        """Test a lone request does not wait for max_wait_ms"""
+        batcher = MicroBatcher(lambda items: items, max_wait_ms=1000, name='test_idle')
+        
+        start = time.perf_counter()
+        assert batcher.submit('x') == 'x'
+        elapsed = time.perf_counter() - start
+        batcher.close()
+        
+        assert elapsed < 0.5
+    
+    def test_errors_propagate_to_every_caller(self):
+        """Test a failing batch raises in the submitting thread"""
+        def process(items):
+            raise RuntimeError("model failure")
+        
+        batcher = MicroBatcher(process, name='test_errors')
+        with pytest.raises(RuntimeError, match="model failure"):
+            batcher.submit(1)
+        batcher.close()
+
+
+class TestDeadlines:
+    """Test cooperative cancellation of work past its request deadline"""
+    
+    def test_similarity_scan_stops_between_blocks(self, monkeypatch, valid_track_features):
+        """Test an expiring deadline aborts the blocked scan part way through"""
+        import app.data_service as data_service_module
+        
+        service = DataService(DATASET_PATH)
+        query = np.array([[valid_track_features[col] for col in service.feature_columns]])
+        monkeypatch.setattr(data_service_module, 'SIMILARITY_BLOCK_BYTES', 8 * 100)
+        blocks = []
+        
+        def check():
+            blocks.append(None)
+            if len(blocks) > 3:
+                raise DeadlineExceeded("Request deadline exceeded")
+        
+        monkeypatch.setattr(data_service_module, 'check_deadline', check)
+        with pytest.raises(DeadlineExceeded):
+            service.similarity_top_k(query, 5)
+        assert len(blocks) == 4
+    
+    def test_expired_deadline_and_no_deadline(self, valid_track_features):
+        """Test scans fail once the deadline has passed and run without one"""
+        service = DataService(DATASET_PATH)
+        query = np.array([[valid_track_features[col] for col in service.feature_columns]])
+        
+        with pytest.raises(DeadlineExceeded), deadline_scope(time.monotonic() - 1):
+            service.similarity_top_k(query, 5)
+        with deadline_scope(time.monotonic() + 60):
+            assert len(service.similarity_top_k(query, 5)[0][0]) == 5
+        assert len(service.similarity_top_k(query, 5)[0][0]) == 5
+    
+    def test_shared_sort_outlives_expired_request(self, monkeypatch):
+        """Test a request stops waiting for a shared column sort that still finishes"""
+        service = DataService(DATASET_PATH)
+        release = threading.Event()
+        builds = []
+        sort_column = service._sort_column
+        
+        def slow_sort(index, base_rows):
+            builds.append(index)
+            release.wait(5)
+            return sort_column(index, base_rows)
+        
+        monkeypatch.setattr(service, '_sort_column', slow_sort)
+        with pytest.raises(DeadlineExceeded), deadline_scope(time.monotonic() + 0.05):
+            service.feature_quantiles('energy', [0.5])
+        release.set()
+        
+        column = service._sorted_runs('energy')[0]
+        assert np.array_equal(column, np.sort(service.feature_matrix[:, 1]))
+        assert builds == [1]
+    
+    def test_shared_eda_build_outlives_expired_request(self, monkeypatch):
+        """Test the EDA build is shared and not aborted by one request's deadline"""
+        service = DataService(DATASET_PATH)
+        release = threading.Event()
+        builds = []
+        build = service._build_eda_statistics
+        
+        def slow_build():
+            builds.append(None)
+            release.wait(5)
+            return build()
+        
+        monkeypatch.setattr(service, '_build_eda_statistics', slow_build)
+        with pytest.raises(DeadlineExceeded), deadline_scope(time.monotonic() + 0.05):
+            service.get_eda_data()
+        with pytest.raises(DeadlineExceeded), deadline_scope(time.monotonic() - 1):
+            service.get_eda_data()
+        release.set()
+        
+        assert service.get_eda_data()['summary_statistics']
+        assert len(builds) == 1
+    
+    def test_batcher_skips_expired_items(self):
+        """Test items whose deadline passed while queued are not computed"""
+        processed = []
+        
+        def process(items):
+            processed.extend(items)
+            return items
+        
+        batcher = MicroBatcher(process, max_wait_ms=0, name='test_deadline')
+        try:
+            with pytest.raises(DeadlineExceeded), deadline_scope(time.monotonic() - 1):
+                batcher.submit('late')
+            with deadline_scope(time.monotonic() + 60):
+                assert batcher.submit('on time') == 'on time'
+        finally:
+            batcher.close()
+        
+        assert processed == ['on time']
+        assert metrics.snapshot()['test_deadline_expired_total'] == 1
+    
+    def test_client_can_only_shorten_the_timeout(self):
+        """Test the timeout header shortens but never extends the endpoint timeout"""
+        from app.deadline import RequestDeadlines
+        
+        deadlines = RequestDeadlines(default_timeout=10, timeouts={'similar_tracks_batch': 30, 'eda_data': 0})
+        
+        assert deadlines.timeout_for('predict') == 10
+        assert deadlines.timeout_for('predict', '2500') == 2.5
+        assert deadlines.timeout_for('predict', '60000') == 10
+        assert deadlines.timeout_for('similar_tracks_batch') == 30
+        assert deadlines.timeout_for('eda_data') is None
+        assert deadlines.timeout_for('predict', 'soon') == 10
+
+
+class TestBatchedInference:
+    """Tests for batched ModelService inference"""
+    
+    def test_batched_predictions_match_single(self, valid_track_features):
+        """Test predict_batch gives the same results as individual predictions"""
+        service = ModelService(MODEL_PATH, SCALER_PATH, GENRE_ENCODER_PATH)
+        tracks = [dict(valid_track_features, energy=energy) for energy in np.linspace(0, 1, 7)]
+        
+        batched = service.predict_batch(tracks)
+        single = [service.predict(track) for track in tracks]
+        
+        assert batched == single
+    
+    def test_predict_through_batcher(self, valid_track_features):
+        """Test predict() returns the same result with batching enabled"""
+        plain = ModelService(MODEL_PATH, SCALER_PATH, GENRE_ENCODER_PATH)
+        batched = ModelService(MODEL_PATH, SCALER_PATH, GENRE_ENCODER_PATH, batching=True)
+        try:
+            assert batched.predict(valid_track_features) == plain.predict(valid_track_features)
+        finally:
+            batched.close()
+
+
+@pytest.fixture(scope="module")
+def fast_model_path(tmp_path_factory):
+    """Distill a small fast-tier model from the full model"""
+    from train_model import distill_model
+    
+    service = ModelService(MODEL_PATH, SCALER_PATH, GENRE_ENCODER_PATH)
+    base = pd.read_csv(DATASET_PATH)[service.base_features].to_numpy(dtype=np.float64)
+    X = service.scaler.transform(service.build_feature_matrix(base))
+    student = distill_model(service.model, X, max_depth=3, n_estimators=30)
+    
+    path = tmp_path_factory.mktemp('models') / 'model_fast.pkl'
+    joblib.dump(student, path)
+    return str(path)
+
+
+class TestExplanations:
+    """Test per-feature contributions from the booster's pred_contribs"""
+    
+    @pytest.fixture(scope="class")
+    def model_service(self):
+        return ModelService(MODEL_PATH, SCALER_PATH, GENRE_ENCODER_PATH)
+    
+    @pytest.fixture(scope="class")
+    def base(self, model_service):
+        return pd.read_csv(DATASET_PATH)[model_service.base_features].to_numpy(dtype=float)[:300]
+    
+    def test_contributions_add_up_to_prediction(self, model_service, base):
+        """Test base value plus contributions gives the model's hit log-odds"""
+        probabilities, contributions, base_values = model_service.explain_matrix(base)
+        
+        assert contributions.shape == (300, 13)
+        np.testing.assert_allclose(probabilities, model_service.predict_proba_matrix(base), atol=1e-5)
+        margin = base_values + contributions.sum(axis=1)
+        np.testing.assert_allclose(1 / (1 + np.exp(-margin)), probabilities[:, 1], atol=1e-9)
+    
+    def test_precomputed_rows_match(self, model_service, base):
+        """Test precomputed explanations equal computed ones and mix with new rows"""
+        service = ModelService(MODEL_PATH, SCALER_PATH, GENRE_ENCODER_PATH)
+        expected = model_service.explain_matrix(base[:50])
+        
+        assert service.precompute_explanations(base[:40], block_rows=16) == 40
+        result = service.explain_matrix(base[:50])
+        for actual, wanted in zip(result, expected):
+            np.testing.assert_allclose(actual, wanted)
+    
+    def test_explanation_cache_is_bounded(self, base):
+        """Test the explanation cache keeps only the most recently used rows"""
+        service = ModelService(MODEL_PATH, SCALER_PATH, GENRE_ENCODER_PATH, explanation_cache_size=10)
+        expected = service.explain_matrix(base[:30])
+        
+        assert service.precompute_explanations(base) == 10
+        cache = service._explanations[('full', service.version)]
+        assert len(cache) == 10
+        service.explain_matrix(base[:2])
+        assert list(cache)[-2:] == [base[0].tobytes(), base[1].tobytes()]
+        
+        result = service.explain_matrix(base[:30])
+        for actual, wanted in zip(result, expected):
+            np.testing.assert_allclose(actual, wanted)
+        service.close()
+        assert len(cache) == 0
+    
+    def test_batched_predict_with_explanations(self, base):
+        """Test explained predictions share micro-batches and carry contributions"""
+        service = ModelService(MODEL_PATH, SCALER_PATH, GENRE_ENCODER_PATH, batching=True, max_wait_ms=20)
+        features = [dict(zip(service.base_features, row)) for row in base[:8]]
+        results = [None] * len(features)
+        
+        def run(i):
+            results[i] = service.predict(features[i], explain=i % 2 == 0)
+        
+        threads = [threading.Thread(target=run, args=(i,)) for i in range(len(features))]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        service.close()
+        
+        for i, result in enumerate(results):
+            assert ('explanation' in result) == (i % 2 == 0)
+            assert result['prediction'] == service.predict_batch([features[i]])[0]['prediction']
+
+
+class TestModelTiers:
+    """Tests for serving the full and distilled fast tiers"""
+    
+    def test_fast_tier_per_request(self, fast_model_path, valid_track_features):
+        """Test each request can pick a tier and reports the tier's version"""
+        service = ModelService(MODEL_PATH, SCALER_PATH, GENRE_ENCODER_PATH,
+                               batching=True, fast_model_path=fast_model_path)
+        try:
+            full = service.predict(valid_track_features)
+            fast = service.predict(valid_track_features, tier='fast')
+        finally:
+            service.close()
+        
+        assert service.tiers == ['full', 'fast']
+        assert full['model_tier'] == 'full' and fast['model_tier'] == 'fast'
+        assert full['model_version'] == service.version
+        assert fast['model_version'] != service.version
+        service.validate()
+    
+    def test_fast_tier_per_deployment(self, fast_model_path, valid_track_features):
+        """Test the default tier is used when a request does not pick one"""
+        service = ModelService(MODEL_PATH, SCALER_PATH, GENRE_ENCODER_PATH,
+                               fast_model_path=fast_model_path, default_tier='fast')
+        
+        assert service.predict(valid_track_features)['model_tier'] == 'fast'
+    
+    def test_student_tracks_teacher(self, fast_model_path):
+        """Test the distilled model mostly agrees with the full model"""
+        service = ModelService(MODEL_PATH, SCALER_PATH, GENRE_ENCODER_PATH,
+                               fast_model_path=fast_model_path)
+        base = pd.read_csv(DATASET_PATH)[service.base_features].to_numpy(dtype=np.float64)
+        
+        full = service.predict_proba_matrix(base, tier='full').argmax(axis=1)
+        fast = service.predict_proba_matrix(base, tier='fast').argmax(axis=1)
+        
+        assert np.mean(full == fast) > 0.8
+    
+    def test_unavailable_tier_rejected(self, valid_track_features):
+        """Test asking for a tier without its model raises ValueError"""
+        service = ModelService(MODEL_PATH, SCALER_PATH, GENRE_ENCODER_PATH)
+        
+        with pytest.raises(ValueError):
+            service.predict(valid_track_features, tier='fast')
+        with pytest.raises(ValueError):
+            ModelService(MODEL_PATH, SCALER_PATH, GENRE_ENCODER_PATH, default_tier='fast')
+
+
+@pytest.fixture(scope="module")
+def bundle_dir(tmp_path_factory, fast_model_path):
+    """Export the pickled artifacts as a native bundle"""
+    from app.artifacts import save_bundle
+    
+    service = ModelService(MODEL_PATH, SCALER_PATH, GENRE_ENCODER_PATH)
+    path = tmp_path_factory.mktemp('bundle')
+    save_bundle(service.model, service.scaler, str(path), service.genre_encoder,
+                fast_model=joblib.load(fast_model_path))
+    return path
+
+
+class TestModelZoo:
+    """Test k-fold model comparison in parallel worker processes"""
+    
+    @pytest.fixture(scope="class")
+    def training_data(self):
+        from train_model import FEATURE_COLUMNS
+        
+        df = pd.read_csv(DATASET_PATH).head(600)
+        y = (df['popularity'] >= df['popularity'].quantile(0.70)).astype(int)
+        return df[FEATURE_COLUMNS], y
+    
+    def test_cpu_budget_split(self):
+        """Test spare cores become threads inside each fit"""
+        from train_model import split_cpu_budget
+        
+        assert split_cpu_budget(20, cpus=8) == (8, 1)
+        assert split_cpu_budget(4, cpus=16) == (4, 4)
+        assert split_cpu_budget(3, cpus=1) == (1, 1)
+    
+    def test_parallel_folds_match_in_process(self, training_data):
+        """Test worker processes on shared memory reproduce the in-process results"""
+        from train_model import run_model_zoo
+        
+        X, y = training_data
+        model_types = ['xgboost', 'random_forest']
+        parallel = run_model_zoo(X, y, model_types=model_types, n_folds=2, processes=2)
+        inline = run_model_zoo(X, y, model_types=model_types, n_folds=2, processes=1)
+        
+        assert parallel['processes'] == 2
+        accuracies = [entry['accuracy'] for entry in parallel['models']]
+        assert accuracies == sorted(accuracies, reverse=True)
+        for entry, expected in zip(parallel['models'], inline['models']):
+            assert entry['model_type'] == expected['model_type']
+            assert len(entry['folds']) == 2
+            assert entry['wall_seconds'] > 0
+            for fold, expected_fold in zip(entry['folds'], expected['folds']):
+                assert fold['accuracy'] == expected_fold['accuracy']
+                assert fold['f1'] == expected_fold['f1']
+
+
+class TestNativeArtifacts:
+    """Tests for loading the native artifact bundle"""
+    
+    def test_bundle_matches_pickles(self, bundle_dir, fast_model_path):
+        """Test the bundle gives the same probabilities as the pickles for both tiers"""
+        pickled = ModelService(MODEL_PATH, SCALER_PATH, GENRE_ENCODER_PATH,
+                               fast_model_path=fast_model_path)
+        native = ModelService(str(bundle_dir / 'model.ubj'),
+                              fast_model_path=str(bundle_dir / 'model_fast.ubj'))
+        base = pd.read_csv(DATASET_PATH)[pickled.base_features].to_numpy(dtype=np.float64)
+        
+        assert native.genre_encoder is not None
+        for tier in ('full', 'fast'):
+            np.testing.assert_allclose(
+                native.predict_proba_matrix(base, tier=tier),
+                pickled.predict_proba_matrix(base, tier=tier),
+                atol=1e-6
+            )
+        native.validate()
+    
+    def test_bundle_checksum_mismatch(self, bundle_dir, tmp_path):
+        """Test a bundle file that does not match the manifest is rejected"""
+        import shutil
+        
+        for name in ('model.ubj', 'preprocess.npz', 'manifest.json'):
+            shutil.copy(bundle_dir / name, tmp_path / name)
+        with open(tmp_path / 'model.ubj', 'ab') as f:
+            f.write(b'\0')
+        
+        with pytest.raises(RuntimeError, match='Checksum mismatch'):
+            ModelService(str(tmp_path / 'model.ubj'))
+    
+    def test_bundle_in_worker_process(self, bundle_dir, inference_pool, valid_track_features):
+        """Test worker processes load the bundle from the service's model arguments"""
+        local = ModelService(str(bundle_dir / 'model.ubj'))
+        pooled = ModelService(str(bundle_dir / 'model.ubj'), executor=inference_pool)
+        
+        assert pooled.predict(valid_track_features) == local.predict(valid_track_features)
+
+
+@pytest.fixture(scope="module")
+def inference_pool():
+    """Start a single-worker inference pool for testing"""
+    pool = InferencePool(
+        dataset_path=DATASET_PATH,
+        size=1,
+        max_batch_size=4,
+        health_interval=0
+    )
+    yield pool
+    pool.close()
+
+
+class TestInferencePool:
+    """Tests for the process-pool inference executor"""
+    
+    def test_pool_predictions_match_in_process(self, inference_pool, valid_track_features):
+        """Test predictions from worker processes match in-process predictions"""
+        local = ModelService(MODEL_PATH, SCALER_PATH, GENRE_ENCODER_PATH)
+        pooled = ModelService(MODEL_PATH, SCALER_PATH, GENRE_ENCODER_PATH, executor=inference_pool)
+        # More rows than max_batch_size to exercise chunked transfers
+        tracks = [dict(valid_track_features, valence=valence) for valence in np.linspace(0, 1, 10)]
+        
+        np.testing.assert_allclose(pooled.predict_proba_batch(tracks), local.predict_proba_batch(tracks))
+    
+    def test_pool_similarity_matches_in_process(self, inference_pool, valid_track_features):
+        """Test similarity scans from worker processes match in-process scans"""
+        local = DataService(DATASET_PATH)
+        pooled = DataService(DATASET_PATH, executor=inference_pool)
+        
+        local_tracks = local.find_similar_tracks(valid_track_features, 7)
+        pooled_tracks = pooled.find_similar_tracks(valid_track_features, 7)
+        
+        assert [t['track_name'] for t in pooled_tracks] == [t['track_name'] for t in local_tracks]
+    
+    def test_pool_worker_stops_at_deadline(self, inference_pool, valid_track_features):
+        """Test a scan past its deadline fails in the worker without restarting it"""
+        service = DataService(DATASET_PATH)
+        query = np.array([[valid_track_features[col] for col in service.feature_columns]])
+        pids = [worker.process.pid for worker in inference_pool._workers]
+        
+        with pytest.raises(DeadlineExceeded):
+            inference_pool._run('similar', query, lambda outputs, n: None, 5, None, time.monotonic() - 1)
+        with pytest.raises(DeadlineExceeded), deadline_scope(time.monotonic() - 1):
+            inference_pool.similarity_top_k(query, 5)
+        
+        assert [worker.process.pid for worker in inference_pool._workers] == pids
+        assert len(inference_pool.similarity_top_k(query, 5)[0][0]) == 5
+    
+    def test_pool_restarts_crashed_worker(self, inference_pool, valid_track_features):
+        """Test a killed worker is restarted and the call still succeeds"""
+        service = ModelService(MODEL_PATH, SCALER_PATH, GENRE_ENCODER_PATH, executor=inference_pool)
+        worker = inference_pool._workers[0]
+        old_pid = worker.process.pid
+        
+        worker.process.kill()
+        worker.process.join()
+        result = service.predict(valid_track_features)
+        
+        assert result['prediction'] in ['hit', 'miss']
+        assert worker.process.pid != old_pid
+    
+    def test_pool_health_check(self, inference_pool):
+        """Test health checks report every idle worker as healthy"""
+        status = inference_pool.health_check()
+        
+        assert status == {'size': 1, 'checked': 1, 'healthy': 1}
+
+
+@pytest.fixture
+def catalog_path(tmp_path):
+    """Temporary copy of the dataset that tests can ingest into"""
+    import shutil
+    
+    path = tmp_path / 'dataset.csv'
+    shutil.copy(DATASET_PATH, path)
+    return path
+
+
+def new_tracks(features, count, prefix='new'):
+    """Distinct tracks around the given features (the first one matches them exactly)"""
+    return [
+        dict(features, track_id=f'{prefix}:{i}', track_name=f'Release {i}', artists='New Artist',
+             energy=features['energy'] - i * 0.01)
+        for i in range(count)
+    ]
+
+
+class TestCatalogIngestion:
+    """Tests for incremental track ingestion"""
+    
+    def test_ingest_appends_and_persists(self, catalog_path, valid_track_features):
+        """Test ingested tracks are searchable and survive a reload"""
+        service = DataService(str(catalog_path))
+        n_tracks, version = service.n_tracks, service.version
+        
+        result = service.ingest_tracks(new_tracks(valid_track_features, 3))
+        
+        assert result['ingested'] == 3 and result['total_tracks'] == n_tracks + 3
+        assert service.version != version
+        assert len(service.df) == n_tracks + 3
+        assert service.find_similar_tracks(valid_track_features, 3)[0]['artist'] == 'New Artist'
+        assert (catalog_path.parent / 'dataset.segments' / 'segment-000001.csv').exists()
+        
+        reloaded = DataService(str(catalog_path))
+        assert reloaded.n_tracks == n_tracks + 3
+        assert reloaded.version == service.version
+        np.testing.assert_allclose(reloaded.feature_matrix, service.feature_matrix)
+    
+    def test_duplicate_track_ids_skipped(self, catalog_path, valid_track_features):
+        """Test tracks already in the catalog are not ingested twice"""
+        service = DataService(str(catalog_path))
+        tracks = new_tracks(valid_track_features, 2)
+        service.ingest_tracks(tracks)
+        
+        result = service.ingest_tracks(tracks + [dict(tracks[0], track_id=service.track_ids[0])])
+        
+        assert result['ingested'] == 0 and result['skipped'] == 3
+    
+    def test_ingest_invalidates_eda(self, catalog_path, valid_track_features):
+        """Test the EDA cache reflects ingested tracks"""
+        service = DataService(str(catalog_path))
+        before = service.get_eda_data()['hit_miss_distribution']
+        
+        service.ingest_tracks(new_tracks(valid_track_features, 4))
+        after = service.get_eda_data()['hit_miss_distribution']
+        
+        assert sum(after.values()) == sum(before.values()) + 4
+    
+    def test_compaction_folds_segments(self, catalog_path, valid_track_features):
+        """Test compaction merges the segments into the base file"""
+        service = DataService(str(catalog_path), compact_after=0)
+        for batch in range(3):
+            service.ingest_tracks(new_tracks(valid_track_features, 2, prefix=f'batch{batch}'))
+        
+        version = service.version
+        
+        assert service.compact() == 3
+        assert list((catalog_path.parent / 'dataset.segments').glob('segment-*')) == []
+        reloaded = DataService(str(catalog_path))
+        assert reloaded.n_tracks == service.n_tracks
+        # The version follows the segment sequence, not the file that holds the rows
+        assert service.version == reloaded.version == version
+        
+        # Ingestion continues after compaction without reusing segment names
+        service.ingest_tracks(new_tracks(valid_track_features, 1, prefix='late'))
+        assert (catalog_path.parent / 'dataset.segments' / 'segment-000004.csv').exists()
+    
+    def test_ingest_syncs_worker_processes(self, catalog_path, valid_track_features):
+        """Test pool workers see ingested tracks in similarity scans"""
+        pool = InferencePool(dataset_path=str(catalog_path), size=1, health_interval=0)
+        try:
+            service = DataService(str(catalog_path), executor=pool)
+            service.ingest_tracks(new_tracks(valid_track_features, 1))
+            
+            assert service.find_similar_tracks(valid_track_features, 3)[0]['artist'] == 'New Artist'
+        finally:
+            pool.close()
+    
+    def test_load_leaves_no_segment_state(self, catalog_path):
+        """Test only ingestion creates the segment directory and manifest"""
+        service = DataService(str(catalog_path))
+        service.sync_segments()
+        service.compact()
+        
+        assert not (catalog_path.parent / 'dataset.segments').exists()
+    
+    def test_replaced_base_refuses_stale_segments(self, catalog_path, valid_track_features):
+        """Test segments written on a previous base file are not merged into a new one"""
+        DataService(str(catalog_path)).ingest_tracks(new_tracks(valid_track_features, 2))
+        df = pd.read_csv(catalog_path)
+        df.iloc[:100].to_csv(catalog_path, index=False)
+        
+        with pytest.raises(RuntimeError, match='replaced'):
+            DataService(str(catalog_path))
+        
+        # Once the old segments are moved aside the new file loads alone
+        (catalog_path.parent / 'dataset.segments').rename(catalog_path.parent / 'old.segments')
+        assert DataService(str(catalog_path)).n_tracks == 100
+    
+    def test_interrupted_compaction_is_finished(self, catalog_path, valid_track_features, monkeypatch):
+        """Test a compaction that stopped before swapping the base file is completed on load"""
+        service = DataService(str(catalog_path), compact_after=0)
+        service.ingest_tracks(new_tracks(valid_track_features, 2))
+        replace = os.replace
+        
+        def crash_on_swap(source, target):
+            if target == str(catalog_path):
+                raise OSError('crashed before the swap')
+            replace(source, target)
+        
+        monkeypatch.setattr(os, 'replace', crash_on_swap)
+        with pytest.raises(OSError):
+            service.compact()
+        monkeypatch.undo()
+        
+        reloaded = DataService(str(catalog_path))
+        assert reloaded.n_tracks == service.n_tracks and reloaded.version == service.version
+        assert list((catalog_path.parent / 'dataset.segments').glob('segment-*')) == []
+    
+    def test_sync_applies_other_process_segments(self, catalog_path, valid_track_features):
+        """Test a second service sharing the dataset picks up its segments, also once compacted"""
+        writer = DataService(str(catalog_path), compact_after=0)
+        reader = DataService(str(catalog_path))
+        
+        writer.ingest_tracks(new_tracks(valid_track_features, 2, prefix='first'))
+        assert reader.sync_segments() == writer.n_tracks
+        assert reader.version == writer.version
+        
+        writer.ingest_tracks(new_tracks(valid_track_features, 3, prefix='second'))
+        writer.compact()
+        writer.ingest_tracks(new_tracks(valid_track_features, 1, prefix='third'))
+        
+        assert reader.sync_segments() == writer.n_tracks
+        assert reader.track_ids == writer.track_ids
+        assert reader.version == writer.version
+        np.testing.assert_allclose(reader.scaled_features, writer.scaled_features)
+        
+        # Ingesting through the reader continues the shared sequence
+        reader.ingest_tracks(new_tracks(valid_track_features, 1, prefix='fourth'))
+        assert (catalog_path.parent / 'dataset.segments' / 'segment-000004.csv').exists()
+    
+    def test_segment_structures_fold(self, catalog_path, valid_track_features, monkeypatch):
+        """Test per-segment indexes answer like a fresh load before and after folding"""
+        import app.data_service as data_service_module
+        monkeypatch.setattr(data_service_module, 'FOLD_SEGMENTS', 1000)
+        
+        service = DataService(str(catalog_path), compact_after=0)
+        service.feature_quantiles('tempo', [0.5])
+        for batch in range(4):
+            tracks = new_tracks(valid_track_features, 3, prefix=f'batch{batch}')
+            service.ingest_tracks([dict(track, artists=f'Artist {batch}', tempo=100.0 + batch) for track in tracks])
+        fresh = DataService(str(catalog_path))
+        
+        def answers(target):
+            filters = target.normalize_filters({'exclude_artists': ['Artist 1', 'Artist 2']})
+            return (
+                target.feature_histogram('tempo', bins=30)['counts'].tolist(),
+                target.feature_quantiles('tempo', [0, 0.25, 0.5, 0.9, 1]).tolist(),
+                target.search_tracks('artist 3'),
+                target.find_similar_tracks(valid_track_features, 20, filters)
+            )
+        
+        expected = answers(fresh)
+        assert answers(service) == expected
+        assert service.fold_segments() == 4
+        assert service.fold_segments() == 0
+        assert answers(service) == expected
+
+
+@pytest.fixture
+def genre_catalog_path(tmp_path):
+    """Copy of the dataset with a track_genre column (three genres in turn)"""
+    df = pd.read_csv(DATASET_PATH)
+    df['track_genre'] = np.array(['pop', 'rock', 'jazz'])[np.arange(len(df)) % 3]
+    path = tmp_path / 'dataset.csv'
+    df.to_csv(path, index=False)
+    return path
+
+
+class TestFilteredSimilarity:
+    """Test filter predicates applied inside the similarity search"""
+    
+    def brute_force(self, service, features, keep, n):
+        """Top n rows among those where keep is true, by scoring every row"""
+        query = np.array([[features[col] for col in service.feature_columns]])
+        similarities = service.similarity_top_k(query, service.n_tracks)
+        rows = [row for row in similarities[0][0] if keep(row)]
+        return rows[:n]
+    
+    def test_genre_artist_and_hits_filters(self, genre_catalog_path, valid_track_features):
+        """Test combined filters return the top matches among the allowed tracks"""
+        service = DataService(str(genre_catalog_path))
+        excluded = service.artists[int(service.similarity_top_k(
+            np.array([[valid_track_features[col] for col in service.feature_columns]]), 1)[0][0, 0])]
+        filters = {'genre': 'rock', 'exclude_artists': excluded, 'hits_only': True}
+        
+        tracks = service.find_similar_tracks(valid_track_features, 10, filters)
+        
+        expected = self.brute_force(service, valid_track_features, lambda row: (
+            service.genres[row] == 'rock' and service.artists[row] != excluded
+            and service.popularity_scores[row] >= service.hit_threshold
+        ), 10)
+        assert [track['track_name'] for track in tracks] == [service.track_names[row] for row in expected]
+    
+    def test_popularity_range(self, catalog_path, valid_track_features):
+        """Test min and max popularity bound the results"""
+        service = DataService(str(catalog_path))
+        
+        tracks = service.find_similar_tracks(valid_track_features, 10, {'min_popularity': 40, 'max_popularity': 45})
+        
+        expected = self.brute_force(service, valid_track_features,
+                                    lambda row: 40 <= service.popularity_scores[row] <= 45, 10)
+        assert [track['track_name'] for track in tracks] == [service.track_names[row] for row in expected]
+    
+    def test_fewer_matches_than_requested(self, genre_catalog_path, valid_track_features):
+        """Test a filter matching few tracks returns only those"""
+        service = DataService(str(genre_catalog_path))
+        
+        assert service.find_similar_tracks(valid_track_features, 5, {'genre': 'metal'}) == []
+        assert len(service.find_similar_tracks(valid_track_features, 5, {'min_popularity': 100})) < 5
+    
+    def test_invalid_filters(self, catalog_path, valid_track_features):
+        """Test unknown filters and filters on missing columns are rejected"""
+        service = DataService(str(catalog_path))
+        
+        with pytest.raises(ValueError):
+            service.find_similar_tracks(valid_track_features, 5, {'colour': 'red'})
+        with pytest.raises(ValueError):
+            service.find_similar_tracks(valid_track_features, 5, {'genre': 'rock'})
+    
+    def test_filters_follow_ingestion(self, genre_catalog_path, valid_track_features):
+        """Test ingested tracks join the genre partitions and popularity scores"""
+        service = DataService(str(genre_catalog_path))
+        tracks = [dict(track, track_genre='ambient', popularity=90) for track in new_tracks(valid_track_features, 3)]
+        service.ingest_tracks(tracks)
+        
+        result = service.find_similar_tracks(valid_track_features, 5, {'genre': 'ambient', 'hits_only': True})
+        
+        assert [track['track_name'] for track in result] == ['Release 0', 'Release 1', 'Release 2']
+    
+    def test_blocked_search_matches_full_sort(self, catalog_path, monkeypatch):
+        """Test small similarity blocks give the same neighbours as a full sort"""
+        import app.data_service as data_service_module
+        service = DataService(str(catalog_path))
+        rng = np.random.default_rng(0)
+        query = service.feature_matrix[rng.integers(0, service.n_tracks, 50)] * 1.01
+        
+        full_indices, full_scores = service.similarity_top_k(query, 10)
+        filtered_indices, _ = service.similarity_top_k(query, 10, {'max_popularity': 60})
+        for block_bytes in (8 * 5, 8 * 700, 8 * 20000):
+            monkeypatch.setattr(data_service_module, 'SIMILARITY_BLOCK_BYTES', block_bytes)
+            indices, scores = service.similarity_top_k(query, 10)
+            
+            np.testing.assert_array_equal(indices, full_indices)
+            np.testing.assert_allclose(scores, full_scores)
+            np.testing.assert_array_equal(service.similarity_top_k(query, 10, {'max_popularity': 60})[0],
+                                          filtered_indices)
+    
+    def test_filters_in_worker_processes(self, genre_catalog_path, valid_track_features):
+        """Test filters are applied by the inference pool workers"""
+        local = DataService(str(genre_catalog_path))
+        pool = InferencePool(dataset_path=str(genre_catalog_path), size=1, health_interval=0)
+        try:
+            pooled = DataService(str(genre_catalog_path), executor=pool)
+            filters = {'genre': 'jazz', 'min_popularity': 30}
+            
+            assert pooled.find_similar_tracks(valid_track_features, 7, filters) == \
+                local.find_similar_tracks(valid_track_features, 7, filters)
+        finally:
+            pool.close()
+
+
+class TestKnnGraph:
+    """Test the precomputed neighbour graph and lookups by track id"""
+    
+    @pytest.fixture(scope="class")
+    def graph_path(self, tmp_path_factory):
+        service = DataService(DATASET_PATH)
+        neighbors, scores = build_knn_graph(service.unit_features, k=10)
+        path = str(tmp_path_factory.mktemp('graph') / 'knn_graph.npz')
+        save_knn_graph(path, neighbors, scores, service.track_ids)
+        return path
+    
+    def test_graph_matches_full_search(self):
+        """Test the graph holds each track's nearest other tracks"""
+        service = DataService(DATASET_PATH)
+        neighbors, scores = build_knn_graph(service.unit_features, k=5)
+        
+        assert not service.unit_features.flags.writeable
+        assert neighbors.dtype == np.int32 and scores.dtype == np.float16
+        rows = np.arange(0, service.n_tracks, 97)
+        indices, expected = service.similarity_top_k(service.feature_matrix[rows], 6)
+        for row, row_indices, row_scores in zip(rows, indices, expected):
+            keep = row_indices != row
+            np.testing.assert_allclose(scores[row].astype(float), row_scores[keep][:5], atol=1e-3)
+    
+    def test_processes_build_same_graph(self):
+        """Test the multi-process build equals the inline one"""
+        service = DataService(DATASET_PATH)
+        inline = build_knn_graph(service.unit_features, k=5)
+        parallel = build_knn_graph(service.unit_features, k=5, processes=2)
+        
+        np.testing.assert_array_equal(inline[0], parallel[0])
+        np.testing.assert_array_equal(inline[1], parallel[1])
+    
+    def test_lookup_uses_graph(self, graph_path):
+        """Test similar_to_track reads the graph and agrees with a live search"""
+        with_graph = DataService(DATASET_PATH, knn_graph_path=graph_path)
+        without_graph = DataService(DATASET_PATH)
+        track_id = with_graph.track_ids[42]
+        
+        assert with_graph.knn_neighbors is not None
+        from_graph = with_graph.similar_to_track(track_id, 8)
+        live = without_graph.similar_to_track(track_id, 8)
+        assert [track['track_name'] for track in from_graph] == [track['track_name'] for track in live]
+        assert with_graph.track_names[42] not in [track['track_name'] for track in from_graph]
+    
+    def test_graph_for_other_catalog_is_ignored(self, graph_path, tmp_path):
+        """Test a graph built for different tracks is not used"""
+        df = pd.read_csv(DATASET_PATH).iloc[::-1]
+        path = tmp_path / 'dataset.csv'
+        df.to_csv(path, index=False)
+        
+        assert DataService(str(path), knn_graph_path=graph_path).knn_neighbors is None
+    
+    def test_ingested_tracks_fall_back_to_search(self, graph_path, catalog_path, valid_track_features):
+        """Test tracks added after the build are answered by a live search"""
+        service = DataService(str(catalog_path), knn_graph_path=graph_path)
+        service.ingest_tracks(new_tracks(valid_track_features, 2))
+        
+        similar = service.similar_to_track('new:0', 5)
+        
+        assert similar[0]['track_name'] == 'Release 1'
+        with pytest.raises(KeyError):
+            service.similar_to_track('missing', 5)
+
+    
+    def test_graph_lookup_includes_ingested_tracks(self, graph_path, catalog_path):
+        """Test neighbour lists of graph-covered tracks include tracks ingested since the build"""
+        service = DataService(str(catalog_path), knn_graph_path=graph_path)
+        track_id = service.track_ids[42]
+        features = dict(zip(service.feature_columns, service.feature_matrix[42]))
+        service.ingest_tracks([dict(features, track_id='new:twin', track_name='Twin', artists='New Artist')])
+        
+        similar = service.similar_to_track(track_id, 5)
+        
+        assert similar[0]['track_name'] == 'Twin'
+        assert similar[0]['similarity_score'] == pytest.approx(1.0)
+        assert len(similar) == 5
+
+class TestTrackSearch:
+    """Test the prefix and trigram search indexes"""
+    
+    @pytest.fixture
+    def index(self):
+        index = TrackSearchIndex()
+        index.add(['Blinding Lights', 'Blue Monday', 'Señorita', 'Lights Out'],
+                  ['The Weeknd', 'New Order', 'Shawn Mendes;Camila Cabello', 'Blue Band'])
+        return index
+    
+    def test_normalize(self):
+        """Test case, accents and punctuation are folded"""
+        assert normalize('  Señorita (Remix)!') == 'senorita remix'
+    
+    def test_prefix_ranks_before_word_and_fuzzy(self, index):
+        """Test whole-name prefixes rank before later-word prefixes"""
+        results = index.search('blu', 10)
+        
+        assert {row for row, _, _ in results[:2]} == {1, 3}
+        assert [kind for _, kind, _ in results[:2]] == ['prefix', 'prefix']
+        assert (0, 'word') not in [(row, kind) for row, kind, _ in results]
+    
+    def test_exact_artist_and_accents(self, index):
+        """Test each artist of a track and accent-free queries match"""
+        assert index.search('camila cabello', 1)[0][:2] == (2, 'exact')
+        assert index.search('senor', 1)[0][:2] == (2, 'prefix')
+        assert index.search('lights', 5)[0][:2] == (3, 'prefix')
+        assert (0, 'word') in [(row, kind) for row, kind, _ in index.search('lights', 5)]
+    
+    def test_fuzzy_matches_misspellings(self, index):
+        """Test a misspelled query finds the track through trigrams"""
+        results = index.search('Blindng Lihgts', 3)
+        
+        assert results[0][0] == 0 and results[0][1] == 'fuzzy'
+        assert index.search('zzzz', 3) == []
+    
+    def test_catalog_search_with_ingestion(self, catalog_path, valid_track_features):
+        """Test DataService search includes ingested tracks and returns features"""
+        service = DataService(str(catalog_path))
+        service.ingest_tracks(new_tracks(valid_track_features, 2, prefix='fresh'))
+        
+        results = service.search_tracks('Release 1')
+        
+        assert results[0]['track_id'] == 'fresh:1' and results[0]['match'] == 'exact'
+        assert results[0]['features']['energy'] == pytest.approx(valid_track_features['energy'] - 0.01)
+        assert service.search_tracks('New Artist', 5)[0]['artist'] == 'New Artist'
+
+
+class TestStreamingEDA:
+    """Test the mergeable EDA accumulators"""
+    
+    @pytest.fixture(scope="class")
+    def dataset(self):
+        df = pd.read_csv(DATASET_PATH)
+        return df.fillna(df.median(numeric_only=True))
+    
+    @pytest.fixture(scope="class")
+    def feature_columns(self):
+        return DataService(DATASET_PATH).feature_columns
+    
+    def accumulate(self, df, feature_columns, chunk_rows):
+        accumulator = EDAAccumulator(feature_columns)
+        for start in range(0, len(df), chunk_rows):
+            chunk = df.iloc[start:start + chunk_rows]
+            accumulator.update(chunk[feature_columns].to_numpy(), chunk['popularity'].to_numpy(dtype=float))
+        return accumulator
+    
+    def test_moments_match_pandas(self, dataset, feature_columns):
+        """Test means, deviations, extremes and correlations are exact"""
+        result = self.accumulate(dataset, feature_columns, 700).result()
+        
+        stats = result['summary_statistics']
+        for col in feature_columns:
+            assert stats[col]['mean'] == pytest.approx(dataset[col].mean())
+            assert stats[col]['std'] == pytest.approx(dataset[col].std())
+            assert stats[col]['min'] == dataset[col].min()
+            assert stats[col]['max'] == dataset[col].max()
+        np.testing.assert_allclose(result['correlations']['matrix'], dataset[feature_columns].corr().to_numpy(), atol=1e-9)
+    
+    def test_quartiles_within_rank_error(self, dataset, feature_columns):
+        """Test sketch quartiles land within 2% rank of the exact ones"""
+        stats = self.accumulate(dataset, feature_columns, 500).summary_statistics()
+        
+        for col in ['tempo', 'energy', 'loudness', 'duration_ms']:
+            for q in (0.25, 0.50, 0.75):
+                rank = (dataset[col] <= stats[col][f'q{int(q * 100)}']).mean()
+                assert abs(rank - q) < 0.02
+    
+    def test_histograms_and_hit_miss(self, dataset, feature_columns):
+        """Test histogram edges are exact, counts close and hit/miss counts exact"""
+        result = self.accumulate(dataset, feature_columns, 1000).result()
+        
+        for col in feature_columns:
+            counts, edges = np.histogram(dataset[col], bins=20)
+            distribution = result['feature_distributions'][col]
+            np.testing.assert_allclose(distribution['bins'], edges)
+            assert distribution['counts'].sum() == len(dataset)
+            assert np.abs(distribution['counts'] - counts).sum() <= 0.005 * len(dataset)
+        hits = int((dataset['popularity'] >= dataset['popularity'].quantile(0.70)).sum())
+        assert result['hit_miss_distribution'] == {'hit': hits, 'miss': len(dataset) - hits}
+    
+    def test_merge_matches_single_pass(self, dataset, feature_columns):
+        """Test merging per-chunk accumulators equals one accumulator"""
+        single = self.accumulate(dataset, feature_columns, len(dataset))
+        halves = len(dataset) // 3
+        merged = self.accumulate(dataset.iloc[:halves], feature_columns, 1000)
+        merged.merge(self.accumulate(dataset.iloc[halves:], feature_columns, 1000))
+        
+        assert merged.count == single.count
+        np.testing.assert_allclose(merged.mean, single.mean)
+        np.testing.assert_allclose(merged.comoment, single.comoment, rtol=1e-9)
+        np.testing.assert_array_equal(merged.fine_counts, single.fine_counts)
+        assert merged.hit_miss_distribution() == single.hit_miss_distribution()
+    
+    def test_out_of_range_values_counted(self):
+        """Test values outside the histogram domain are not lost"""
+        accumulator = EDAAccumulator(['energy'])
+        accumulator.update(np.array([[0.1], [0.5], [1.5], [np.nan]]))
+        
+        distribution = accumulator.histograms(bins=4)['energy']
+        assert accumulator.count == 3
+        assert distribution['counts'].tolist() == [1, 1, 0, 1]
+    
+    def test_out_of_range_values_use_bounded_memory(self):
+        """Test a feature far outside its domain is sketched, not kept value by value"""
+        rng = np.random.default_rng(0)
+        tempo = rng.uniform(300, 400, 200000)
+        accumulator = EDAAccumulator(['tempo'], sketch_k=64)
+        for chunk in np.array_split(tempo, 20):
+            accumulator.update(chunk[:, None])
+        
+        held = sum(len(level) for level in accumulator.outliers[0].levels)
+        distribution = accumulator.histograms(bins=10)['tempo']
+        counts, _ = np.histogram(tempo, bins=10)
+        assert held < 1000
+        assert distribution['counts'].sum() == len(tempo)
+        assert np.abs(distribution['counts'] - counts).max() <= 0.05 * len(tempo)
+    
+    def test_sketch_merge(self):
+        """Test a merged sketch estimates the median of the union"""
+        rng = np.random.default_rng(0)
+        first, second = KLLSketch(k=64, seed=1), KLLSketch(k=64, seed=2)
+        first.update(rng.uniform(0, 1, 20000))
+        second.update(rng.uniform(1, 2, 20000))
+        first.merge(second)
+        
+        assert len(first) == 40000
+        assert abs(first.quantiles([0.5])[0] - 1.0) < 0.05
+    
+    def test_file_pass_in_processes(self, dataset, feature_columns):
+        """Test the chunked file pass with worker processes matches the in-memory one"""
+        result = compute_eda_file(DATASET_PATH, feature_columns, chunksize=1500, processes=2)
+        service_result = DataService(DATASET_PATH).get_eda_data()
+        
+        for col in feature_columns:
+            expected = service_result['summary_statistics'][col]
+            assert result['summary_statistics'][col]['mean'] == pytest.approx(expected['mean'])
+        assert result['hit_miss_distribution'] == service_result['hit_miss_distribution']
+    
+    def test_service_statistics_are_exact(self, catalog_path, valid_track_features, feature_columns):
+        """Test the in-memory catalog serves exact histograms and quartiles, also after ingestion"""
+        service = DataService(str(catalog_path))
+        service.get_eda_data()
+        service.ingest_tracks(new_tracks(valid_track_features, 5))
+        
+        result = service.get_eda_data()
+        for i, col in enumerate(feature_columns):
+            values = service.feature_matrix[:, i]
+            counts, edges = np.histogram(values, bins=20)
+            np.testing.assert_array_equal(result['feature_distributions'][col]['counts'], counts)
+            np.testing.assert_allclose(result['feature_distributions'][col]['bins'], edges)
+            stats = result['summary_statistics'][col]
+            np.testing.assert_allclose([stats['q25'], stats['q50'], stats['q75']],
+                                       np.quantile(values, [0.25, 0.50, 0.75]))
+    
+    def test_ingest_updates_statistics(self, catalog_path, valid_track_features):
+        """Test ingestion folds new tracks into the existing accumulator"""
+        service = DataService(str(catalog_path))
+        before = service.get_feature_statistics()['tempo']
+        
+        service.ingest_tracks([dict(track, tempo=400.0) for track in new_tracks(valid_track_features, 2)])
+        after = service.get_feature_statistics()['tempo']
+        
+        assert after['max'] == 400.0 and after['mean'] > before['mean']
+        assert service._eda_accumulator.count == service.n_tracks
+    
+    def test_sorted_columns_follow_ingestion(self, catalog_path, valid_track_features):
+        """Test histograms and quantiles from the sorted columns include ingested tracks"""
+        service = DataService(str(catalog_path))
+        service.feature_histogram('tempo')
+        
+        service.ingest_tracks([dict(track, tempo=400.0) for track in new_tracks(valid_track_features, 3)])
+        
+        tempo = service.feature_matrix[:, service.feature_columns.index('tempo')]
+        counts, edges = np.histogram(tempo, bins=50)
+        histogram = service.feature_histogram('tempo', bins=50)
+        np.testing.assert_array_equal(histogram['counts'], counts)
+        np.testing.assert_allclose(histogram['bins'], edges)
+        np.testing.assert_allclose(service.feature_quantiles('tempo', [0.1, 0.5, 0.999]),
+                                   np.quantile(tempo, [0.1, 0.5, 0.999]))
+
+
+class TestSampleDatasetGenerator:
+    """Test the chunked, seeded synthetic catalog generator"""
+    
+    def test_vectorized_ids(self):
+        """Test identifiers match the formatted strings they replace"""
+        from generate_sample_dataset import format_ids
+        
+        numbers = np.array([0, 7, 255, 123456])
+        assert list(format_ids('Track_', numbers, 6)) == [f'Track_{i:06d}' for i in numbers]
+        assert list(format_ids('spotify:track:', numbers, 16, base=16)) == [
+            f'spotify:track:{i:016x}' for i in numbers
+        ]
+    
+    def test_output_independent_of_processes(self, tmp_path):
+        """Test chunks written by worker processes equal the inline output"""
+        from generate_sample_dataset import generate_sample_dataset
+        
+        inline, parallel = tmp_path / 'inline.csv', tmp_path / 'parallel.csv'
+        summary = generate_sample_dataset(2500, str(inline), chunk_rows=1000, verbose=False)
+        generate_sample_dataset(2500, str(parallel), chunk_rows=1000, processes=2, verbose=False)
+        
+        assert summary['chunks'] == 3
+        assert inline.read_bytes() == parallel.read_bytes()
+        df = pd.read_csv(inline)
+        assert len(df) == 2500 and df['track_id'].is_unique
+        assert df['track_name'].iloc[-1] == 'Track_2499'
+        assert DataService(str(inline)).n_tracks == 2500
+    
+    def test_genres_and_duplicates(self, tmp_path):
+        """Test duplicate tracks repeat an original's features under another genre"""
+        from generate_sample_dataset import GENRES, generate_sample_dataset
+        
+        path = tmp_path / 'catalog.csv'
+        generate_sample_dataset(3000, str(path), chunk_rows=1000, genres=True,
+                                duplicate_fraction=0.2, verbose=False)
+        df = pd.read_csv(path)
+        
+        assert set(df['track_genre']) <= set(GENRES)
+        repeated = df[df['track_id'].duplicated(keep=False)]
+        assert 0.1 < df['track_id'].duplicated().mean() < 0.3
+        for _, group in repeated.groupby('track_id'):
+            assert len(group.drop(columns='track_genre').drop_duplicates()) == 1
+            assert group['track_genre'].iloc[0] != group['track_genre'].iloc[1]
+
+
+class TestAdmissionControl:
+    """Test the per-endpoint concurrency and queue limits"""
+    
+    def test_parse_limits(self):
+        """Test view=max_concurrent:max_queue entries are parsed"""
+        from app.admission import parse_limits
+        
+        assert parse_limits('predict=16:64, similar_tracks_batch=2') == {
+            'predict': (16, 64), 'similar_tracks_batch': (2, 0)
+        }
+        with pytest.raises(ValueError):
+            parse_limits('predict=many')
+    
+    def test_queued_request_admitted_when_slot_frees(self):
+        """Test a queued request gets the slot released by a finished one"""
+        from app.admission import EndpointLimiter
+        
+        limiter = EndpointLimiter('test_queue', max_concurrent=1, max_queue=1)
+        assert limiter.acquire(0)
+        results = []
+        waiter = threading.Thread(target=lambda: results.append(limiter.acquire(5)))
+        waiter.start()
+        while limiter.waiting == 0:
+            time.sleep(0.001)
+        
+        # The queue is full, so a third request is shed at once
+        start = time.perf_counter()
+        assert not limiter.acquire(5)
+        assert time.perf_counter() - start < 0.5
+        
+        limiter.release(0.5)
+        waiter.join()
+        assert results == [True]
+        assert limiter.active == 1 and limiter.waiting == 0
+    
+    def test_queue_timeout_and_retry_after(self):
+        """Test a request waiting past the timeout is shed with a backlog-based Retry-After"""
+        from app.admission import EndpointLimiter
+        
+        limiter = EndpointLimiter('test_timeout', max_concurrent=2, max_queue=4)
+        assert limiter.acquire(0) and limiter.acquire(0)
+        limiter.release(3.0)
+        assert limiter.acquire(0)
+        
+        assert not limiter.acquire(0.05)
+        # Two requests of about 3 s each on two slots
+        assert limiter.retry_after() == 3
+        assert metrics.snapshot()['admission_test_timeout_rejected_total'] == 1
+
+
+class TestBulkScoring:
+    """Test streaming catalog scoring"""
+    
+    @pytest.fixture(scope="class")
+    def model_service(self):
+        return ModelService(MODEL_PATH, SCALER_PATH, GENRE_ENCODER_PATH)
+    
+    @pytest.fixture
+    def catalog(self, tmp_path):
+        """First 1200 dataset rows, with one row missing a feature"""
+        df = pd.read_csv(DATASET_PATH).head(1200)
+        df.loc[5, 'energy'] = np.nan
+        path = tmp_path / 'catalog.csv'
+        df.to_csv(path, index=False)
+        return path, df
+    
+    def test_scores_match_model_service(self, model_service, catalog, tmp_path):
+        """Test chunked scoring writes the same probabilities as ModelService"""
+        path, df = catalog
+        output = tmp_path / 'scores.csv'
+        
+        summary = score_file(str(path), str(output), model_service, chunksize=250)
+        
+        result = pd.read_csv(output)
+        assert summary['rows'] == 1200 and summary['scored'] == 1199 and summary['skipped'] == 1
+        assert result['track_id'].tolist() == df['track_id'].tolist()
+        assert pd.isna(result.loc[5, 'prediction']) and np.isnan(result.loc[5, 'probability_hit'])
+        
+        complete = df.drop(index=5)
+        expected = model_service.predict_proba_matrix(complete[model_service.base_features].to_numpy(dtype=float))
+        np.testing.assert_allclose(result.drop(index=5)['probability_hit'], expected[:, 1], rtol=1e-6)
+        assert (result['model_version'] == model_service.version).all()
+        assert summary['hits'] == int((result['prediction'] == 'hit').sum())
+    
+    def test_score_matrix_skips_incomplete_rows(self, model_service, catalog):
+        """Test raw rows with a missing feature get NaN and the rest match predict_proba_matrix"""
+        _, df = catalog
+        base = df[model_service.base_features].head(10).to_numpy(dtype=float)
+        
+        probabilities = model_service.score_matrix(base)
+        
+        assert np.isnan(probabilities[5]).all()
+        complete = np.delete(np.arange(10), 5)
+        np.testing.assert_allclose(probabilities[complete], model_service.predict_proba_matrix(base[complete]))
+        with pytest.raises(ValueError, match='tier'):
+            model_service.score_matrix(base, tier='fast')
+    
+    def test_processes_write_same_output(self, model_service, catalog, tmp_path):
+        """Test scoring across worker processes keeps rows in input order"""
+        path, _ = catalog
+        score_file(str(path), str(tmp_path / 'inline.csv'), model_service, chunksize=200)
+        score_file(str(path), str(tmp_path / 'parallel.csv'), model_service, chunksize=200, processes=2)
+        
+        assert (tmp_path / 'inline.csv').read_text() == (tmp_path / 'parallel.csv').read_text()
+    
+    def test_missing_column_leaves_no_output(self, model_service, tmp_path):
+        """Test an input without a feature column fails without writing a file"""
+        path = tmp_path / 'catalog.csv'
+        pd.read_csv(DATASET_PATH).head(10).drop(columns=['tempo']).to_csv(path, index=False)
+        
+        with pytest.raises(ValueError):
+            score_file(str(path), str(tmp_path / 'scores.csv'), model_service)
+        assert not (tmp_path / 'scores.csv').exists()
+        assert not (tmp_path / 'scores.csv.partial').exists()
+    
+    def test_parquet_round_trip(self, model_service, catalog, tmp_path):
+        """Test Parquet input and output (needs pyarrow)"""
+        pytest.importorskip('pyarrow')
+        path, df = catalog
+        df.to_parquet(tmp_path / 'catalog.parquet')
+        
+        summary = score_file(str(tmp_path / 'catalog.parquet'), str(tmp_path / 'scores.parquet'),
+                             model_service, chunksize=500)
+        
+        assert summary['scored'] == 1199
+        assert len(pd.read_parquet(tmp_path / 'scores.parquet')) == 1200
+
+
+class TestModelVersioning:
+    """Tests for model versions, validation and the artifact watcher"""
+    
+    def test_version_is_content_hash(self):
+        """Test two services loaded from the same artifacts share a version"""
+        first = ModelService(MODEL_PATH, SCALER_PATH, GENRE_ENCODER_PATH)
+        second = ModelService(MODEL_PATH, SCALER_PATH, GENRE_ENCODER_PATH)
+        
+        assert first.version == second.version
+        assert len(first.version) == 12
+        first.validate()
+    
+    def test_watcher_reports_stable_change(self, tmp_path):
+        """Test the watcher fires once after a file changes and settles"""
+        from app.model_reloader import ModelWatcher
+        
+        artifact = tmp_path / 'model.pkl'
+        artifact.write_bytes(b'v1')
+        changed = threading.Event()
+        watcher = ModelWatcher([str(artifact)], changed.set, interval=0.05).start()
+        try:
+            artifact.write_bytes(b'version 2')
+            assert changed.wait(timeout=5)
+        finally:
+            watcher.stop()
+    
+    def test_watcher_ignores_absent_optional_artifact(self, tmp_path):
+        """Test a missing optional fast-tier model does not hold off reloads"""
+        from app.model_reloader import ModelWatcher
+        
+        artifact = tmp_path / 'model.pkl'
+        artifact.write_bytes(b'v1')
+        fast_artifact = tmp_path / 'model_fast.pkl'
+        calls = []
+        changed = threading.Event()
+        
+        def on_change():
+            calls.append(1)
+            changed.set()
+        
+        watcher = ModelWatcher([str(artifact)], on_change, interval=0.05,
+                               optional_paths=[str(fast_artifact)]).start()
+        try:
+            artifact.write_bytes(b'version 2')
+            assert changed.wait(timeout=5)
+            time.sleep(0.3)
+            assert len(calls) == 1
+            
+            # The fast model appearing later is a change too
+            changed.clear()
+            fast_artifact.write_bytes(b'fast')
+            assert changed.wait(timeout=5)
+        finally:
+            watcher.stop()
+    
+    def test_watched_paths_split_optional_fast_model(self):
+        """Test the fast-tier model is only watched as an optional artifact"""
+        from app.routes import FAST_MODEL_PATH, model_artifact_paths
+        
+        required, optional = model_artifact_paths()
+        assert FAST_MODEL_PATH not in required and optional == [FAST_MODEL_PATH]
+
+
+class TestShadowScoring:
+    """Tests for background comparison against a shadow model"""
+    
+    def test_identical_shadow_agrees(self, valid_track_features):
+        """Test a shadow loaded from the primary artifacts always agrees"""
+        scorer = ShadowScorer(ModelService(MODEL_PATH, SCALER_PATH, GENRE_ENCODER_PATH))
+        service = ModelService(MODEL_PATH, SCALER_PATH, GENRE_ENCODER_PATH, shadow=scorer)
+        scored = metrics.counter('shadow_scored_total').snapshot()
+        agreements = metrics.counter('shadow_agreements_total').snapshot()
+        
+        service.predict_batch([valid_track_features] * 3)
+        service.predict(valid_track_features)
+        scorer.close()
+        
+        assert metrics.counter('shadow_scored_total').snapshot() - scored == 4
+        assert metrics.counter('shadow_agreements_total').snapshot() - agreements == 4
+        assert metrics.histogram('shadow_probability_delta').snapshot()['max'] < 1e-6
+    
+    def test_full_queue_drops_without_blocking(self, valid_track_features):
+        """Test a slow shadow model never delays the primary prediction"""
+        class SlowService:
+            version = 'slow'
+            release = threading.Event()
+            
+            def predict_proba_matrix(self, base):
+                self.release.wait(timeout=5)
+                return np.tile([0.5, 0.5], (len(base), 1))
+        
+        slow = SlowService()
+        scorer = ShadowScorer(slow, queue_size=1, max_batch_size=1)
+        service = ModelService(MODEL_PATH, SCALER_PATH, GENRE_ENCODER_PATH, shadow=scorer)
+        dropped = metrics.counter('shadow_dropped_total').snapshot()
+        
+        start = time.perf_counter()
+        for _ in range(5):
+            service.predict(valid_track_features)
+        elapsed = time.perf_counter() - start
+        slow.release.set()
+        scorer.close()
+        
+        assert elapsed < 2
+        assert metrics.counter('shadow_dropped_total').snapshot() - dropped >= 3
+
+
+class TestImportBudget:
+    """Tests for the startup import budget"""
+    
+    def test_startup_skips_heavy_imports(self):
+        """Test app startup does not import pandas, scikit-learn or xgboost"""
+        from benchmarks.check_import_time import check_import_budget
+        
+        # The time budget is enforced by the script; only heavy imports are checked here
+        _, imports, problems = check_import_budget(budget_ms=float('inf'))
+        
+        assert problems == []
+        assert 'app.routes' in [name for name, _, _, _ in imports]
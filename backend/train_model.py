@@ -11,8 +11,13 @@ from sklearn.linear_model import LogisticRegression
 from sklearn.svm import SVC
 from xgboost import XGBClassifier
 from sklearn.metrics import accuracy_score, precision_score, recall_score, f1_score, classification_report
+import argparse
 import joblib
+import json
 import os
+import time
+
+from app.artifacts import save_bundle
 
 # Feature columns to use for training
 FEATURE_COLUMNS = [
@@ -127,19 +132,22 @@ def create_target_variable(df: pd.DataFrame) -> pd.Series:
     
     return target
 
-def train_model(X_train, y_train, model_type='xgboost'):
+def train_model(X_train, y_train, model_type='xgboost', n_jobs=-1, verbose=True):
     """
     Train classification model with optimized hyperparameters
     
     Args:
         X_train: Training features
         y_train: Training target
-        model_type: Type of model ('random_forest', 'xgboost', 'ensemble')
+        model_type: Type of model ('random_forest', 'gradient_boosting', 'xgboost', 'ensemble')
+        n_jobs: Threads for training (-1 uses every core)
+        verbose: Whether to print progress
         
     Returns:
         Trained model
     """
-    print(f"\nTraining {model_type} model...")
+    if verbose:
+        print(f"\nTraining {model_type} model...")
     
     if model_type == 'random_forest':
         model = RandomForestClassifier(
@@ -150,7 +158,7 @@ def train_model(X_train, y_train, model_type='xgboost'):
             max_features='sqrt',
             class_weight='balanced',
             random_state=42,
-            n_jobs=-1
+            n_jobs=n_jobs
         )
     elif model_type == 'gradient_boosting':
         model = GradientBoostingClassifier(
@@ -176,17 +184,21 @@ def train_model(X_train, y_train, model_type='xgboost'):
             reg_lambda=1.0,
             scale_pos_weight=scale_pos_weight,
             random_state=42,
-            n_jobs=-1,
+            n_jobs=n_jobs,
             eval_metric='logloss'
         )
     elif model_type == 'ensemble':
-        # Ensemble of multiple models
+        # Ensemble of multiple models, fitted side by side, so each member
+        # gets a share of the thread budget
+        voting_jobs = n_jobs if n_jobs < 0 else min(3, n_jobs)
+        member_jobs = n_jobs if n_jobs < 0 else max(1, n_jobs // 3)
+        
         rf = RandomForestClassifier(
             n_estimators=200,
             max_depth=20,
             class_weight='balanced',
             random_state=42,
-            n_jobs=-1
+            n_jobs=member_jobs
         )
         
         scale_pos_weight = (y_train == 0).sum() / (y_train == 1).sum()
@@ -196,7 +208,7 @@ def train_model(X_train, y_train, model_type='xgboost'):
             learning_rate=0.05,
             scale_pos_weight=scale_pos_weight,
             random_state=42,
-            n_jobs=-1,
+            n_jobs=member_jobs,
             eval_metric='logloss'
         )
         
@@ -210,13 +222,14 @@ def train_model(X_train, y_train, model_type='xgboost'):
         model = VotingClassifier(
             estimators=[('rf', rf), ('xgb', xgb), ('gb', gb)],
             voting='soft',
-            n_jobs=-1
+            n_jobs=voting_jobs
         )
     else:
         raise ValueError(f"Unknown model type: {model_type}")
     
     model.fit(X_train, y_train)
-    print("Model training complete!")
+    if verbose:
+        print("Model training complete!")
     
     return model
 
@@ -254,7 +267,294 @@ def evaluate_model(model, X_test, y_test) -> dict:
     
     return metrics
 
-def save_model(model, scaler, path: str, genre_encoder=None):
+# Model types compared by the model zoo, slowest first so long fits start early
+ZOO_MODEL_TYPES = ['ensemble', 'gradient_boosting', 'random_forest', 'xgboost']
+
+# Prepared features and target of a model-zoo worker process (views over shared memory)
+_zoo_data = None
+
+def split_cpu_budget(n_tasks, cpus=None):
+    """
+    Split the cores between parallel fits and threads per fit
+    
+    Every task gets its own process while there are cores to spare; the
+    remaining cores become threads inside each fit.
+    
+    Args:
+        n_tasks: Number of independent fits
+        cpus: Cores available (defaults to all of them)
+        
+    Returns:
+        Tuple of (processes, n_jobs)
+    """
+    cpus = cpus or os.cpu_count() or 1
+    processes = max(1, min(n_tasks, cpus))
+    return processes, max(1, cpus // processes)
+
+def _init_zoo_worker(shm_name, shape, n_folds, random_state):
+    """Attach a worker to the shared feature matrix and compute the fold split"""
+    from multiprocessing import shared_memory
+    
+    shm = shared_memory.SharedMemory(name=shm_name)
+    X = np.ndarray(shape, dtype=np.float64, buffer=shm.buf)
+    y = np.ndarray(shape[0], dtype=np.int8, buffer=shm.buf, offset=X.nbytes)
+    _set_zoo_data(X, y, n_folds, random_state, shm)
+
+def _set_zoo_data(X, y, n_folds, random_state, shm=None):
+    global _zoo_data
+    from sklearn.model_selection import StratifiedKFold
+    
+    # Every process derives the same folds from the shared target
+    splitter = StratifiedKFold(n_splits=n_folds, shuffle=True, random_state=random_state)
+    _zoo_data = {'X': X, 'y': y, 'folds': list(splitter.split(X, y)), 'shm': shm}
+
+def _zoo_fold(args):
+    """Train and evaluate one model type on one fold"""
+    model_type, fold, n_jobs = args
+    X, y = _zoo_data['X'], _zoo_data['y']
+    train_index, test_index = _zoo_data['folds'][fold]
+    started = time.time()
+    
+    # The scaler is fitted on the training part of the fold only
+    scaler = StandardScaler()
+    X_train = scaler.fit_transform(X[train_index])
+    X_test = scaler.transform(X[test_index])
+    
+    start = time.perf_counter()
+    model = train_model(X_train, y[train_index], model_type=model_type, n_jobs=n_jobs, verbose=False)
+    fit_seconds = time.perf_counter() - start
+    y_pred = model.predict(X_test)
+    y_test = y[test_index]
+    
+    return {
+        'model_type': model_type,
+        'fold': fold,
+        'accuracy': float(accuracy_score(y_test, y_pred)),
+        'precision': float(precision_score(y_test, y_pred, zero_division=0)),
+        'recall': float(recall_score(y_test, y_pred, zero_division=0)),
+        'f1': float(f1_score(y_test, y_pred, zero_division=0)),
+        'fit_seconds': fit_seconds,
+        'started': started,
+        'finished': time.time()
+    }
+
+def run_model_zoo(X, y, model_types=ZOO_MODEL_TYPES, n_folds=5, processes=None, random_state=42):
+    """
+    Compare model types with stratified k-fold cross-validation
+    
+    Every (model type, fold) pair is an independent fit. Fits run in parallel
+    worker processes that share one copy of the prepared feature matrix through
+    shared memory, and the cores left over are given to each fit as threads.
+    
+    Args:
+        X: Prepared features (DataFrame or array)
+        y: Binary target
+        model_types: Model types to compare (see train_model)
+        n_folds: Number of cross-validation folds
+        processes: Worker processes (defaults to one per core, at most one per
+            fit; 1 trains in this process)
+        random_state: Seed for the fold split
+        
+    Returns:
+        Report with one entry per model type, best mean accuracy first, with
+        per-fold metrics, mean and standard deviation of each metric, total fit
+        seconds and wall-clock seconds from the first fold starting to the last
+        one finishing
+    """
+    X = np.ascontiguousarray(X, dtype=np.float64)
+    y = np.asarray(y, dtype=np.int8)
+    n_tasks = len(model_types) * n_folds
+    cpus = os.cpu_count() or 1
+    if processes is None:
+        processes, n_jobs = split_cpu_budget(n_tasks, cpus)
+    else:
+        processes = max(1, min(processes, n_tasks))
+        n_jobs = max(1, cpus // processes)
+    tasks = [(model_type, fold, n_jobs) for model_type in model_types for fold in range(n_folds)]
+    
+    start = time.perf_counter()
+    if processes == 1:
+        _set_zoo_data(X, y, n_folds, random_state)
+        results = [_zoo_fold(task) for task in tasks]
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+        from multiprocessing import shared_memory
+        import multiprocessing
+        
+        shm = shared_memory.SharedMemory(create=True, size=X.nbytes + y.nbytes)
+        try:
+            shared_X = np.ndarray(X.shape, dtype=np.float64, buffer=shm.buf)
+            shared_X[:] = X
+            np.ndarray(y.shape, dtype=np.int8, buffer=shm.buf, offset=X.nbytes)[:] = y
+            del shared_X
+            
+            context = multiprocessing.get_context('spawn')
+            with ProcessPoolExecutor(processes, mp_context=context, initializer=_init_zoo_worker,
+                                     initargs=(shm.name, X.shape, n_folds, random_state)) as executor:
+                results = list(executor.map(_zoo_fold, tasks))
+        finally:
+            shm.close()
+            shm.unlink()
+    
+    report = []
+    for model_type in model_types:
+        folds = [result for result in results if result['model_type'] == model_type]
+        entry = {'model_type': model_type}
+        for metric in ('accuracy', 'precision', 'recall', 'f1'):
+            values = [fold[metric] for fold in folds]
+            entry[metric] = float(np.mean(values))
+            entry[f'{metric}_std'] = float(np.std(values))
+        entry['fit_seconds'] = float(sum(fold['fit_seconds'] for fold in folds))
+        entry['wall_seconds'] = max(fold['finished'] for fold in folds) - min(fold['started'] for fold in folds)
+        entry['folds'] = [{key: value for key, value in fold.items() if key not in ('model_type', 'started', 'finished')}
+                          for fold in folds]
+        report.append(entry)
+    report.sort(key=lambda entry: -entry['accuracy'])
+    
+    return {
+        'n_folds': n_folds,
+        'processes': processes,
+        'n_jobs': n_jobs,
+        'total_seconds': time.perf_counter() - start,
+        'models': report
+    }
+
+def print_zoo_report(report):
+    """Print the model zoo ranking as a table"""
+    print(f"\n{report['n_folds']}-fold cross-validation with {report['processes']} process(es) "
+          f"x {report['n_jobs']} thread(s), {report['total_seconds']:.1f}s in total")
+    print(f"\n{'Rank':<6}{'Model':<20}{'Accuracy':>16}{'F1':>16}{'Fit s':>10}{'Wall s':>10}")
+    for rank, entry in enumerate(report['models'], 1):
+        accuracy = f"{entry['accuracy']:.4f}±{entry['accuracy_std']:.4f}"
+        f1 = f"{entry['f1']:.4f}±{entry['f1_std']:.4f}"
+        print(f"{rank:<6}{entry['model_type']:<20}{accuracy:>16}{f1:>16}"
+              f"{entry['fit_seconds']:>10.1f}{entry['wall_seconds']:>10.1f}")
+
+# Student configurations tried for the fast tier: (max_depth, n_estimators)
+DISTILL_CONFIGS = [(2, 50), (3, 100), (4, 100), (4, 200), (6, 200)]
+
+def distill_model(teacher, X_train, max_depth=4, n_estimators=100):
+    """
+    Train a shallow XGBoost model on the teacher's soft probabilities
+    
+    Every training row is used once per class, weighted by the teacher's
+    probability for that class, so the student fits the soft labels rather
+    than the hard targets.
+    
+    Args:
+        teacher: Trained full-size model
+        X_train: Scaled training features
+        max_depth: Tree depth of the student
+        n_estimators: Number of trees in the student
+        
+    Returns:
+        Trained student model
+    """
+    soft_labels = teacher.predict_proba(X_train)[:, 1]
+    n_rows = len(soft_labels)
+    
+    X_soft = np.vstack([X_train, X_train])
+    y_soft = np.concatenate([np.ones(n_rows, dtype=int), np.zeros(n_rows, dtype=int)])
+    weights = np.concatenate([soft_labels, 1 - soft_labels])
+    
+    student = XGBClassifier(
+        n_estimators=n_estimators,
+        max_depth=max_depth,
+        learning_rate=0.1,
+        subsample=0.9,
+        colsample_bytree=0.9,
+        random_state=42,
+        n_jobs=-1,
+        eval_metric='logloss'
+    )
+    student.fit(X_soft, y_soft, sample_weight=weights)
+    return student
+
+def measure_latency(model, X, batch_size=1, repeats=50) -> float:
+    """
+    Median wall time of one predict_proba call in milliseconds
+    
+    Args:
+        model: Trained model
+        X: Feature rows to predict (the first batch_size rows are used)
+        batch_size: Rows per call
+        repeats: Number of timed calls
+    """
+    batch = X[:batch_size]
+    model.predict_proba(batch)
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        model.predict_proba(batch)
+        timings.append((time.perf_counter() - start) * 1000)
+    return float(np.median(timings))
+
+def build_fast_tier(teacher, X_train, X_test, y_test, configs=DISTILL_CONFIGS,
+                    max_accuracy_drop=0.01):
+    """
+    Distill fast-tier candidates and report the accuracy-vs-latency frontier
+    
+    The selected fast tier is the quickest student whose test accuracy is
+    within max_accuracy_drop of the teacher (or the most accurate student if
+    none is).
+    
+    Args:
+        teacher: Trained full-size model
+        X_train: Scaled training features
+        X_test: Scaled test features
+        y_test: Test target
+        configs: Student (max_depth, n_estimators) pairs to try
+        max_accuracy_drop: Largest accuracy loss accepted for the fast tier
+        
+    Returns:
+        Tuple of (fast_model, report)
+    """
+    print("\nDistilling fast-tier candidates...")
+    X_test = np.asarray(X_test)
+    teacher_pred = teacher.predict(X_test)
+    
+    def profile(name, model, max_depth, n_estimators):
+        y_pred = model.predict(X_test)
+        return {
+            'name': name,
+            'max_depth': max_depth,
+            'n_estimators': n_estimators,
+            'accuracy': float(accuracy_score(y_test, y_pred)),
+            'f1': float(f1_score(y_test, y_pred, zero_division=0)),
+            'agreement': float(np.mean(y_pred == teacher_pred)),
+            'single_ms': measure_latency(model, X_test, batch_size=1),
+            'batch_256_ms': measure_latency(model, X_test, batch_size=256, repeats=10)
+        }
+    
+    params = teacher.get_params()
+    frontier = [profile('full', teacher, params.get('max_depth'), params.get('n_estimators'))]
+    students = {}
+    for max_depth, n_estimators in configs:
+        name = f'depth{max_depth}_trees{n_estimators}'
+        students[name] = distill_model(teacher, X_train, max_depth, n_estimators)
+        frontier.append(profile(name, students[name], max_depth, n_estimators))
+    
+    print(f"\n{'Model':<22}{'Accuracy':>10}{'F1':>8}{'Agree':>8}{'1 row ms':>10}{'256 rows ms':>13}")
+    for row in frontier:
+        print(f"{row['name']:<22}{row['accuracy']:>10.4f}{row['f1']:>8.4f}{row['agreement']:>8.4f}"
+              f"{row['single_ms']:>10.3f}{row['batch_256_ms']:>13.3f}")
+    
+    floor = frontier[0]['accuracy'] - max_accuracy_drop
+    candidates = [row for row in frontier[1:] if row['accuracy'] >= floor]
+    if candidates:
+        selected = min(candidates, key=lambda row: row['single_ms'])
+    else:
+        selected = max(frontier[1:], key=lambda row: row['accuracy'])
+    print(f"\nSelected fast tier: {selected['name']}")
+    
+    report = {
+        'selected': selected['name'],
+        'max_accuracy_drop': max_accuracy_drop,
+        'frontier': frontier
+    }
+    return students[selected['name']], report
+
+def save_model(model, scaler, path: str, genre_encoder=None, fast_model=None, tier_report=None):
     """
     Serialize model, scaler, and genre encoder
     
@@ -263,6 +563,8 @@ def save_model(model, scaler, path: str, genre_encoder=None):
         scaler: Fitted scaler
         path: Directory path to save files
         genre_encoder: Genre label encoder (optional)
+        fast_model: Distilled fast-tier model (optional)
+        tier_report: Accuracy-vs-latency frontier report (optional)
     """
     os.makedirs(path, exist_ok=True)
     
@@ -279,6 +581,17 @@ def save_model(model, scaler, path: str, genre_encoder=None):
         genre_path = os.path.join(path, 'genre_encoder.pkl')
         joblib.dump(genre_encoder, genre_path)
         print(f"Genre encoder saved to: {genre_path}")
+    
+    if fast_model is not None:
+        fast_path = os.path.join(path, 'model_fast.pkl')
+        joblib.dump(fast_model, fast_path)
+        print(f"Fast-tier model saved to: {fast_path}")
+    
+    if tier_report is not None:
+        report_path = os.path.join(path, 'tier_report.json')
+        with open(report_path, 'w') as f:
+            json.dump(tier_report, f, indent=2)
+        print(f"Tier report saved to: {report_path}")
 
 if __name__ == '__main__':
     # Configuration
@@ -287,6 +600,14 @@ if __name__ == '__main__':
     TEST_SIZE = 0.2
     RANDOM_STATE = 42
     
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--zoo', action='store_true',
+                        help='compare every model type with k-fold cross-validation instead of training one')
+    parser.add_argument('--folds', type=int, default=5, help='cross-validation folds for --zoo')
+    parser.add_argument('--processes', type=int, default=None,
+                        help='worker processes for --zoo (default: split the cores automatically)')
+    args = parser.parse_args()
+    
     print("=" * 60)
     print("Spotify Track Predictor - Model Training")
     print("=" * 60)
@@ -305,6 +626,21 @@ if __name__ == '__main__':
         # Load and prepare data
         df, X, y, genre_encoder = load_and_prepare_data(DATASET_PATH, add_features=True, use_genre=True)
         
+        if args.zoo:
+            print("\n" + "=" * 60)
+            print("MODEL ZOO CROSS-VALIDATION")
+            print("=" * 60)
+            zoo_report = run_model_zoo(X, y, n_folds=args.folds, processes=args.processes,
+                                       random_state=RANDOM_STATE)
+            print_zoo_report(zoo_report)
+            
+            os.makedirs(MODEL_OUTPUT_PATH, exist_ok=True)
+            report_path = os.path.join(MODEL_OUTPUT_PATH, 'zoo_report.json')
+            with open(report_path, 'w') as f:
+                json.dump(zoo_report, f, indent=2)
+            print(f"\nZoo report saved to: {report_path}")
+            exit(0)
+        
         # Split data
         print(f"\nSplitting data (test size: {TEST_SIZE})...")
         X_train, X_test, y_train, y_test = train_test_split(
@@ -328,8 +664,20 @@ if __name__ == '__main__':
         # Evaluate model
         metrics = evaluate_model(model, X_test_scaled, y_test)
         
-        # Save model, scaler, and genre encoder
-        save_model(model, scaler, MODEL_OUTPUT_PATH, genre_encoder)
+        # Distill the fast tier
+        print("\n" + "=" * 60)
+        print("DISTILLING FAST-TIER MODEL")
+        print("=" * 60)
+        fast_model, tier_report = build_fast_tier(model, X_train_scaled, X_test_scaled, y_test)
+        
+        # Save model, scaler, genre encoder and fast tier
+        save_model(model, scaler, MODEL_OUTPUT_PATH, genre_encoder,
+                   fast_model=fast_model, tier_report=tier_report)
+        
+        # Save the same artifacts as a native bundle (MODEL_PATH=models/model.ubj)
+        save_bundle(model, scaler, MODEL_OUTPUT_PATH, genre_encoder,
+                    fast_model=fast_model, feature_order=list(X.columns))
+        print(f"Native artifact bundle saved to: {MODEL_OUTPUT_PATH}/manifest.json")
         
         print("\n" + "=" * 60)
         print("Training complete!")
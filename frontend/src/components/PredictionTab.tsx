@@ -3,7 +3,7 @@ import type { TrackFeatures, PredictionResult, SimilarTrack } from '../types';
 import InputPanel from './InputPanel';
 import PredictionPanel from './PredictionPanel';
 import RecommendationPanel from './RecommendationPanel';
-import { predictTrack, getSimilarTracks } from '../services/api';
+import { predictTrackDebounced, getSimilarTracks } from '../services/api';
 
 const PredictionTab: React.FC = () => {
   const [inputData, setInputData] = useState<Partial<TrackFeatures>>({});
@@ -53,7 +53,8 @@ const PredictionTab: React.FC = () => {
     setLoading(true);
     
     try {
-      const result = await predictTrack(inputData as TrackFeatures);
+      // Rapid resubmits collapse into one request for the latest input
+      const result = await predictTrackDebounced(inputData as TrackFeatures);
       setPrediction(result);
       
       // Fetch similar tracks after successful prediction
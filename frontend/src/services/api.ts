@@ -3,14 +3,21 @@ import type { TrackFeatures, PredictionResult, SimilarTrack, EDAData } from '../
 
 const API_BASE_URL = import.meta.env.VITE_API_URL || 'http://localhost:5000/api';
 
+const REQUEST_TIMEOUT_MS = 10000; // 10 second timeout
+
 const apiClient = axios.create({
   baseURL: API_BASE_URL,
   headers: {
     'Content-Type': 'application/json',
   },
-  timeout: 10000, // 10 second timeout
+  timeout: REQUEST_TIMEOUT_MS,
 });
 
+// Lets the server stop work the client will no longer wait for. Sent only
+// with expensive calls: a custom header makes a cacheable GET need a CORS
+// preflight (the server's default deadline matches REQUEST_TIMEOUT_MS anyway)
+const DEADLINE_HEADERS = { 'X-Request-Timeout-Ms': String(REQUEST_TIMEOUT_MS) };
+
 // Retry configuration
 const MAX_RETRIES = 3;
 const RETRY_DELAY = 1000; // 1 second base delay
@@ -48,8 +55,13 @@ async function withRetry<T>(
       // Check if we should retry
       if (error instanceof AxiosError && isRetryableError(error)) {
         if (attempt < retries - 1) {
-          // Exponential backoff: 1s, 2s, 4s
-          const delayMs = RETRY_DELAY * Math.pow(2, attempt);
+          // Exponential backoff: 1s, 2s, 4s, or longer when the server
+          // asked for it with Retry-After (sent with 429 when overloaded)
+          const retryAfter = Number(error.response?.headers['retry-after']);
+          const delayMs = Math.max(
+            RETRY_DELAY * Math.pow(2, attempt),
+            Number.isFinite(retryAfter) ? retryAfter * 1000 : 0
+          );
           console.log(`Retrying in ${delayMs}ms... (attempt ${attempt + 2}/${retries})`);
           await delay(delayMs);
           continue;
@@ -92,58 +104,281 @@ const handleApiError = (error: unknown): never => {
   throw new Error('An unexpected error occurred');
 };
 
+// Order of the features in the ?f= query of GET /predict and GET /similar
+const TRACK_FEATURES: Array<keyof TrackFeatures> = [
+  'danceability', 'energy', 'key', 'loudness', 'mode', 'speechiness',
+  'acousticness', 'instrumentalness', 'liveness', 'valence', 'tempo',
+  'time_signature', 'duration_ms',
+];
+
+// Memoized answers live as long as the server lets caches keep them
+const CACHE_TTL_MS = 5 * 60 * 1000;
+const CACHE_MAX_ENTRIES = 100;
+// Memoized answers are served without asking the server for this long, then
+// revalidated with their ETag (a 304 costs the server no model or scan work)
+export const REVALIDATE_AFTER_MS = 30 * 1000;
+
+// Quiet period before an interactive prediction is sent
+export const PREDICT_DEBOUNCE_MS = 250;
+
+// Browser storage key of the last EDA payload and its ETag
+export const EDA_STORAGE_KEY = 'hitormiss:eda-data';
+
+/**
+ * Canonical ?f= value of a feature vector
+ * Numbers are written with String(), as the server expects, so equal
+ * inputs give equal URLs and share the browser's and CDN's cache entries
+ */
+export const featureQuery = (features: TrackFeatures): string =>
+  TRACK_FEATURES.map(feature => encodeURIComponent(String(features[feature]))).join(',');
+
+/**
+ * Least-recently-used cache whose entries expire after a fixed time
+ */
+export class MemoCache<T> {
+  private entries = new Map<string, { value: T; expires: number }>();
+  private maxEntries: number;
+  private ttlMs: number;
+
+  constructor(maxEntries: number = CACHE_MAX_ENTRIES, ttlMs: number = CACHE_TTL_MS) {
+    this.maxEntries = maxEntries;
+    this.ttlMs = ttlMs;
+  }
+
+  get(key: string): T | undefined {
+    const entry = this.entries.get(key);
+    if (!entry) {
+      return undefined;
+    }
+    this.entries.delete(key);
+    if (entry.expires <= Date.now()) {
+      return undefined;
+    }
+    // Re-insert so the Map's order stays least- to most-recently used
+    this.entries.set(key, entry);
+    return entry.value;
+  }
+
+  set(key: string, value: T): void {
+    this.entries.delete(key);
+    this.entries.set(key, { value, expires: Date.now() + this.ttlMs });
+    while (this.entries.size > this.maxEntries) {
+      this.entries.delete(this.entries.keys().next().value as string);
+    }
+  }
+
+  clear(): void {
+    this.entries.clear();
+  }
+}
+
+// A memoized answer, the ETag and version it was served with, and when the
+// server last confirmed it
+interface CachedAnswer<T> {
+  value: T;
+  etag?: string;
+  version?: string;
+  checkedAt: number;
+}
+
+const predictionCache = new MemoCache<CachedAnswer<PredictionResult>>();
+const similarCache = new MemoCache<CachedAnswer<SimilarTrack[]>>();
+
+// Latest model and dataset versions the server reported (X-Cache-Version);
+// answers memoized under an older version are revalidated before reuse
+type VersionKind = 'model' | 'dataset';
+const knownVersions: Record<VersionKind, string | undefined> = { model: undefined, dataset: undefined };
+
+const noteVersion = (kind: VersionKind, version: unknown): void => {
+  if (typeof version === 'string') {
+    knownVersions[kind] = version;
+  }
+};
+
+// Requests currently on the wire, shared by every caller asking the same thing
+const inFlight = new Map<string, Promise<unknown>>();
+
+function dedupe<T>(key: string, fn: () => Promise<T>): Promise<T> {
+  const pending = inFlight.get(key);
+  if (pending) {
+    return pending as Promise<T>;
+  }
+  const request = fn().finally(() => inFlight.delete(key));
+  inFlight.set(key, request);
+  return request;
+}
+
+// Accept 304 Not Modified as an answer to a conditional request
+const acceptNotModified = (status: number) => (status >= 200 && status < 300) || status === 304;
+
+/**
+ * GET a deterministic answer through the memo cache
+ * A memoized answer is reused while it is recent and its version is still
+ * the latest seen; otherwise it is revalidated with If-None-Match (which
+ * also skips the browser's HTTP cache). Identical requests on the wire are
+ * shared, and failures are not cached.
+ */
+async function cachedGet<T, R>(
+  cache: MemoCache<CachedAnswer<T>>,
+  kind: VersionKind,
+  key: string,
+  url: string,
+  select: (data: R) => T
+): Promise<T> {
+  const cached = cache.get(key);
+  if (cached && cached.version === knownVersions[kind] && Date.now() - cached.checkedAt < REVALIDATE_AFTER_MS) {
+    return cached.value;
+  }
+  return dedupe(key, async () => {
+    try {
+      return await withRetry(async () => {
+        const response = await apiClient.get<R>(url, {
+          headers: cached?.etag ? { 'If-None-Match': cached.etag } : {},
+          validateStatus: acceptNotModified,
+        });
+        noteVersion(kind, response.headers['x-cache-version']);
+        const value = response.status === 304 && cached ? cached.value : select(response.data);
+        const etag = response.headers['etag'];
+        cache.set(key, {
+          value,
+          etag: typeof etag === 'string' ? etag : undefined,
+          version: knownVersions[kind],
+          checkedAt: Date.now(),
+        });
+        return value;
+      });
+    } catch (error) {
+      return handleApiError(error);
+    }
+  });
+}
+
+/**
+ * Forget memoized predictions and similar tracks
+ * (the persisted EDA payload is revalidated on every load instead)
+ */
+export const clearApiCache = (): void => {
+  predictionCache.clear();
+  similarCache.clear();
+  knownVersions.model = undefined;
+  knownVersions.dataset = undefined;
+};
+
+/**
+ * Delay calls to fn until none arrived for waitMs, then call it once
+ * with the latest arguments; every caller of the burst gets that result
+ */
+export function debounceLatest<A extends unknown[], T>(
+  fn: (...args: A) => Promise<T>,
+  waitMs: number
+): (...args: A) => Promise<T> {
+  let timer: ReturnType<typeof setTimeout> | undefined;
+  let waiters: Array<{ resolve: (value: T) => void; reject: (reason: unknown) => void }> = [];
+
+  return (...args: A) => new Promise<T>((resolve, reject) => {
+    waiters.push({ resolve, reject });
+    clearTimeout(timer);
+    timer = setTimeout(() => {
+      const burst = waiters;
+      waiters = [];
+      fn(...args).then(
+        value => burst.forEach(waiter => waiter.resolve(value)),
+        reason => burst.forEach(waiter => waiter.reject(reason))
+      );
+    }, waitMs);
+  });
+}
+
 /**
  * Predict whether a track will be a hit or miss
+ * Identical predictions are answered from memory (until the model version
+ * changes) or share one request
  * @param features Track features for prediction
  * @returns Prediction result with confidence scores
  */
-export const predictTrack = async (features: TrackFeatures): Promise<PredictionResult> => {
-  try {
-    return await withRetry(async () => {
-      const response = await apiClient.post<PredictionResult>('/predict', features);
-      return response.data;
-    });
-  } catch (error) {
-    return handleApiError(error);
-  }
+export const predictTrack = (features: TrackFeatures): Promise<PredictionResult> => {
+  const query = featureQuery(features);
+  return cachedGet(
+    predictionCache, 'model', `predict:${query}`, `/predict?f=${query}`,
+    (data: PredictionResult) => data
+  );
 };
 
+/**
+ * Predict for interactive input: bursts of calls (e.g. while a slider is
+ * dragged or the form is resubmitted) send a single request for the latest input
+ */
+export const predictTrackDebounced = debounceLatest(predictTrack, PREDICT_DEBOUNCE_MS);
+
 /**
  * Get similar tracks from the dataset
+ * Identical lookups are answered from memory (until the dataset version
+ * changes) or share one request
  * @param features Track features to find similar tracks
  * @param n Number of recommendations (default: 5)
  * @returns Array of similar tracks
  */
-export const getSimilarTracks = async (
+export const getSimilarTracks = (
   features: TrackFeatures,
   n: number = 5
 ): Promise<SimilarTrack[]> => {
+  const query = featureQuery(features);
+  return cachedGet(
+    similarCache, 'dataset', `similar:${n}:${query}`, `/similar?f=${query}&n=${n}`,
+    (data: { similar_tracks: SimilarTrack[] }) => data.similar_tracks
+  );
+};
+
+interface StoredEDAData {
+  etag: string;
+  data: EDAData;
+}
+
+// Storage may be unavailable (private browsing) or full; the payload is then just not kept
+const readStoredEDAData = (): StoredEDAData | null => {
   try {
-    return await withRetry(async () => {
-      const response = await apiClient.post<{ similar_tracks: SimilarTrack[] }>(
-        '/similar',
-        { features, n_recommendations: n }
-      );
-      return response.data.similar_tracks;
-    });
-  } catch (error) {
-    return handleApiError(error);
+    const stored = JSON.parse(localStorage.getItem(EDA_STORAGE_KEY) ?? 'null');
+    return stored && typeof stored.etag === 'string' ? stored : null;
+  } catch {
+    return null;
+  }
+};
+
+const writeStoredEDAData = (stored: StoredEDAData): void => {
+  try {
+    localStorage.setItem(EDA_STORAGE_KEY, JSON.stringify(stored));
+  } catch {
+    // Keep working without the persisted copy
   }
 };
 
 /**
  * Get exploratory data analysis data
+ * The last payload is kept in browser storage and revalidated with its
+ * ETag, so it is only downloaded again when the dataset has changed
  * @returns EDA data including distributions, correlations, and statistics
  */
-export const getEDAData = async (): Promise<EDAData> => {
+export const getEDAData = (): Promise<EDAData> => dedupe('eda-data', async () => {
   try {
     return await withRetry(async () => {
-      const response = await apiClient.get<EDAData>('/eda-data');
+      const stored = readStoredEDAData();
+      const response = await apiClient.get<EDAData>('/eda-data', {
+        headers: stored ? { ...DEADLINE_HEADERS, 'If-None-Match': stored.etag } : DEADLINE_HEADERS,
+        validateStatus: acceptNotModified,
+      });
+      noteVersion('dataset', response.headers['x-cache-version']);
+      if (response.status === 304 && stored) {
+        return stored.data;
+      }
+      const etag = response.headers['etag'];
+      if (typeof etag === 'string') {
+        writeStoredEDAData({ etag, data: response.data });
+      }
       return response.data;
     });
   } catch (error) {
     return handleApiError(error);
   }
-};
+});
 
 export default apiClient;
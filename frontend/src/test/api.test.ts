@@ -0,0 +1,177 @@
+import { describe, it, expect, vi, beforeEach, afterEach } from 'vitest';
+import apiClient, {
+  EDA_STORAGE_KEY,
+  MemoCache,
+  REVALIDATE_AFTER_MS,
+  clearApiCache,
+  debounceLatest,
+  featureQuery,
+  getEDAData,
+  getSimilarTracks,
+  predictTrack,
+} from '../services/api';
+import type { TrackFeatures } from '../types';
+
+const features: TrackFeatures = {
+  tempo: 120,
+  energy: 0.8,
+  danceability: 0.7,
+  loudness: -5,
+  valence: 0.6,
+  acousticness: 0.1,
+  instrumentalness: 0.0000001,
+  liveness: 0.15,
+  speechiness: 0.05,
+  duration_ms: 200000,
+  key: 5,
+  mode: 1,
+  time_signature: 4,
+};
+
+const prediction = {
+  prediction: 'hit',
+  confidence: 0.8,
+  probabilities: { hit: 0.8, miss: 0.2 },
+};
+
+const response = (data: unknown, status = 200, headers: Record<string, string> = {}) =>
+  ({ data, status, statusText: '', headers, config: {} }) as never;
+
+describe('API client - Canonical feature query', () => {
+  it('should list the features in server order, written like String(number)', () => {
+    expect(featureQuery(features)).toBe('0.7,0.8,5,-5,1,0.05,0.1,1e-7,0.15,0.6,120,4,200000');
+  });
+});
+
+describe('API client - Deduplication and memo cache', () => {
+  beforeEach(() => {
+    clearApiCache();
+  });
+
+  afterEach(() => {
+    vi.restoreAllMocks();
+  });
+
+  it('should share one request between identical in-flight predictions', async () => {
+    const get = vi.spyOn(apiClient, 'get').mockResolvedValue(response(prediction));
+
+    const [first, second] = await Promise.all([predictTrack(features), predictTrack({ ...features })]);
+
+    expect(get).toHaveBeenCalledTimes(1);
+    expect(get.mock.calls[0][0]).toBe(`/predict?f=${featureQuery(features)}`);
+    // No custom headers, so the cacheable GET needs no CORS preflight
+    expect(get.mock.calls[0][1]?.headers).toEqual({});
+    expect(first).toEqual(prediction);
+    expect(second).toEqual(prediction);
+  });
+
+  it('should answer repeated lookups from memory', async () => {
+    const get = vi.spyOn(apiClient, 'get').mockResolvedValue(response({ similar_tracks: [] }));
+
+    await getSimilarTracks(features, 5);
+    await getSimilarTracks(features, 5);
+    await getSimilarTracks(features, 7);
+
+    expect(get).toHaveBeenCalledTimes(2);
+  });
+
+  it('should not cache failures', async () => {
+    const get = vi.spyOn(apiClient, 'get')
+      .mockRejectedValueOnce(new Error('boom'))
+      .mockResolvedValue(response(prediction));
+    vi.spyOn(console, 'error').mockImplementation(() => {});
+
+    await expect(predictTrack(features)).rejects.toThrow();
+    await expect(predictTrack(features)).resolves.toEqual(prediction);
+    expect(get).toHaveBeenCalledTimes(2);
+  });
+
+  it('should revalidate memoized answers once a newer model version is seen', async () => {
+    const updated = { ...prediction, prediction: 'miss' };
+    const get = vi.spyOn(apiClient, 'get')
+      .mockResolvedValueOnce(response(prediction, 200, { etag: 'W/"a"', 'x-cache-version': 'm1' }))
+      .mockResolvedValueOnce(response(prediction, 200, { etag: 'W/"b"', 'x-cache-version': 'm2' }))
+      .mockResolvedValueOnce(response(updated, 200, { etag: 'W/"c"', 'x-cache-version': 'm2' }));
+
+    await predictTrack(features);
+    await predictTrack({ ...features, tempo: 90 });
+    const result = await predictTrack(features);
+
+    expect(get).toHaveBeenCalledTimes(3);
+    expect(get.mock.calls[2][1]?.headers).toEqual({ 'If-None-Match': 'W/"a"' });
+    expect(result).toEqual(updated);
+  });
+
+  it('should revalidate old answers with their ETag and reuse them on 304', async () => {
+    vi.useFakeTimers();
+    const get = vi.spyOn(apiClient, 'get')
+      .mockResolvedValueOnce(response({ similar_tracks: ['a'] }, 200, { etag: 'W/"s"', 'x-cache-version': 'd1' }))
+      .mockResolvedValueOnce(response('', 304, { etag: 'W/"s"', 'x-cache-version': 'd1' }));
+
+    await getSimilarTracks(features);
+    vi.advanceTimersByTime(REVALIDATE_AFTER_MS);
+    const result = await getSimilarTracks(features);
+    await getSimilarTracks(features);
+
+    expect(get).toHaveBeenCalledTimes(2);
+    expect(get.mock.calls[1][1]?.headers).toEqual({ 'If-None-Match': 'W/"s"' });
+    expect(result).toEqual(['a']);
+    vi.useRealTimers();
+  });
+
+  it('should evict the least recently used and expired entries', () => {
+    vi.useFakeTimers();
+    const cache = new MemoCache<number>(2, 1000);
+    cache.set('a', 1);
+    cache.set('b', 2);
+    cache.get('a');
+    cache.set('c', 3);
+
+    expect(cache.get('b')).toBeUndefined();
+    expect(cache.get('a')).toBe(1);
+
+    vi.advanceTimersByTime(1000);
+    expect(cache.get('c')).toBeUndefined();
+    vi.useRealTimers();
+  });
+});
+
+describe('API client - Debouncing', () => {
+  it('should call once with the latest arguments and resolve every caller', async () => {
+    vi.useFakeTimers();
+    const fn = vi.fn(async (value: number) => value * 2);
+    const debounced = debounceLatest(fn, 250);
+
+    const calls = [debounced(1), debounced(2), debounced(3)];
+    await vi.advanceTimersByTimeAsync(250);
+
+    expect(await Promise.all(calls)).toEqual([6, 6, 6]);
+    expect(fn).toHaveBeenCalledTimes(1);
+    expect(fn).toHaveBeenCalledWith(3);
+    vi.useRealTimers();
+  });
+});
+
+describe('API client - EDA revalidation', () => {
+  const edaData = { hit_miss_distribution: { hit: 3, miss: 7 } };
+
+  beforeEach(() => {
+    localStorage.clear();
+  });
+
+  afterEach(() => {
+    vi.restoreAllMocks();
+  });
+
+  it('should store the payload with its ETag and reuse it on 304', async () => {
+    const get = vi.spyOn(apiClient, 'get')
+      .mockResolvedValueOnce(response(edaData, 200, { etag: 'W/"abc"' }))
+      .mockResolvedValueOnce(response('', 304, { etag: 'W/"abc"' }));
+
+    expect(await getEDAData()).toEqual(edaData);
+    expect(JSON.parse(localStorage.getItem(EDA_STORAGE_KEY)!).etag).toBe('W/"abc"');
+
+    expect(await getEDAData()).toEqual(edaData);
+    expect(get.mock.calls[1][1]?.headers).toMatchObject({ 'If-None-Match': 'W/"abc"', 'X-Request-Timeout-Ms': '10000' });
+  });
+});